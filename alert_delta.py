@@ -0,0 +1,136 @@
+import pandas as pd
+import numpy as np
+import os
+from datetime import datetime
+from audit_queue import severity_band
+from dashboard_aggregates import ENGINE_OUTPUTS, load_engine_outputs
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+SNAPSHOT_FOLDER = "alert_snapshots"
+DELTA_FILE = "alert_delta.csv"
+KEEP_SNAPSHOTS = 30
+
+LAYERS = ["fraud", "boom", "ghost", "digital"]
+
+# Column that measures how severe an alert is, per layer
+SEVERITY_COLUMNS = {
+    "fraud":   'severity_score',
+    "boom":    'velocity_q3',
+    "ghost":   'elderly_pressure_median',
+    "digital": 'elderly_pressure'
+}
+
+# Non-fraud severities are compared in 25% steps, so run-to-run noise is not a change
+LEVEL_STEP = 1.25
+
+KEY_COLUMNS = ['layer', 'state', 'district', 'pincode']
+CHANGE_ORDER = ["NEW", "STATUS_CHANGED", "SEVERITY_CHANGED", "RESOLVED"]
+
+# ==========================================
+# 1. SNAPSHOTS
+# ==========================================
+def severity_level(layer, values):
+    """Discrete severity used to decide whether an alert changed."""
+    if layer == "fraud":
+        return severity_band(values).astype(str)
+    steps = np.floor(np.log1p(values.clip(lower=0).fillna(0)) / np.log(LEVEL_STEP))
+    return steps.astype(int).astype(str)
+
+def build_snapshot(frames):
+    """
+    One keyed row per alert across every layer. key_hash identifies the
+    (layer, location); row_hash also covers status and severity level, so
+    two snapshots can be compared by hash alone.
+    """
+    parts = []
+    for layer in LAYERS:
+        df = frames.get(layer, pd.DataFrame())
+        if df is None or df.empty:
+            continue
+        severity = df[SEVERITY_COLUMNS[layer]]
+        parts.append(pd.DataFrame({
+            'layer': layer,
+            'state': df['state'].astype(str),
+            'district': df['district'].astype(str),
+            'pincode': pd.to_numeric(df['pincode'], errors='coerce').astype('Int64').astype(str),
+            'status': df['audit_status'].astype(str) if 'audit_status' in df.columns else "ALERT",
+            'severity': severity.astype(float),
+            'level': severity_level(layer, severity)
+        }))
+    if not parts:
+        return pd.DataFrame(columns=KEY_COLUMNS + ['status', 'severity', 'level', 'key_hash', 'row_hash'])
+
+    snap = pd.concat(parts, ignore_index=True).drop_duplicates(KEY_COLUMNS)
+    snap['key_hash'] = pd.util.hash_pandas_object(snap[KEY_COLUMNS], index=False).to_numpy()
+    snap['row_hash'] = pd.util.hash_pandas_object(snap[KEY_COLUMNS + ['status', 'level']], index=False).to_numpy()
+    return snap
+
+def list_snapshots(folder=SNAPSHOT_FOLDER):
+    if not os.path.isdir(folder):
+        return []
+    return sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(".parquet"))
+
+def save_snapshot(snap, folder=SNAPSHOT_FOLDER, keep=KEEP_SNAPSHOTS):
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"snapshot_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.parquet")
+    snap.to_parquet(path, index=False)
+    for old in list_snapshots(folder)[:-keep]:
+        os.remove(old)
+    return path
+
+# ==========================================
+# 2. DELTA (hash join on the changed rows only)
+# ==========================================
+def diff_snapshots(old, new):
+    """
+    NEW / RESOLVED / STATUS_CHANGED / SEVERITY_CHANGED between two snapshots.
+    Rows whose row_hash appears in both snapshots are unchanged and dropped
+    by a hash-set lookup first; only the remainder is joined on key_hash,
+    so the join and everything after it scale with the number of changes.
+    """
+    added = new[~new['row_hash'].isin(old['row_hash'])]
+    removed = old[~old['row_hash'].isin(new['row_hash'])]
+
+    joined = pd.merge(added, removed[['key_hash', 'status', 'severity', 'level']],
+                      on='key_hash', how='outer', suffixes=('_new', '_old'), indicator=True)
+    if joined.empty:
+        return pd.DataFrame(columns=['change'] + KEY_COLUMNS + ['status_old', 'status_new', 'severity_old', 'severity_new'])
+
+    # Resolved rows only exist on the old side; take their keys from there
+    resolved = joined['_merge'] == 'right_only'
+    if resolved.any():
+        keys = removed.set_index('key_hash')[KEY_COLUMNS]
+        joined.loc[resolved, KEY_COLUMNS] = keys.loc[joined.loc[resolved, 'key_hash']].to_numpy()
+
+    joined['change'] = np.select(
+        [joined['_merge'] == 'left_only', resolved, joined['status_new'] != joined['status_old']],
+        ["NEW", "RESOLVED", "STATUS_CHANGED"],
+        default="SEVERITY_CHANGED"
+    )
+    delta = joined[['change'] + KEY_COLUMNS + ['status_old', 'status_new', 'severity_old', 'severity_new']]
+    order = delta['change'].map({c: i for i, c in enumerate(CHANGE_ORDER)})
+    return delta.assign(_order=order).sort_values(['_order', 'layer', 'state', 'district', 'pincode'],
+                                                   kind='stable').drop(columns='_order').reset_index(drop=True)
+
+def record_run(frames, folder=SNAPSHOT_FOLDER, delta_file=DELTA_FILE):
+    """Snapshots this run's alerts, writes the delta against the previous
+    snapshot (everything is NEW on the first run) and returns it."""
+    snapshots = list_snapshots(folder)
+    previous = pd.read_parquet(snapshots[-1]) if snapshots else build_snapshot({})
+    snap = build_snapshot(frames)
+    delta = diff_snapshots(previous, snap)
+    save_snapshot(snap, folder)
+    delta.to_csv(delta_file, index=False)
+    return delta
+
+# ==========================================
+# EXECUTION (Snapshot the outputs on disk)
+# ==========================================
+if __name__ == "__main__":
+    print("🚀 Snapshotting engine outputs and computing the alert delta...")
+    delta = record_run(load_engine_outputs({k: ENGINE_OUTPUTS[k] for k in LAYERS}))
+    counts = delta['change'].value_counts()
+    print("   " + " | ".join(f"{c}: {counts.get(c, 0)}" for c in CHANGE_ORDER))
+    print(f"🎉 SUCCESS! Delta saved to '{DELTA_FILE}'")
@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+from tornado.httpclient import AsyncHTTPClient
+
+from dashboard_aggregates import ENGINE_OUTPUTS
+from drishti_api import API_PORT, API_LAYERS, TOP_GROUPS
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+DEFAULT_REQUESTS = 20_000
+DEFAULT_CONCURRENCY = 50
+STARTUP_TIMEOUT_SECONDS = 60
+
+# ==========================================
+# 1. REQUEST MIX (drawn from the real engine outputs)
+# ==========================================
+def build_urls(base, n_unique=2000, seed=7):
+    """Pincode / district / state lookups plus top-N and summary calls."""
+    rng = random.Random(seed)
+    frames = [pd.read_csv(ENGINE_OUTPUTS[l]) for l in API_LAYERS if os.path.exists(ENGINE_OUTPUTS[l])]
+    places = pd.concat([f[['state', 'district', 'pincode']] for f in frames], ignore_index=True)
+
+    pincodes = places['pincode'].astype(int).astype(str).unique().tolist()
+    districts = places['district'].astype(str).unique().tolist()
+    states = places['state'].astype(str).unique().tolist()
+
+    paths = ["/v1/layers"] + [f"/v1/layers/{l}" for l in API_LAYERS]
+    paths += [f"/v1/layers/{l}/top?by={by}&n={n}" for l in API_LAYERS for by in TOP_GROUPS for n in (10, 50)]
+    while len(paths) < n_unique:
+        kind = rng.random()
+        if kind < 0.5:
+            paths.append(f"/v1/pincode/{rng.choice(pincodes)}")
+        elif kind < 0.85:
+            paths.append(f"/v1/district/{quote(rng.choice(districts))}")
+        else:
+            paths.append(f"/v1/state/{quote(rng.choice(states))}?limit=20")
+    return [base + p for p in paths]
+
+# ==========================================
+# 2. LOAD GENERATOR
+# ==========================================
+async def run_load(urls, total, concurrency):
+    AsyncHTTPClient.configure(None, max_clients=concurrency)
+    client = AsyncHTTPClient()
+    order = itertools.count()
+    latencies = np.zeros(total)
+    statuses = {}
+    cache_hits = 0
+
+    async def worker():
+        nonlocal cache_hits
+        while True:
+            i = next(order)
+            if i >= total:
+                return
+            start = time.perf_counter()
+            resp = await client.fetch(urls[i % len(urls)], raise_error=False)
+            latencies[i] = time.perf_counter() - start
+            statuses[resp.code] = statuses.get(resp.code, 0) + 1
+            cache_hits += resp.headers.get("X-Cache") == "HIT"
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    client.close()
+
+    ms = latencies * 1000
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "unique_urls": len(urls),
+        "elapsed_seconds": round(elapsed, 3),
+        "requests_per_second": round(total / elapsed, 1),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+        "cache_hit_ratio": round(cache_hits / total, 3),
+        "status_codes": {str(k): v for k, v in sorted(statuses.items())}
+    }
+
+def start_local_server(port):
+    """Starts drishti_api.py in a child process and waits until /health answers."""
+    proc = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "drishti_api.py"),
+                             "--port", str(port)], stdout=subprocess.DEVNULL)
+
+    async def wait_ready():
+        client = AsyncHTTPClient()
+        deadline = time.time() + STARTUP_TIMEOUT_SECONDS
+        while time.time() < deadline:
+            try:
+                await client.fetch(f"http://127.0.0.1:{port}/health")
+                return True
+            except Exception:
+                await asyncio.sleep(0.2)
+        return False
+
+    if not asyncio.run(wait_ready()):
+        proc.kill()
+        raise RuntimeError(f"API did not come up on port {port} within {STARTUP_TIMEOUT_SECONDS}s")
+    return proc
+
+# ==========================================
+# EXECUTION
+# ==========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test for the Drishti HTTP API.")
+    parser.add_argument("--url", default=None, help=f"running API (default: start one on port {API_PORT})")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--unique", type=int, default=2000, help="distinct URLs in the request mix")
+    parser.add_argument("--out", help="write the result JSON here")
+    args = parser.parse_args()
+
+    server = None
+    base = args.url
+    if base is None:
+        server = start_local_server(API_PORT)
+        base = f"http://127.0.0.1:{API_PORT}"
+
+    try:
+        urls = build_urls(base, args.unique)
+        print(f"🚀 {args.requests:,} requests, concurrency {args.concurrency}, {len(urls):,} distinct URLs -> {base}")
+        result = asyncio.run(run_load(urls, args.requests, args.concurrency))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(f"   ⚡ {result['requests_per_second']:,} req/s over {result['elapsed_seconds']}s")
+    print(f"   ⏱️ p50 {result['p50_ms']} ms | p95 {result['p95_ms']} ms | p99 {result['p99_ms']} ms | max {result['max_ms']} ms")
+    print(f"   🗃️ Cache hit ratio {result['cache_hit_ratio']:.1%} | status codes {result['status_codes']}")
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(result, fh, indent=2)
+        print(f"💾 Results saved to {args.out}")
@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import glob
+import json
+import os
+import random
+
+import pandas as pd
+import tornado.ioloop
+import tornado.web
+
+from api_fetcher import DATASETS
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+REPLAY_PORT = 8766
+SAMPLE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Raw_Datasets")
+MAX_LIMIT = 10_000
+
+# ==========================================
+# 1. DATA (the dump files, concatenated in record order)
+# ==========================================
+def load_dumps(folder=SAMPLE_FOLDER):
+    """{dataset: DataFrame} from every api_data_aadhar_<dataset>_*.csv in `folder`."""
+    frames = {}
+    for dataset in DATASETS:
+        files = sorted(glob.glob(os.path.join(folder, "**", f"*{dataset}*.csv"), recursive=True))
+        parts = [pd.read_csv(f, dtype={'date': str, 'state': str, 'district': str}) for f in files]
+        frames[dataset] = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+    return frames
+
+# ==========================================
+# 2. HANDLER (data.gov.in style paging: offset / limit / total)
+# ==========================================
+class ResourceHandler(tornado.web.RequestHandler):
+    def initialize(self, frames, fail_rate=0.0, latency_ms=0):
+        self.frames = frames
+        self.fail_rate = fail_rate
+        self.latency_ms = latency_ms
+
+    async def get(self, dataset):
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        # Fault injection, to exercise the fetcher's retries
+        if self.fail_rate and random.random() < self.fail_rate:
+            raise tornado.web.HTTPError(503)
+
+        try:
+            offset = int(self.get_query_argument("offset", "0"))
+            limit = int(self.get_query_argument("limit", "10"))
+        except ValueError:
+            raise tornado.web.HTTPError(400)
+        limit = max(0, min(limit, MAX_LIMIT))
+
+        df = self.frames[dataset]
+        page = df.iloc[offset:offset + limit]
+        records = page.to_json(orient='records', double_precision=15) if len(page) else "[]"
+        header = json.dumps({"total": len(df), "count": len(page), "offset": offset, "limit": limit})
+        self.set_header("Content-Type", "application/json")
+        self.write(header[:-1] + ', "records": ' + records + "}")
+
+def make_app(frames, fail_rate=0.0, latency_ms=0):
+    args = dict(frames=frames, fail_rate=fail_rate, latency_ms=latency_ms)
+    return tornado.web.Application([
+        (r"/resource/(" + "|".join(DATASETS) + ")", ResourceHandler, args)
+    ])
+
+# ==========================================
+# EXECUTION
+# ==========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Aadhaar API, replaying dump files.")
+    parser.add_argument("--folder", default=SAMPLE_FOLDER)
+    parser.add_argument("--port", type=int, default=REPLAY_PORT)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--latency-ms", type=int, default=0)
+    args = parser.parse_args()
+
+    frames = load_dumps(args.folder)
+    make_app(frames, args.fail_rate, args.latency_ms).listen(args.port, address="127.0.0.1")
+    rows = ", ".join(f"{k}={len(v):,}" for k, v in frames.items())
+    print(f"🔁 Replaying '{args.folder}' on http://127.0.0.1:{args.port}/resource/<dataset> ({rows})")
+    tornado.ioloop.IOLoop.current().start()
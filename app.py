@@ -6,6 +6,15 @@ import os
 import json
 from urllib.request import urlopen
 from streamlit_option_menu import option_menu
+from data_access import DatasetStore, default_sources, memory_bytes
+from drishti_query import QueryEngine
+from audit_queue import AuditQueueIndex
+from pincode_store import PincodeStore, STORE_FOLDER, current_version
+from report_export import ExportManager
+
+# Copy-on-write: every session reads the same cached DataFrames (data_access.py);
+# a write to a view copies only that column instead of touching the shared data
+pd.set_option("mode.copy_on_write", True)
 
 # ==========================================
 # 1. PAGE CONFIGURATION & GOVTECH THEME
@@ -111,45 +120,40 @@ st.markdown("""
 # ==========================================
 # 2. DATA ENGINE
 # ==========================================
-@st.cache_data
-def load_data():
-    files = {
-        "fraud": "engine_fraud_30days.csv",
-        "boom": "engine_boom_180days.csv",
-        "ghost": "engine_ghost_3years.csv",
-        "digital": "engine_digital_1year.csv"
-    }
-    data = {}
-    for key, path in files.items():
-        if os.path.exists(path):
-            data[key] = pd.read_csv(path)
-        else:
-            data[key] = pd.DataFrame()
-    return data
-
-df_dict = load_data()
-
-# MAP PREP: Normalize State Names to match GeoJSON
-def normalize_state_names(df):
-    if df.empty or 'state' not in df.columns: return df
-    
-    corrections = {
-        "Andaman and Nicobar Islands": "Andaman & Nicobar Island",
-        "Arunachal Pradesh": "Arunachal Pradesh",
-        "Dadra and Nagar Haveli": "Dadra and Nagar Haveli and Daman and Diu",
-        "Daman and Diu": "Dadra and Nagar Haveli and Daman and Diu",
-        "Delhi": "NCT of Delhi",
-        "Jammu and Kashmir": "Jammu & Kashmir",
-        "Ladakh": "Ladakh",
-        "Telangana": "Telangana",
-        "Odisha": "Odisha",
-        "Chattisgarh": "Chhattisgarh"
-    }
-    df['state'] = df['state'].replace(corrections)
-    return df
+# One store per server process: each dataset is read only when a screen asks
+# for it, and re-read once its file's mtime/size changes (data_access.py).
+@st.cache_resource
+def get_data_store():
+    store = DatasetStore(default_sources())
+    store.start_watcher()
+    return store
+
+data_store = get_data_store()
+
+def load_layer(key):
+    return data_store.get(key)
+
+# Precomputed summary tables published by the engines (dashboard_aggregates.py)
+def summary(name):
+    summaries, _ = data_store.get("summaries")
+    return summaries.get(name, pd.DataFrame())
+
+def kpi(name, default=0):
+    _, kpis = data_store.get("summaries")
+    return kpis.get(name, default)
+
+# Per-layer slices, filtered once per server process instead of on every rerun
+def layer_rows(df, layer):
+    return df[df['layer'] == layer] if 'layer' in df.columns else df
+
+def summary_for_layer(name, layer):
+    return data_store.derived(
+        f"summary.{name}", ["summaries"],
+        lambda summaries, layer: layer_rows(summaries[0].get(name, pd.DataFrame()), layer), layer
+    )
 
-for k in df_dict:
-    df_dict[k] = normalize_state_names(df_dict[k])
+def delta_for_layer(layer):
+    return data_store.derived("delta", ["delta"], layer_rows, layer)
 
 # Load India GeoJSON for Maps (Cached)
 INDIA_GEOJSON_URL = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
@@ -161,47 +165,35 @@ def load_map_data():
 
 india_geojson = load_map_data()
 
+# Audit queue postings / sort orders, rebuilt only when the fraud output changes
+@st.cache_resource(max_entries=2)
+def get_audit_index(version, _fraud_df):
+    return AuditQueueIndex(_fraud_df)
+
+# Memory-mapped pincode series (pincode_store.py), reopened when featureaddition.py rebuilds it
+@st.cache_resource(max_entries=2)
+def get_pincode_store(version):
+    return PincodeStore(STORE_FOLDER, version) if version else None
+
+# One export worker per server process, shared by every session
+@st.cache_resource
+def get_export_manager():
+    return ExportManager()
+
 # ==========================================
 # 3. CHATBOT LOGIC (HELPER FUNCTION)
 # ==========================================
+CHAT_LAYERS = ["fraud", "boom", "ghost", "digital"]
+
+# Indexes are rebuilt only when one of the engine outputs changes on disk
+@st.cache_resource(max_entries=2)
+def build_query_engine(version, _frames):
+    return QueryEngine(_frames)
+
 def get_bot_response(user_query):
-    user_query = user_query.lower()
-    
-    # 1. GREETINGS
-    if any(x in user_query for x in ["hi", "hello", "hey"]):
-        return "Namaste! I am Drishti AI. I can answer questions about Fraud Alerts, Migration Trends, or Ghost Villages. Try asking: 'Which district has the most fraud?'"
-    
-    # 2. FRAUD QUERIES
-    if "fraud" in user_query or "alert" in user_query:
-        df = df_dict['fraud']
-        if df.empty: return "I don't have fraud data loaded right now."
-        high_risk = len(df[df['audit_status'].str.contains("HIGH RISK")])
-        top_district = df['district'].value_counts().idxmax() if not df.empty else "Unknown"
-        return f"Currently, I detect **{high_risk} High-Risk Alerts** requiring immediate audit. The district with the highest suspicious activity is **{top_district}**."
-
-    # 3. MIGRATION / BOOM TOWN QUERIES
-    if "migration" in user_query or "boom" in user_query or "growth" in user_query:
-        df = df_dict['boom']
-        if df.empty: return "Migration data is unavailable."
-        count = len(df)
-        avg_vel = df['velocity_q3'].mean()
-        return f"I have identified **{count} Boom Towns** experiencing rapid population influx. The average enrollment velocity is **{avg_vel:.1f} enrollments/day** (2x Baseline)."
-
-    # 4. GHOST VILLAGE / ELDERLY QUERIES
-    if "ghost" in user_query or "elderly" in user_query or "aging" in user_query:
-        df = df_dict['ghost']
-        if df.empty: return "Demographic data is unavailable."
-        count = len(df)
-        return f"There are **{count} Ghost Villages** detected where high elderly populations are unable to access centers. I recommend deploying **Mobile Aadhaar Vans**."
-
-    # 5. DIGITAL DIVIDE
-    if "digital" in user_query or "dark" in user_query:
-        df = df_dict['digital']
-        if df.empty: return "Digital exclusion data is unavailable."
-        return f"I see **{len(df)} Digital Dark Zones** where biometric failure rates are abnormally high."
-
-    # DEFAULT FALLBACK
-    return "I am analyzing the latest signals. You can ask me about: **Fraud Alerts**, **Migration Hotspots**, or **Digital Exclusion**."
+    frames = {k: load_layer(k) for k in CHAT_LAYERS}
+    version = tuple(data_store.version(k) for k in CHAT_LAYERS)
+    return build_query_engine(version, frames).answer(user_query)
 
 # ==========================================
 # 4. SIDEBAR NAVIGATION
@@ -214,8 +206,8 @@ with st.sidebar:
     
     selected = option_menu(
         menu_title=None,
-        options=["National Overview", "Integrity Shield (Fraud)", "Migration Tracker", "Demographic Scanner", "Digital Divide Overlay", "Impact & Outcomes"],
-        icons=["house", "shield-check", "airplane-engines", "people", "wifi-off", "trophy"],
+        options=["National Overview", "Integrity Shield (Fraud)", "Migration Tracker", "Demographic Scanner", "Digital Divide Overlay", "Pincode Drill-Down", "Impact & Outcomes"],
+        icons=["house", "shield-check", "airplane-engines", "people", "wifi-off", "search", "trophy"],
         menu_icon="cast",
         default_index=0,
         styles={
@@ -229,6 +221,8 @@ with st.sidebar:
     st.markdown("---")
     st.caption("System Status: ● Online")
     st.caption(f"Last Sync: {pd.Timestamp.now().strftime('%d-%b-%Y %H:%M')}")
+    # Filled in after the screen renders, so this run's session state is counted
+    memory_slot = st.empty()
 
 # ==========================================
 # 5. MODULES
@@ -270,11 +264,8 @@ if selected == "National Overview":
     st.markdown("**Governance Question:** Where does the government need to act *right now*?")
     
     # 1. KPI ROW
-    digital_df = df_dict["digital"]
-    fraud_df = df_dict["fraud"]
-    
-    active_dark_zones = len(digital_df) if not digital_df.empty else 0
-    high_risk_alerts = len(fraud_df[fraud_df['audit_status'].str.contains("HIGH RISK")]) if not fraud_df.empty else 0
+    active_dark_zones = kpi("digital_zones", 0)
+    high_risk_alerts = kpi("high_risk_alerts", 0)
     
     c1, c2, c3, c4 = st.columns(4)
     with c1: st.metric("Population Scanned", "1.42B", "Live Update")
@@ -295,29 +286,25 @@ if selected == "National Overview":
         
         # --- LOGIC: Select Data Based on Layer ---
         if "Fraud" in map_layer:
-            df = df_dict["fraud"]
+            layer = "fraud"
             color = "Reds"
             title = "High-Risk Fraud Centers"
-            insight_data = df[df['audit_status'].str.contains("HIGH RISK")]
         elif "Migration" in map_layer:
-            df = df_dict["boom"]
+            layer = "boom"
             color = "Oranges"
             title = "Migration Velocity"
-            insight_data = df
         elif "Aging" in map_layer:
-            df = df_dict["ghost"]
+            layer = "ghost"
             color = "Purples"
             title = "Elderly Dependency"
-            insight_data = df
         else: # Digital Divide
-            df = df_dict["digital"]
+            layer = "digital"
             color = "Blues"
             title = "Digital Exclusion Zones"
-            insight_data = df
 
         # RENDER MAP
-        if not df.empty:
-            state_agg = df.groupby('state').size().reset_index(name='Intensity')
+        state_agg = summary_for_layer("state_intensity", layer)
+        if not state_agg.empty:
             fig = px.choropleth(
                 state_agg, geojson=india_geojson, locations='state', featureidkey="properties.ST_NM",
                 color='Intensity', color_continuous_scale=color, title=f"Heatmap: {map_layer}"
@@ -333,22 +320,10 @@ if selected == "National Overview":
         st.subheader("⚡ Actionable Insights")
         st.info(f"Top 5 Critical Targets: {map_layer}")
         
-        if not insight_data.empty:
-            # Group by District to deduplicate
-            if "Fraud" in map_layer:
-                action_table = insight_data.groupby(['district', 'risk_reason']).size().reset_index(name='Alerts')
-            elif "Migration" in map_layer:
-                action_table = insight_data.groupby(['district']).size().reset_index(name='Hubs')
-                action_table['Action'] = "Expand Infra"
-            elif "Aging" in map_layer:
-                action_table = insight_data.groupby(['district']).size().reset_index(name='Villages')
-                action_table['Action'] = "Pension Van"
-            else: # Digital
-                action_table = insight_data.groupby(['district', 'action']).size().reset_index(name='Zones')
-            
-            # Sort and Head
-            sort_col = action_table.columns[-1] # Sort by the count column
-            action_table = action_table.sort_values(sort_col, ascending=False).head(5)
+        # Already grouped by District and sorted by the engines
+        action_table = summary(f"actions_{layer}")
+        if not action_table.empty:
+            action_table = action_table.head(5)
 
             st.dataframe(
                 action_table,
@@ -365,45 +340,115 @@ elif selected == "Integrity Shield (Fraud)":
     st.title("🛡️ Integrity Shield")
     st.markdown("**Governance Question:** Which Aadhaar centers require audit, and which alerts are false positives?")
     
-    df = df_dict["fraud"]
-    
-    if not df.empty:
-        high_risk = df[df['audit_status'].str.contains("HIGH RISK")]
-        suppressed = df[df['audit_status'].str.contains("SUPPRESSED")]
-        
+    if kpi("fraud_total", 0) > 0:
         # KPIs
         c1, c2, c3 = st.columns(3)
-        with c1: st.metric("High-Risk Alerts", len(high_risk), "Audit Required", delta_color="inverse")
-        with c2: st.metric("Auto-Suppressed", len(suppressed), "Migration Context Verified")
-        with c3: st.metric("Total Analyzed", len(df), "Last 30 Days")
+        with c1: st.metric("High-Risk Alerts", kpi("high_risk_alerts"), "Audit Required", delta_color="inverse")
+        with c2: st.metric("Auto-Suppressed", kpi("suppressed_alerts"), "Migration Context Verified")
+        with c3: st.metric("Total Analyzed", kpi("fraud_total"), "Last 30 Days")
         
         st.markdown("---")
         
-        st.subheader("🚨 Priority Audit Queue (Pattern Analysis)")
+        # Auditors start from what changed since the previous engine run (alert_delta.py)
+        view = st.radio("Alert View", ["Changes Since Last Run", "Full Audit Queue"], horizontal=True)
+
+        if view == "Changes Since Last Run":
+            st.subheader("🆕 Changes Since Last Run")
+            delta = delta_for_layer("fraud")
+
+            if delta.empty:
+                st.success("No alert changes since the previous run.")
+            else:
+                counts = delta['change'].value_counts()
+                d1, d2, d3, d4 = st.columns(4)
+                with d1: st.metric("New Alerts", int(counts.get("NEW", 0)))
+                with d2: st.metric("Status Changed", int(counts.get("STATUS_CHANGED", 0)))
+                with d3: st.metric("Severity Changed", int(counts.get("SEVERITY_CHANGED", 0)))
+                with d4: st.metric("Resolved", int(counts.get("RESOLVED", 0)))
+
+                st.dataframe(
+                    delta.drop(columns=['layer']),
+                    column_config={
+                        "change": "Change",
+                        "status_old": "Previous Status",
+                        "status_new": "Current Status",
+                        "severity_old": st.column_config.NumberColumn("Previous Score", format="%.3f"),
+                        "severity_new": st.column_config.NumberColumn("Current Score", format="%.3f")
+                    },
+                    hide_index=True,
+                    use_container_width=True
+                )
+
+        else:
+            st.subheader("🚨 Priority Audit Queue (Pattern Analysis)")
         
-        if not high_risk.empty:
-            # Deduplication logic
-            audit_queue = high_risk.groupby(['state', 'district', 'risk_reason']).size().reset_index(name='Frequency')
-            audit_queue = audit_queue.sort_values('Frequency', ascending=False).head(10)
+            # Deduplicated (state, district, pattern) counts from the engine run
+            audit_queue = summary("audit_queue").head(10)
+            if not audit_queue.empty:
             
+                st.dataframe(
+                    audit_queue,
+                    column_config={
+                        "state": "State",
+                        "district": "District",
+                        "risk_reason": "Fraud Pattern",
+                        "Frequency": st.column_config.ProgressColumn(
+                            "Alert Intensity",
+                            help="Number of alerts in this district",
+                            format="%d",
+                            min_value=0,
+                            max_value=int(audit_queue['Frequency'].max()),
+                        ),
+                    },
+                    hide_index=True,
+                    use_container_width=True
+                )
+
+            st.markdown("---")
+            st.subheader("🔎 Audit Queue Explorer (Center Drill-Down)")
+
+            queue = get_audit_index(data_store.version("fraud"), load_layer("fraud"))
+            ANY = "All"
+
+            f1, f2, f3, f4 = st.columns(4)
+            with f1: status = st.selectbox("Status", [ANY] + queue.options('status'))
+            with f2: state = st.selectbox("State", [ANY] + queue.options('state'))
+            with f3:
+                district = st.selectbox(
+                    "District",
+                    [ANY] + queue.options('district', {'state': None if state == ANY else state})
+                )
+            with f4: severity = st.selectbox("Severity", [ANY] + queue.options('severity'))
+
+            filters = {
+                'status': status, 'state': state, 'district': district, 'severity': severity
+            }
+            filters = {k: v for k, v in filters.items() if v != ANY}
+
+            s1, s2, s3 = st.columns([2, 1, 1])
+            with s1: sort_by = st.selectbox("Sort by", queue.sortable())
+            with s2: ascending = st.radio("Order", ["Ascending", "Descending"], horizontal=True) == "Ascending"
+            with s3: page_size = st.selectbox("Rows per page", [25, 50, 100])
+
+            _, total = queue.page(filters, sort_by, ascending, page=1, page_size=page_size)
+            page_count = max(1, -(-total // page_size))
+            page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1)
+
+            page_rows, total = queue.page(filters, sort_by, ascending, page=page, page_size=page_size)
+            first = (page - 1) * page_size
+            st.caption(f"Showing {first + 1 if total else 0}-{first + len(page_rows)} of {total} matching centers")
             st.dataframe(
-                audit_queue,
+                page_rows.drop(columns=['status']),
                 column_config={
-                    "state": "State",
-                    "district": "District",
-                    "risk_reason": "Fraud Pattern",
-                    "Frequency": st.column_config.ProgressColumn(
-                        "Alert Intensity",
-                        help="Number of alerts in this district",
-                        format="%d",
-                        min_value=0,
-                        max_value=int(audit_queue['Frequency'].max()),
-                    ),
+                    "severity_score": st.column_config.NumberColumn("Anomaly Score", format="%.3f"),
+                    "severity": "Severity",
+                    "audit_status": "Audit Status",
+                    "risk_reason": "Fraud Pattern"
                 },
                 hide_index=True,
                 use_container_width=True
             )
-            
+
         with st.expander("ℹ️  Audit Explanation: Why were alerts suppressed?"):
             st.write("The system detected high velocity enrolment in specific pincodes. However, by cross-referencing with the **Migration Tracker**, we confirmed these are legitimate 'Boom Towns' with influx of workers, not synthetic fraud.")
 
@@ -414,29 +459,41 @@ elif selected == "Migration Tracker":
     st.title("🔥 Migration Tracker (Boom Towns)")
     st.markdown("**Governance Question:** Where is population pressure increasing and infrastructure needs scaling?")
     
-    df = df_dict["boom"]
+    boom_districts = summary("boom_districts")
     
-    if not df.empty:
+    if kpi("boom_towns", 0) > 0:
         c1, c2 = st.columns([3, 1])
         with c1:
-            st.metric("Identified Boom Towns", len(df), "High Velocity Influx")
+            st.metric("Identified Boom Towns", kpi("boom_towns"), "High Velocity Influx")
         with c2:
-            st.metric("Avg Velocity", f"{df['velocity_q3'].mean():.1f}", "Enrolments/Day")
+            st.metric("Avg Velocity", f"{kpi('boom_avg_velocity'):.1f}", "Enrolments/Day")
 
         st.markdown("---")
         
         c_trend, c_list = st.columns([2, 1])
         with c_trend:
             st.subheader("📈 Top Districts by Growth")
-            fig = px.bar(df['district'].value_counts().head(10), orientation='h', color_discrete_sequence=['#ff9933'])
+            fig = px.bar(boom_districts.head(10).set_index('district')['count'], orientation='h', color_discrete_sequence=['#ff9933'])
             st.plotly_chart(fig, use_container_width=True)
             
         with c_list:
             st.subheader("Administrative Response")
             st.write("Recommended actions for top districts:")
-            top_districts = df['district'].value_counts().head(5).index.tolist()
-            for dist in top_districts:
-                st.warning(f"📍 **{dist}**: Increase Aadhaar Seva Kendra capacity by 20%.")
+            # Sized from the 30-day demand forecast (forecast_engine.py) when available
+            capacity = summary("boom_capacity")
+            if not capacity.empty:
+                for _, row in capacity.head(5).iterrows():
+                    if row.get('new_capacity', False):
+                        st.warning(f"📍 **{row['district']}**: Open new Aadhaar Seva Kendra capacity for about "
+                                   f"{row['forecast_30d']:,.0f} requests in 30 days (none served in the last 30 days).")
+                    else:
+                        st.warning(f"📍 **{row['district']}**: Increase Aadhaar Seva Kendra capacity by "
+                                   f"{row['capacity_increase_pct']:.0f}% (forecast {row['forecast_30d']:,.0f} "
+                                   f"requests in 30 days vs {row['last_30d']:,.0f}).")
+            else:
+                top_districts = boom_districts['district'].head(5).tolist()
+                for dist in top_districts:
+                    st.warning(f"📍 **{dist}**: Increase Aadhaar Seva Kendra capacity by 20%.")
 
 # ------------------------------------------
 # SCREEN 4: DEMOGRAPHIC SCANNER
@@ -445,15 +502,16 @@ elif selected == "Demographic Scanner":
     st.title("👻 Demographic Scanner (Ghost Villages)")
     st.markdown("**Governance Question:** Which regions are aging and at risk of service exclusion?")
     
-    df = df_dict["ghost"]
+    ghost_districts = summary("ghost_districts")
     
-    if not df.empty:
-        st.metric("Ghost Villages Identified", len(df), "High Youth Exodus")
+    if kpi("ghost_villages", 0) > 0:
+        st.metric("Ghost Villages Identified", kpi("ghost_villages"), "High Youth Exodus")
         
         st.subheader("📊 Districts with Critical Elderly Dependency")
         
-        top_aging_dist = df.groupby('district')['elderly_pressure_median'].max().reset_index()
-        top_aging_dist = top_aging_dist.sort_values('elderly_pressure_median', ascending=False).head(12)
+        top_aging_dist = ghost_districts.head(12).rename(
+            columns={'District': 'district', 'Max Elderly Ratio': 'elderly_pressure_median'}
+        )
         
         fig = px.bar(
             top_aging_dist, 
@@ -469,12 +527,7 @@ elif selected == "Demographic Scanner":
         st.plotly_chart(fig, use_container_width=True)
         
         st.subheader("📋 Critical Intervention List")
-        critical_list = df.groupby('district').agg({
-            'elderly_pressure_median': 'max',
-            'pincode': 'count'
-        }).reset_index()
-        critical_list.columns = ['District', 'Max Elderly Ratio', 'Villages at Risk']
-        critical_list = critical_list.sort_values('Max Elderly Ratio', ascending=False).head(10)
+        critical_list = ghost_districts.head(10)
 
         st.dataframe(
             critical_list,
@@ -494,15 +547,12 @@ elif selected == "Digital Divide Overlay":
     st.title("📱 Digital Divide Overlay")
     st.markdown("**Governance Question:** Where will digital-only services fail?")
     
-    df = df_dict["digital"]
-    
-    if not df.empty:
-        st.error(f"🚨 ALERT: {len(df)} Digital Dark Zones detected with low biometric compliance.")
+    if kpi("digital_zones", 0) > 0:
+        st.error(f"🚨 ALERT: {kpi('digital_zones')} Digital Dark Zones detected with low biometric compliance.")
         
         st.subheader("🚑 Deployment Plan")
         
-        deploy_plan = df.groupby(['district', 'state', 'action']).size().reset_index(name='Zones')
-        deploy_plan = deploy_plan.sort_values('Zones', ascending=False).head(15)
+        deploy_plan = summary("digital_deploy").head(15)
         
         st.dataframe(
             deploy_plan,
@@ -517,7 +567,45 @@ elif selected == "Digital Divide Overlay":
         )
 
 # ------------------------------------------
-# SCREEN 6: IMPACT & OUTCOMES
+# SCREEN 6: PINCODE DRILL-DOWN
+# ------------------------------------------
+elif selected == "Pincode Drill-Down":
+    st.title("🔍 Pincode Drill-Down")
+    st.markdown("**Governance Question:** What does the daily history behind a flagged pincode look like?")
+
+    pin_store = get_pincode_store(current_version(STORE_FOLDER))
+
+    if pin_store is None:
+        st.info("Pincode history is not built yet. Run `featureaddition.py` to generate it.")
+    else:
+        pincode = st.text_input("Enter a 6-digit pincode", max_chars=6, placeholder="e.g. 585330")
+
+        if pincode:
+            history = pin_store.series(pincode)
+            if history is None:
+                st.warning(f"No daily history found for pincode {pincode}.")
+            else:
+                c1, c2, c3, c4 = st.columns(4)
+                with c1: st.metric("Days Recorded", len(history))
+                with c2: st.metric("Total Enrolment", f"{history['total_enrolment'].sum():,.0f}")
+                with c3: st.metric("Bio Updates", f"{history['total_bio_updates'].sum():,.0f}")
+                with c4: st.metric("Median Elderly Pressure", f"{history['elderly_pressure'].median():.2f}")
+
+                chart_titles = {
+                    'total_enrolment': "📈 Daily Enrolment",
+                    'enrol_velocity': "⚡ Enrolment Velocity",
+                    'elderly_pressure': "👴 Elderly Pressure",
+                    'total_bio_updates': "🖐️ Biometric Updates"
+                }
+                c_left, c_right = st.columns(2)
+                for i, (col, chart_title) in enumerate(chart_titles.items()):
+                    with (c_left if i % 2 == 0 else c_right):
+                        fig = px.line(history, y=col, title=chart_title, color_discrete_sequence=['#003366'])
+                        fig.update_layout(showlegend=False, height=300, margin={"r":0,"t":40,"l":0,"b":0})
+                        st.plotly_chart(fig, use_container_width=True)
+
+# ------------------------------------------
+# SCREEN 7: IMPACT & OUTCOMES
 # ------------------------------------------
 elif selected == "Impact & Outcomes":
     st.title("🏆 Impact & Outcomes")
@@ -552,16 +640,50 @@ elif selected == "Impact & Outcomes":
     st.subheader("📥 Export Official Reports")
     c_btn1, c_btn2, c_btn3 = st.columns(3)
     
+    exports = get_export_manager()
+
+    def export_button(kind, label, primary=False):
+        # Exports are written chunk by chunk in a worker process; the page only
+        # polls their status and hands the finished file to the browser.
+        status = exports.status(kind)
+        if status == "ready":
+            file_name, mime, reader = exports.download(kind)
+            st.download_button(f"⬇️ {label}", data=reader, file_name=file_name, mime=mime,
+                               type="primary" if primary else "secondary",
+                               on_click="ignore", use_container_width=True)
+        elif status == "running":
+            st.button(f"⏳ Preparing {label}...", disabled=True, use_container_width=True, key=f"wait_{kind}")
+            st.caption("Building in the background. Refresh in a moment.")
+        else:
+            if st.button(label, type="primary" if primary else "secondary",
+                         use_container_width=True, key=f"export_{kind}"):
+                exports.submit(kind)
+                st.rerun()
+            if status == "failed":
+                st.caption(f"⚠️ Last export failed: {exports.error(kind)}")
+
     with c_btn1:
-        st.button("📄 National Policy Brief (PDF)", type="primary", use_container_width=True)
+        export_button("policy_brief", "📄 National Policy Brief (PDF)", primary=True)
     with c_btn2:
-        st.button("📊 Export State-wise Audit Log (CSV)", use_container_width=True)
+        export_button("state_audit_log", "📊 Export State-wise Audit Log (CSV)")
     with c_btn3:
-        st.button("📉 Fraud Investigation Log", use_container_width=True)
+        export_button("fraud_log", "📉 Fraud Investigation Log")
 
     st.markdown("---")
     st.markdown("""
     <div style="text-align: center; color: #666; font-style: italic; margin-top: 50px;">
         "This dashboard does not display data. It enables decisions, interventions, and accountability."
     </div>
-    """, unsafe_allow_html=True)
\ No newline at end of file
+    """, unsafe_allow_html=True)
+
+# ==========================================
+# 6. MEMORY FOOTPRINT
+# ==========================================
+# Datasets and derived views are held once per server process; a session
+# only adds its own state (chat history, widget values) on top
+memory_slot.metric(
+    "Session Memory",
+    f"{memory_bytes(st.session_state.to_dict()) / 2**10:,.1f} KB",
+    f"Shared cache {data_store.shared_bytes() / 2**20:,.1f} MB",
+    delta_color="off"
+)
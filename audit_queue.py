@@ -0,0 +1,107 @@
+import pandas as pd
+import numpy as np
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# IsolationForest decision_function: the more negative, the more anomalous
+SEVERITY_BINS = [-np.inf, -0.10, -0.05, np.inf]
+SEVERITY_LABELS = ["Critical", "High", "Elevated"]
+
+# Columns the queue can be filtered / sorted on
+FILTER_FIELDS = ['status', 'state', 'district', 'severity']
+SORT_FIELDS = ['severity_score', 'total_txns', 'state', 'district', 'pincode']
+
+DEFAULT_PAGE_SIZE = 25
+
+# ==========================================
+# 1. DERIVED COLUMNS
+# ==========================================
+def severity_band(scores):
+    return pd.cut(scores, bins=SEVERITY_BINS, labels=SEVERITY_LABELS, right=False)
+
+def status_label(audit_status):
+    """'HIGH RISK - Action Required' -> 'HIGH RISK'"""
+    return audit_status.str.split(" - ").str[0]
+
+# ==========================================
+# 2. AUDIT QUEUE INDEX
+# ==========================================
+class AuditQueueIndex:
+    """
+    Posting lists (value -> row positions) per filter field plus a
+    precomputed sort order per sortable column over the fraud output.
+    A page request intersects the postings, walks the sort order and
+    materializes only the rows of the requested page.
+    """
+
+    def __init__(self, fraud_df):
+        df = fraud_df.reset_index(drop=True)
+        if not df.empty:
+            df = df.assign(
+                status=status_label(df['audit_status']),
+                severity=severity_band(df['severity_score'])
+            )
+        self.df = df
+        self.postings = {}
+        self.sort_orders = {}
+        if df.empty:
+            return
+
+        for field in FILTER_FIELDS:
+            self.postings[field] = {
+                value: positions for value, positions in df.groupby(field, observed=True).indices.items()
+            }
+        for field in SORT_FIELDS:
+            if field in df.columns:
+                values = df[field].astype(str) if df[field].dtype == object else df[field]
+                self.sort_orders[field] = np.argsort(values.to_numpy(), kind='stable')
+
+    def __len__(self):
+        return len(self.df)
+
+    def sortable(self):
+        return list(self.sort_orders)
+
+    def options(self, field, filters=None):
+        """Distinct values of `field` among rows matching `filters` (for dropdowns)."""
+        if field not in self.postings:
+            return []
+        rows = self.select(filters)
+        if rows is None:
+            values = list(self.postings[field])
+        else:
+            values = [v for v, pos in self.postings[field].items() if np.intersect1d(pos, rows).size]
+        if field == 'severity':
+            return [v for v in SEVERITY_LABELS if v in values]
+        return sorted(values, key=str)
+
+    def select(self, filters):
+        """Row positions matching every (field -> value) filter; None means all rows."""
+        positions = None
+        for field, value in (filters or {}).items():
+            if value is None:
+                continue
+            hits = self.postings.get(field, {}).get(value, np.empty(0, dtype=np.intp))
+            positions = hits if positions is None else np.intersect1d(positions, hits, assume_unique=True)
+        return positions
+
+    def page(self, filters=None, sort_by='severity_score', ascending=True,
+             page=1, page_size=DEFAULT_PAGE_SIZE):
+        """Returns (rows of the requested page, total matching rows)."""
+        if self.df.empty:
+            return self.df, 0
+
+        order = self.sort_orders.get(sort_by, np.arange(len(self.df)))
+        if not ascending:
+            order = order[::-1]
+
+        selected = self.select(filters)
+        if selected is not None:
+            mask = np.zeros(len(self.df), dtype=bool)
+            mask[selected] = True
+            order = order[mask[order]]
+
+        total = len(order)
+        start = (max(page, 1) - 1) * page_size
+        return self.df.iloc[order[start:start + page_size]], total
@@ -0,0 +1,268 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+from synthetic_data import generate, DEFAULT_DAYS
+from instrumentation import REPORT_FOLDER
+from compute_backend import PandasBackend, DuckDBBackend
+from master_time_aware_engine import (INPUT_FILE, ENGINE_SPECS, HORIZONS,
+                                      OUTPUT_FRAUD, OUTPUT_BOOM, OUTPUT_GHOST, OUTPUT_DIGITAL)
+import changepoint_engine
+import forecast_engine
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCH_FOLDER = "bench_runs"
+RESULTS_FILE = "benchmark_results.json"
+
+DEFAULT_SCALES = [1_000_000, 10_000_000, 100_000_000]
+
+# Pipeline stages, in run order (each one reads the previous stage's output)
+STAGES = [
+    "merge.py",
+    "featureaddition.py",
+    "engine1analysis.py",
+    "engine2_fraud_detection.py",
+    "master_time_aware_engine.py",
+    "changepoint_engine.py",
+    "forecast_engine.py"
+]
+
+# A stage regresses if it is this much slower / hungrier than the baseline
+DEFAULT_TOLERANCE = 0.20
+
+# binned_totals() calls the engines make: (column, bin days, window days)
+BINNED_CHECKS = [(changepoint_engine.VALUE_COLUMN, changepoint_engine.BIN_DAYS, changepoint_engine.HORIZON_DAYS)] + \
+                [(col, 1, None) for col in forecast_engine.TARGETS.values()]
+
+# partitioned_pipeline.py must reproduce the single-node detection outputs under each key
+PARTITION_MODES = ["state", "prefix"]
+DETECTION_OUTPUTS = [OUTPUT_FRAUD, OUTPUT_BOOM, OUTPUT_GHOST, OUTPUT_DIGITAL]
+
+# ==========================================
+# 1. STAGE RUNNER
+# ==========================================
+def run_stage(script, workdir, log_path):
+    """
+    Runs one pipeline script in `workdir` and returns its wall time and
+    peak RSS. wait4() gives the rusage of exactly this child, so the peak
+    is per stage rather than the high-water mark of the whole benchmark.
+    Where there is no wait4 (Windows) the peak is the one the script's own
+    run report sampled, and CPU time is not measured.
+    """
+    # A stale report from an earlier run must not stand in for this one
+    report_path = os.path.join(workdir, REPORT_FOLDER, script.replace(".py", "_latest.json"))
+    if os.path.exists(report_path):
+        os.remove(report_path)
+
+    with open(log_path, "w") as log:
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, script)],
+                                cwd=workdir, stdout=log, stderr=subprocess.STDOUT)
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(proc.pid, 0)
+        else:
+            proc.wait()
+            usage = None
+        wall = time.perf_counter() - start
+
+    if usage is None:
+        return {
+            "stage": script,
+            "returncode": proc.returncode,
+            "wall_seconds": round(wall, 3),
+            "cpu_seconds": None,
+            "peak_rss_mb": sampled_peak_mb(report_path)
+        }
+    proc.returncode = os.waitstatus_to_exitcode(status)
+
+    # ru_maxrss is KB on Linux, bytes on macOS
+    peak_kb = usage.ru_maxrss / 1024 if sys.platform == "darwin" else usage.ru_maxrss
+    return {
+        "stage": script,
+        "returncode": proc.returncode,
+        "wall_seconds": round(wall, 3),
+        "cpu_seconds": round(usage.ru_utime + usage.ru_stime, 3),
+        "peak_rss_mb": round(peak_kb / 1024, 1)
+    }
+
+def sampled_peak_mb(report_path):
+    """process_peak_rss_mb from the script's run report (0.0 if it wrote none)."""
+    try:
+        with open(report_path) as fh:
+            return json.load(fh).get("process_peak_rss_mb", 0.0)
+    except (OSError, ValueError):
+        return 0.0
+
+def benchmark_scale(rows, days, reuse=False, keep=False, check=False):
+    workdir = os.path.join(BENCH_FOLDER, f"rows_{rows}")
+    data_folder = os.path.join(workdir, "DataFolder")
+
+    print(f"\n--- 📏 Scale: {rows:,} rows ---")
+    if not (reuse and os.path.isdir(data_folder)):
+        shutil.rmtree(workdir, ignore_errors=True)
+        start = time.perf_counter()
+        generate(data_folder, total_rows=rows, days=days)
+        print(f"   🧪 Generated in {time.perf_counter() - start:.1f}s")
+
+    results, failures = [], []
+    for script in STAGES:
+        log_path = os.path.join(workdir, script.replace(".py", ".log"))
+        result = run_stage(script, workdir, log_path)
+        result["rows"] = rows
+        # Per-step breakdown written by the script's own RunReport (instrumentation.py)
+        report_path = os.path.join(workdir, REPORT_FOLDER, script.replace(".py", "_latest.json"))
+        if os.path.exists(report_path):
+            with open(report_path) as fh:
+                result["sub_stages"] = json.load(fh)["stages"]
+        results.append(result)
+        print(f"   ⏱️ {script:<30} {result['wall_seconds']:>9.1f}s  {result['peak_rss_mb']:>9.1f} MB")
+        if result["returncode"] != 0:
+            print(f"   ❌ {script} failed (exit {result['returncode']}), see {log_path}")
+            break
+    else:  # every stage ran
+        if check:
+            failures = run_checks(workdir, rows)
+
+    if not keep:
+        shutil.rmtree(data_folder, ignore_errors=True)
+    return results, failures
+
+# ==========================================
+# 2. EQUIVALENCE CHECKS
+# ==========================================
+def compare(label, expected, actual, failures):
+    try:
+        pd.testing.assert_frame_equal(expected, actual, check_exact=True)
+    except AssertionError as err:
+        failures.append(f"{label}: {str(err).splitlines()[0]}")
+
+def check_backends(workdir):
+    """
+    DuckDB must give exactly the pandas answer, so switching
+    $DRISHTI_BACKEND never changes a flag: every ENGINE_SPECS grouping at
+    its horizon, and every binned_totals() series the engines read.
+    """
+    path = os.path.join(workdir, INPUT_FILE)
+    pandas_backend, duckdb_backend = PandasBackend(path), DuckDBBackend(path)
+    failures = []
+    for engine, spec in ENGINE_SPECS.items():
+        compare(f"duckdb {engine} stats", pandas_backend.pincode_stats(spec, HORIZONS[engine]),
+                duckdb_backend.pincode_stats(spec, HORIZONS[engine]), failures)
+    for col, bin_days, window_days in BINNED_CHECKS:
+        compare(f"duckdb {col} x {bin_days}d bins", pandas_backend.binned_totals(col, bin_days, window_days),
+                duckdb_backend.binned_totals(col, bin_days, window_days), failures)
+    return failures
+
+def check_partitioned(workdir, by):
+    """
+    Runs partitioned_pipeline.py over the same dumps in its own folder and
+    compares its detection outputs with the single-node ones in `workdir`.
+    """
+    out = os.path.join(workdir, f"partitioned_{by}")
+    shutil.rmtree(out, ignore_errors=True)
+    os.makedirs(out)
+    log_path = os.path.join(workdir, f"partitioned_{by}.log")
+    with open(log_path, "w") as log:
+        code = subprocess.call([sys.executable, os.path.join(REPO_DIR, "partitioned_pipeline.py"), "run",
+                                "--data", os.path.abspath(os.path.join(workdir, "DataFolder")), "--by", by],
+                               cwd=out, stdout=log, stderr=subprocess.STDOUT)
+    if code != 0:
+        return [f"partitioned --by {by} failed (exit {code}), see {log_path}"]
+
+    failures = []
+    for name in DETECTION_OUTPUTS:
+        single, partitioned = os.path.join(workdir, name), os.path.join(out, name)
+        if os.path.exists(single) != os.path.exists(partitioned):
+            failures.append(f"partitioned --by {by} {name}: written by only one of the two runs")
+        elif os.path.exists(single):
+            compare(f"partitioned --by {by} {name}", pd.read_csv(single), pd.read_csv(partitioned), failures)
+    shutil.rmtree(out, ignore_errors=True)
+    return failures
+
+def run_checks(workdir, rows):
+    """Runs the equivalence checks on the outputs of a finished scale."""
+    found = check_backends(workdir)
+    for by in PARTITION_MODES:
+        found += check_partitioned(workdir, by)
+    failures = [f"{rows:,} rows: {line}" for line in found]
+    for line in failures:
+        print(f"   ❌ {line}")
+    if not failures:
+        print(f"   ✅ DuckDB matches pandas, and partitioned runs (by {', '.join(PARTITION_MODES)}) match single-node")
+    return failures
+
+# ==========================================
+# 3. REGRESSION CHECK
+# ==========================================
+def find_regressions(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Stages whose wall time or peak RSS exceed the baseline by more than `tolerance`."""
+    previous = {(r["rows"], r["stage"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        base = previous.get((r["rows"], r["stage"]))
+        if base is None or r["returncode"] != 0:
+            continue
+        for metric in ("wall_seconds", "peak_rss_mb"):
+            if base[metric] > 0 and r[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{r['stage']} @ {r['rows']:,} rows: {metric} "
+                                   f"{base[metric]} -> {r[metric]} (+{r[metric] / base[metric] - 1:.0%})")
+    return regressions
+
+# ==========================================
+# EXECUTION
+# ==========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark on synthetic data.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="total raw rows per run")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS)
+    parser.add_argument("--out", default=RESULTS_FILE)
+    parser.add_argument("--baseline", help="previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--reuse", action="store_true", help="reuse generated data from a previous run")
+    parser.add_argument("--keep", action="store_true", help="keep generated data after the run")
+    parser.add_argument("--check", action="store_true",
+                        help="also check that DuckDB and partitioned runs match the single-node pandas run")
+    args = parser.parse_args()
+
+    print(f"🚀 Benchmarking {len(STAGES)} stages at {', '.join(f'{s:,}' for s in args.scales)} rows...")
+    results, failures = [], []
+    for rows in args.scales:
+        scale_results, scale_failures = benchmark_scale(rows, args.days, args.reuse, args.keep, args.check)
+        results.extend(scale_results)
+        failures.extend(scale_failures)
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+        "check_failures": failures
+    }
+    with open(args.out, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"\n💾 Results saved to {args.out}")
+
+    if failures:
+        print(f"🚨 {len(failures)} equivalence check(s) failed")
+        sys.exit(1)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            regressions = find_regressions(results, json.load(fh), args.tolerance)
+        if regressions:
+            print(f"🚨 {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"   - {line}")
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
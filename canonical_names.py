@@ -0,0 +1,295 @@
+import pandas as pd
+import numpy as np
+import glob
+import os
+import re
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# Real district aliases (different names for one district, e.g. "Aurangabad(BH)"),
+# curated by hand; spelling variants of one name are folded automatically
+DISTRICT_TABLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "canonical_districts.csv")
+# Rows whose state column holds a locality instead of a state, keyed on pincode
+REPAIR_TABLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "location_repairs.csv")
+SAMPLE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Raw_Datasets")
+
+# Canonical state name -> spellings seen in the dumps that a case / spacing /
+# "&" vs "and" comparison alone would not catch. Canonical names are the
+# ones the dashboard map (GeoJSON ST_NM) uses.
+STATE_ALIASES = {
+    "Andaman & Nicobar Island": ["Andaman and Nicobar Islands", "Andaman & Nicobar Islands"],
+    "Andhra Pradesh": [],
+    "Arunachal Pradesh": [],
+    "Assam": [],
+    "Bihar": [],
+    "Chandigarh": [],
+    "Chhattisgarh": ["Chattisgarh"],
+    "Dadra and Nagar Haveli and Daman and Diu": [
+        "Dadra and Nagar Haveli", "Daman and Diu", "The Dadra and Nagar Haveli and Daman and Diu"
+    ],
+    "Goa": [],
+    "Gujarat": [],
+    "Haryana": [],
+    "Himachal Pradesh": [],
+    "Jammu & Kashmir": [],
+    "Jharkhand": [],
+    "Karnataka": [],
+    "Kerala": [],
+    "Ladakh": [],
+    "Lakshadweep": [],
+    "Madhya Pradesh": [],
+    "Maharashtra": [],
+    "Manipur": [],
+    "Meghalaya": [],
+    "Mizoram": [],
+    "Nagaland": [],
+    "NCT of Delhi": ["Delhi", "New Delhi"],
+    "Odisha": ["Orissa"],
+    "Puducherry": ["Pondicherry"],
+    "Punjab": [],
+    "Rajasthan": [],
+    "Sikkim": [],
+    "Tamil Nadu": [],
+    "Telangana": [],
+    "Tripura": [],
+    "Uttar Pradesh": [],
+    "Uttarakhand": ["Uttaranchal"],
+    "West Bengal": ["West Bangal"]
+}
+
+# ==========================================
+# 1. NAME KEYS
+# ==========================================
+# Unicode dashes, and the "â€“" a UTF-8 en dash turns into when read as Latin-1
+DASHES = re.compile(r"â[^A-Za-z0-9\s]{0,2}|[\u2010-\u2015\u2212]")
+CONNECTORS = {"and", "of", "the"}
+
+def tidy(name):
+    """Trims, collapses runs of spaces, drops the trailing '*' footnote marker
+    and writes every kind of dash as '-'."""
+    return re.sub(r"\s+", " ", DASHES.sub("-", str(name).replace("*", ""))).strip()
+
+UNITS = ["zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine",
+         "ten", "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen",
+         "seventeen", "eighteen", "nineteen"]
+TENS = ["twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety"]
+NUMBER_WORDS = {word: n for n, word in enumerate(UNITS)}
+NUMBER_WORDS.update({word: 20 + 10 * i for i, word in enumerate(TENS)})
+
+def numbers_as_digits(words):
+    """['south', 'twenty', 'four', 'parganas'] -> ['south', '24', 'parganas']."""
+    out, tens = [], False
+    for word in words:
+        n = NUMBER_WORDS.get(word)
+        if n is not None and tens and 0 < n < 10:
+            out[-1] = str(int(out[-1]) + n)          # "twenty" + "four"
+        else:
+            out.append(word if n is None else str(n))
+        tens = word in TENS
+    return out
+
+def name_key(name):
+    """
+    Spelling-insensitive key: 'West  bengal', 'WESTBENGAL' -> 'westbengal'.
+    Numbers count the same as digits or words: 'South 24 Parganas',
+    'South Twenty Four Parganas' -> 'south24parganas'.
+    """
+    words = re.findall(r"[a-z]+|[0-9]+", str(name).lower().replace("&", " and "))
+    return "".join(numbers_as_digits(words))
+
+STATE_LOOKUP = {}
+for canonical, aliases in STATE_ALIASES.items():
+    for spelling in [canonical] + aliases:
+        STATE_LOOKUP[name_key(spelling)] = canonical
+
+def canonical_state(name):
+    return STATE_LOOKUP.get(name_key(name), tidy(name))
+
+def load_district_table(path=DISTRICT_TABLE):
+    """(canonical state, name key) -> canonical district, for the aliases and
+    for the canonical spellings themselves (so those win the fold)."""
+    if not os.path.exists(path):
+        return {}
+    table = pd.read_csv(path, dtype=str)
+    lookup = {}
+    for state, variant, district in table[['state', 'variant', 'district']].itertuples(index=False):
+        lookup[(state, name_key(variant))] = district
+        lookup[(state, name_key(district))] = district
+    return lookup
+
+DISTRICT_LOOKUP = load_district_table()
+
+def canonical_district(state, name):
+    """Alias target or tidied spelling; variants of one name are folded by
+    canonicalize_locations, which sees all of them."""
+    clean = tidy(name)
+    return DISTRICT_LOOKUP.get((state, name_key(clean)), clean)
+
+def spelling_rank(name):
+    """
+    Sort key for the spellings of one (state, name key); the smallest wins.
+    Mixed case over ALL-CAPS / all-lower, then capitalised words, then the
+    fewest spaces and punctuation ("Karimnagar" over "Karim Nagar"), then
+    alphabetical. It depends on the spelling alone, so the winner over any
+    union of datasets or partitions is the winner of their winners.
+    """
+    words = [w for w in re.split(r"[^A-Za-z]+", name) if w and w.lower() not in CONNECTORS]
+    return (
+        name.isupper() or name.islower(),
+        sum(w[0].islower() for w in words),
+        sum(not (c.isalpha() or c.isspace()) for c in name) + name.count(" "),
+        name
+    )
+
+def fold_spellings(states, districts):
+    """(state, name key) -> chosen spelling over the given pairs."""
+    best = {}
+    for state, district in zip(states, districts):
+        if pd.isna(state) or pd.isna(district):
+            continue
+        key = (state, name_key(district))
+        if key not in best or spelling_rank(district) < spelling_rank(best[key]):
+            best[key] = district
+    return best
+
+def load_repairs(path=REPAIR_TABLE):
+    """(pincode, name key of the state seen) -> (state, district)."""
+    if not os.path.exists(path):
+        return {}
+    table = pd.read_csv(path, dtype=str)
+    return {(int(pin), name_key(seen)): (state, district)
+            for pin, seen, state, district in table[['pincode', 'seen_state', 'state', 'district']].itertuples(index=False)}
+
+LOCATION_REPAIRS = load_repairs()
+
+# ==========================================
+# 2. INGEST-TIME CANONICALIZATION
+# ==========================================
+def repair_locations(df, state_col='state', district_col='district', pincode_col='pincode'):
+    """
+    Rewrites the rows listed in location_repairs.csv (a locality typed into
+    the state column) to the state and district of their pincode. Runs
+    before validation, which would otherwise quarantine them as unknown
+    states. Only rows whose state spelling is in the table are looked at.
+    """
+    if df.empty or not LOCATION_REPAIRS or not {state_col, district_col, pincode_col} <= set(df.columns):
+        return df
+    seen = {key for _, key in LOCATION_REPAIRS}
+    codes, uniques = pd.factorize(df[state_col])
+    suspects = [i for i, s in enumerate(uniques) if name_key(s) in seen]
+    rows = np.flatnonzero(np.isin(codes, suspects))
+    if not len(rows):
+        return df
+
+    pins = pd.to_numeric(df[pincode_col].iloc[rows], errors='coerce')
+    keys = [name_key(s) for s in df[state_col].iloc[rows]]
+    fixes = [LOCATION_REPAIRS.get((int(p), k)) if pd.notna(p) else None for p, k in zip(pins, keys)]
+    hit = [i for i, fix in enumerate(fixes) if fix is not None]
+    if hit:
+        positions = rows[hit]
+        df = df.copy()
+        df.iloc[positions, df.columns.get_loc(state_col)] = [fixes[i][0] for i in hit]
+        df.iloc[positions, df.columns.get_loc(district_col)] = [fixes[i][1] for i in hit]
+    return df
+
+def canonicalize_locations(df, state_col='state', district_col='district', spellings=None):
+    """
+    Rewrites state / district columns to their canonical spelling. The
+    lookup runs once per distinct (state, district) pair; rows are then
+    remapped through integer codes, and the columns come back as
+    categoricals. District variants of one (state, name key) are folded to
+    one spelling (spelling_rank) over the pairs in `df`, plus `spellings`
+    ((state, key) -> spelling) chosen from other frames, if given. The
+    caller's frame is left as it was; a shallow copy gets the new columns.
+    """
+    if df.empty or state_col not in df.columns:
+        return df
+    df = df.copy(deep=False)
+
+    if district_col not in df.columns:
+        codes, uniques = pd.factorize(df[state_col])
+        states = pd.Index([canonical_state(s) for s in uniques])
+        new_cats, remap = np.unique(states, return_inverse=True)
+        df[state_col] = pd.Categorical.from_codes(
+            np.where(codes >= 0, remap[codes], -1), categories=new_cats
+        )
+        return df
+
+    pairs = pd.MultiIndex.from_arrays([df[state_col], df[district_col]])
+    codes, uniques = pairs.factorize()
+
+    states, districts = [], []
+    for state, district in uniques:
+        state = canonical_state(state) if pd.notna(state) else np.nan
+        states.append(state)
+        districts.append(canonical_district(state, district) if pd.notna(district) else np.nan)
+
+    best = fold_spellings(states, districts)
+    for key, district in (spellings or {}).items():
+        if key in best and spelling_rank(district) < spelling_rank(best[key]):
+            best[key] = district
+    districts = [best.get((s, name_key(d)), d) if pd.notna(s) and pd.notna(d) else d
+                 for s, d in zip(states, districts)]
+
+    for col, values in ((state_col, states), (district_col, districts)):
+        cat = pd.Categorical(values)
+        pair_codes = cat.codes  # canonical code of each distinct pair
+        df[col] = pd.Categorical.from_codes(
+            np.where(codes >= 0, pair_codes[codes], -1), categories=cat.categories
+        )
+    return df
+
+def align_districts(frames, state_col='state', district_col='district'):
+    """
+    Frames canonicalized separately (one per dataset, or per partition)
+    each folded over their own spellings; this refolds them over the union
+    so a district is spelled the same in all of them. Only the distinct
+    pairs are compared, so it costs one factorize per frame.
+    """
+    present = [df for df in frames if not df.empty and {state_col, district_col} <= set(df.columns)]
+    if len(present) < 2:
+        return frames
+    states, districts = [], []
+    for df in present:
+        pairs = pd.MultiIndex.from_arrays([df[state_col], df[district_col]]).unique()
+        states.extend(pairs.get_level_values(0))
+        districts.extend(pairs.get_level_values(1))
+    spellings = fold_spellings(states, districts)
+    return [canonicalize_locations(df, state_col, district_col, spellings)
+            if any(df is p for p in present) else df
+            for df in frames]
+
+# ==========================================
+# 3. SPELLING REPORT
+# ==========================================
+def spelling_report(frames):
+    """
+    Every (state, name key) with more than one spelling in the raw dumps,
+    and the spelling ingest folds them to. Names that fold wrongly, or two
+    names for one district, belong in canonical_districts.csv.
+    """
+    pairs = pd.concat([f[['state', 'district']] for f in frames], ignore_index=True).dropna().drop_duplicates()
+    pairs['state'] = pairs['state'].map(canonical_state)
+    pairs['district'] = [canonical_district(s, d) for s, d in zip(pairs['state'], pairs['district'])]
+    pairs = pairs.drop_duplicates()
+    best = fold_spellings(pairs['state'], pairs['district'])
+    pairs['folded'] = [best[(s, name_key(d))] for s, d in zip(pairs['state'], pairs['district'])]
+    folded = pairs[pairs.groupby(['state', 'folded'])['district'].transform('nunique') > 1]
+    return folded.sort_values(['state', 'folded', 'district']).reset_index(drop=True)
+
+# ==========================================
+# EXECUTION
+# ==========================================
+# python canonical_names.py [folder] -> list the district spellings ingest folds together
+if __name__ == "__main__":
+    import sys
+    folder = sys.argv[1] if len(sys.argv) > 1 else SAMPLE_FOLDER
+    files = glob.glob(os.path.join(folder, "**", "*.csv"), recursive=True)
+    print(f"🔤 Scanning {len(files)} files in '{folder}' for district spellings...")
+    frames = [pd.read_csv(f, usecols=['state', 'district'], dtype=str) for f in files]
+    report = spelling_report(frames)
+    for (state, folded), group in report.groupby(['state', 'folded'], sort=False):
+        variants = ", ".join(v for v in group['district'] if v != folded)
+        print(f"   {state}: {variants} --> {folded}")
+    print(f"✅ {report['folded'].nunique()} districts with several spellings")
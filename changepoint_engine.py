@@ -0,0 +1,160 @@
+import pandas as pd
+import numpy as np
+from compute_backend import get_backend
+from instrumentation import RunReport
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+INPUT_FILE = "aadhaar_features_ready_for_ML.csv"
+OUTPUT_ONSET = "engine_boom_onset.csv"
+
+VALUE_COLUMN = 'total_enrolment'
+BIN_DAYS = 7                 # Daily counts are mostly zero; weekly totals are stable
+HORIZON_DAYS = None          # None = whole history (the baseline needs the past)
+
+MIN_SEGMENT_BINS = 8         # At least 8 weeks on each side of an onset
+SCORE_THRESHOLD = 5.0        # Standardized CUSUM score (~ sigmas of evidence)
+MIN_GROWTH = 1.5             # After-onset rate must be 1.5x the before rate
+MIN_AFTER_RATE = 1.0         # Noise filter: enrolments per day after onset
+
+# ==========================================
+# 1. PINCODE x TIME MATRIX
+# ==========================================
+def pincode_bin_matrix(binned):
+    """
+    Dense (pincode x bin) matrix of totals from backend.binned_totals()
+    output, oldest bin first. Built with one bincount, so the cost is
+    linear in the number of (pincode, bin) rows.
+    """
+    codes, pincodes = pd.factorize(binned['pincode'], sort=True)
+    n_bins = int(binned['bin'].max()) + 1
+    column = n_bins - 1 - binned['bin'].to_numpy()
+    flat = np.bincount(codes * n_bins + column, weights=binned['total'].to_numpy(dtype=float),
+                       minlength=len(pincodes) * n_bins)
+    matrix = flat.reshape(len(pincodes), n_bins)
+    # The oldest bin is usually cut short by the start of the data; drop it
+    return np.asarray(pincodes), matrix[:, 1:]
+
+# ==========================================
+# 2. VECTORIZED CUSUM (all pincodes at once)
+# ==========================================
+def noise_scale(X):
+    """Per-row noise sigma from the MAD of first differences, which a level
+    shift barely moves (falls back to the plain std for very sparse rows)."""
+    diffs = np.diff(X, axis=1)
+    sigma = np.median(np.abs(diffs - np.median(diffs, axis=1, keepdims=True)), axis=1) / 0.6745 / np.sqrt(2)
+    fallback = diffs.std(axis=1) / np.sqrt(2)
+    return np.where(sigma > 0, sigma, fallback)
+
+def detect_change_points(X, min_segment=MIN_SEGMENT_BINS):
+    """
+    Offline CUSUM for one upward mean shift per row of X (pincode x time).
+
+    For every split k the cumulative deviation from the row mean,
+    C_k = S_k - k * S_n / n, is most negative where the level steps up.
+    Scaling by sqrt(n / (k (n - k))) and the noise sigma turns it into the
+    likelihood-ratio score of a shift at k, so splits near the edges are
+    not favoured. Everything is a cumsum / argmax along axis 1: O(pincodes x bins).
+
+    Returns onset column, mean before / after and the score per row.
+    """
+    n_rows, n = X.shape
+    S = np.cumsum(X, axis=1)
+    k = np.arange(1, n + 1)
+    total = S[:, -1:]
+
+    C = S - k * total / n
+    weight = np.sqrt(n / (k * np.maximum(n - k, 1)))
+    sigma = noise_scale(X)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        score = -C * weight / sigma[:, None]
+    score[:, :min_segment - 1] = -np.inf
+    score[:, n - min_segment:] = -np.inf
+    score[~np.isfinite(score)] = -np.inf
+
+    split = score.argmax(axis=1)                       # last bin before the shift
+    best = score[np.arange(n_rows), split]
+    before_n = split + 1
+    before = S[np.arange(n_rows), split] / before_n
+    after = (total[:, 0] - S[np.arange(n_rows), split]) / (n - before_n)
+    return {
+        "onset_bin": before_n,
+        "before": before,
+        "after": after,
+        "score": np.where(np.isfinite(best), best, 0.0)
+    }
+
+def onset_dates(onset_bin, n_bins, latest, bin_days=BIN_DAYS):
+    """First day of each onset bin (bins end on `latest`, oldest first)."""
+    bins_back = n_bins - onset_bin                     # 1 = most recent full bin
+    return latest - pd.to_timedelta(bins_back * bin_days - 1, unit='D')
+
+def run_onset_engine(backend, run, value_col=VALUE_COLUMN, bin_days=BIN_DAYS,
+                     horizon_days=HORIZON_DAYS, min_segment=MIN_SEGMENT_BINS):
+    """Onset date and magnitude for every pincode whose level shifted up."""
+    with run.stage("groupby.binned") as s:
+        binned = backend.binned_totals(value_col, bin_days, window_days=horizon_days)
+        s.rows_out = len(binned)
+    if binned.empty:
+        return pd.DataFrame()
+
+    with run.stage("matrix", rows_in=len(binned)) as s:
+        pincodes, X = pincode_bin_matrix(binned)
+        X = X / bin_days                               # per-day rates
+        s.rows_out = X.size
+    if X.shape[1] < 2 * min_segment:
+        print(f"   ⚠️ Only {X.shape[1]} bins of history; need {2 * min_segment}.")
+        return pd.DataFrame()
+
+    with run.stage("cusum", rows_in=X.shape[0]) as s:
+        cp = detect_change_points(X, min_segment)
+        growth = cp["after"] / np.maximum(cp["before"], 1.0 / bin_days)
+        hit = ((cp["score"] > SCORE_THRESHOLD) & (growth >= MIN_GROWTH) &
+               (cp["after"] >= MIN_AFTER_RATE))
+        s.rows_out = int(hit.sum())
+
+    onsets = pd.DataFrame({
+        'pincode': pincodes[hit],
+        'onset_date': onset_dates(cp["onset_bin"][hit], X.shape[1], backend.latest_date(), bin_days),
+        'before_rate': cp["before"][hit].round(3),
+        'after_rate': cp["after"][hit].round(3),
+        'magnitude': (cp["after"] - cp["before"])[hit].round(3),
+        'growth': growth[hit].round(3),
+        'cusum_score': cp["score"][hit].round(3)
+    })
+
+    # Label each pincode with its busiest (state, district)
+    with run.stage("groupby.locations") as s:
+        places = backend.pincode_stats({"volume": (value_col, 'sum')}, window_days=horizon_days)
+        places = (places.sort_values('volume', ascending=False, kind='stable')
+                        .drop_duplicates('pincode')[['state', 'district', 'pincode']])
+        s.rows_out = len(places)
+
+    onsets = places.merge(onsets, on='pincode', how='inner')
+    return onsets.sort_values('cusum_score', ascending=False, kind='stable').reset_index(drop=True)
+
+# ==========================================
+# EXECUTION
+# ==========================================
+if __name__ == "__main__":
+    run = RunReport("changepoint_engine")
+
+    print(f"🚀 Loading Master Dataset: {INPUT_FILE}...")
+    with run.stage("load") as s:
+        backend = get_backend(INPUT_FILE)
+        s.rows_out = len(backend)
+    print(f"   ⚙️ Compute Backend: {backend.name}")
+    print(f"   📅 Data Reference Date: {backend.latest_date().date()}")
+
+    print(f"\n--- 📈 Running Change-Point Engine ({BIN_DAYS}-day bins, CUSUM) ---")
+    onsets = run_onset_engine(backend, run)
+    print(f"   📈 Found {len(onsets)} Pincodes with a Boom Onset")
+    if not onsets.empty:
+        recent = onsets['onset_date'].max().date()
+        print(f"   🗓️ Onsets span {onsets['onset_date'].min().date()} .. {recent}")
+
+    with run.stage("save.onset", rows_in=len(onsets)):
+        onsets.to_csv(OUTPUT_ONSET, index=False)
+    print(f"   💾 Saved to {OUTPUT_ONSET}")
+    print(f"📊 Run report: {run.save()}")
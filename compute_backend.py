@@ -0,0 +1,184 @@
+import pandas as pd
+import os
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# Pick the aggregation engine: "pandas" (in memory) or "duckdb" (out of core)
+BACKEND_ENV = "DRISHTI_BACKEND"
+DEFAULT_BACKEND = "pandas"
+
+GROUP_KEYS = ['state', 'district', 'pincode']
+
+# Aggregation functions an engine spec may use.
+# Spec format: {output_column: (input_column, func)}
+AGG_FUNCS = ['sum', 'mean', 'median', 'max', 'q3']
+
+def columnar_path(csv_path):
+    """Parquet copy written next to a CSV (featureaddition.py writes one)."""
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+# ==========================================
+# 1. PANDAS BACKEND (whole table in memory)
+# ==========================================
+class PandasBackend:
+    name = "pandas"
+
+    def __init__(self, path=None, df=None, reference_date=None):
+        # reference_date pins "latest" for a partition of a larger dataset,
+        # so its windows line up with the full run (partitioned_pipeline.py)
+        self.reference_date = reference_date
+        if df is None:
+            parquet = columnar_path(path)
+            if os.path.exists(parquet):
+                df = pd.read_parquet(parquet)
+            else:
+                # Correctly rounded parsing, so CSV floats match DuckDB bit for bit
+                df = pd.read_csv(path, float_precision='round_trip')
+        if not pd.api.types.is_datetime64_any_dtype(df['date']):
+            df = df.assign(date=pd.to_datetime(df['date']))
+        self.df = df
+
+    def __len__(self):
+        return len(self.df)
+
+    def latest_date(self):
+        if self.reference_date is not None:
+            return pd.Timestamp(self.reference_date)
+        return self.df['date'].max()
+
+    def window(self, days=None):
+        if days is None:
+            return self.df
+        cutoff = self.latest_date() - pd.Timedelta(days=days)
+        return self.df[self.df['date'] >= cutoff]
+
+    def pincode_stats(self, spec, window_days=None):
+        """Per (state, district, pincode) aggregates over the last `window_days`."""
+        # observed=True: categorical name columns group like plain strings
+        grouped = self.window(window_days).groupby(GROUP_KEYS, observed=True)
+        out = {}
+        for name, (col, func) in spec.items():
+            if func == 'q3':
+                # Robust velocity: 75th percentile (linear interpolation)
+                out[name] = grouped[col].quantile(0.75)
+            else:
+                out[name] = grouped[col].agg(func)
+        return pd.DataFrame(out).reset_index()
+
+    def binned_totals(self, col, bin_days=7, window_days=None):
+        """Per-pincode sum of `col` in `bin_days` buckets counted back from the
+        latest date (bin 0 = the most recent bucket)."""
+        df = self.window(window_days)
+        df = df[df['pincode'].notna()]
+        bins = (self.latest_date() - df['date']).dt.days // bin_days
+        totals = df[col].groupby([df['pincode'], bins.rename('bin')]).sum()
+        return totals.rename('total').reset_index()
+
+# ==========================================
+# 2. DUCKDB BACKEND (embedded SQL over the columnar file)
+# ==========================================
+def sql_string(value):
+    """Single-quoted SQL literal. Views cannot take bound parameters, so file
+    paths and settings are quoted here instead."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+SQL_AGGS = {
+    'sum':    "COALESCE(SUM({c}), 0)",
+    'mean':   "FSUM({c}) / COUNT({c})",   # Kahan sum, like pandas' group mean
+    'median': "QUANTILE_CONT({c}, 0.5)",
+    'max':    "MAX({c})",
+    'q3':     "QUANTILE_CONT({c}, 0.75)"
+}
+
+class DuckDBBackend:
+    """
+    Runs the same per-pincode aggregations as PandasBackend inside DuckDB,
+    streaming over the Parquet (or CSV) features file, so the table never
+    has to fit in pandas memory. Results are re-sorted and cast to match
+    the pandas path column for column.
+    """
+    name = "duckdb"
+
+    def __init__(self, path, memory_limit=None, threads=None):
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError(f"{BACKEND_ENV}=duckdb needs the 'duckdb' package (pip install duckdb)")
+
+        self.con = duckdb.connect()
+        if memory_limit:
+            self.con.execute(f"SET memory_limit = {sql_string(memory_limit)}")
+        if threads:
+            self.con.execute(f"SET threads = {int(threads)}")
+
+        parquet = columnar_path(path)
+        if os.path.exists(parquet):
+            source = f"read_parquet({sql_string(parquet)})"
+        else:
+            source = f"read_csv_auto({sql_string(path)}, header=true)"
+        self.con.execute(f"""
+            CREATE VIEW features AS
+            SELECT * REPLACE (CAST(date AS TIMESTAMP) AS date) FROM {source}
+        """)
+        self._latest = None
+
+    def __len__(self):
+        return self.con.execute("SELECT COUNT(*) FROM features").fetchone()[0]
+
+    def latest_date(self):
+        if self._latest is None:
+            self._latest = pd.Timestamp(self.con.execute("SELECT MAX(date) FROM features").fetchone()[0])
+        return self._latest
+
+    def pincode_stats(self, spec, window_days=None):
+        # NaN is a value in DuckDB but "missing" in pandas; map it to NULL first
+        exprs = []
+        for name, (col, func) in spec.items():
+            value = f"CASE WHEN isnan(CAST({col} AS DOUBLE)) THEN NULL ELSE CAST({col} AS DOUBLE) END"
+            exprs.append(f"{SQL_AGGS[func].format(c=value)} AS {name}")
+
+        where = " AND ".join(f"{k} IS NOT NULL" for k in GROUP_KEYS)
+        if window_days is not None:
+            cutoff = self.latest_date() - pd.Timedelta(days=window_days)
+            where += f" AND date >= TIMESTAMP '{cutoff}'"
+
+        keys = ", ".join(GROUP_KEYS)
+        stats = self.con.execute(f"""
+            SELECT {keys}, {", ".join(exprs)}
+            FROM features
+            WHERE {where}
+            GROUP BY {keys}
+        """).df()
+
+        # Same row order and dtypes as pandas groupby(sort=True)
+        stats = stats.sort_values(GROUP_KEYS, kind='stable').reset_index(drop=True)
+        return stats.astype({name: 'float64' for name in spec})
+
+    def binned_totals(self, col, bin_days=7, window_days=None):
+        latest = self.latest_date()
+        value = f"CASE WHEN isnan(CAST({col} AS DOUBLE)) THEN NULL ELSE CAST({col} AS DOUBLE) END"
+        where = "pincode IS NOT NULL"
+        if window_days is not None:
+            where += f" AND date >= TIMESTAMP '{latest - pd.Timedelta(days=window_days)}'"
+        totals = self.con.execute(f"""
+            SELECT pincode,
+                   CAST(FLOOR(date_diff('day', date, TIMESTAMP '{latest}') / {int(bin_days)}) AS BIGINT) AS bin,
+                   COALESCE(SUM({value}), 0) AS total
+            FROM features
+            WHERE {where}
+            GROUP BY 1, 2
+        """).df()
+        return totals.sort_values(['pincode', 'bin'], kind='stable').reset_index(drop=True)
+
+# ==========================================
+# 3. FACTORY
+# ==========================================
+BACKENDS = {"pandas": PandasBackend, "duckdb": DuckDBBackend}
+
+def get_backend(path, name=None, **kwargs):
+    """Backend named by `name`, else $DRISHTI_BACKEND, else pandas."""
+    name = (name or os.environ.get(BACKEND_ENV) or DEFAULT_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'. Choose one of: {', '.join(BACKENDS)}")
+    return BACKENDS[name](path, **kwargs)
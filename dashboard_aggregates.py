@@ -0,0 +1,224 @@
+import pandas as pd
+import os
+import json
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# Engine outputs the dashboard reads (written by master_time_aware_engine.py;
+# the demand forecast by forecast_engine.py)
+ENGINE_OUTPUTS = {
+    "fraud": "engine_fraud_30days.csv",
+    "boom": "engine_boom_180days.csv",
+    "ghost": "engine_ghost_3years.csv",
+    "digital": "engine_digital_1year.csv",
+    "forecast": "engine_forecast_30days.csv"
+}
+
+# Precomputed summary tables land here; app.py only reads and renders them
+SUMMARY_FOLDER = "dashboard_summaries"
+KPI_FILE = "kpis.json"
+
+# Rows kept per ranked table (the dashboard shows at most 15)
+TOP_N = 15
+
+# Map layers in the order the National Overview radio lists them
+LAYERS = ["boom", "ghost", "digital", "fraud"]
+
+# ==========================================
+# 1. SUMMARY BUILDERS
+# ==========================================
+def high_risk_rows(fraud_df):
+    """Fraud rows still marked HIGH RISK after the Boom Town context check."""
+    if fraud_df.empty: return fraud_df
+    return fraud_df[fraud_df['audit_status'].str.contains("HIGH RISK")]
+
+def build_state_intensity(frames):
+    """Alert count per state for every map layer, stacked into one table."""
+    parts = []
+    for layer in LAYERS:
+        df = frames.get(layer, pd.DataFrame())
+        if df.empty: continue
+        agg = df.groupby('state').size().reset_index(name='Intensity')
+        agg.insert(0, 'layer', layer)
+        parts.append(agg)
+    if not parts:
+        return pd.DataFrame(columns=['layer', 'state', 'Intensity'])
+    return pd.concat(parts, ignore_index=True)
+
+def build_action_tables(frames):
+    """Per-layer 'Actionable Insights' tables, deduplicated by district."""
+    tables = {}
+
+    high_risk = high_risk_rows(frames.get("fraud", pd.DataFrame()))
+    if not high_risk.empty:
+        tables["fraud"] = high_risk.groupby(['district', 'risk_reason']).size().reset_index(name='Alerts')
+
+    boom = frames.get("boom", pd.DataFrame())
+    if not boom.empty:
+        tables["boom"] = boom.groupby(['district']).size().reset_index(name='Hubs')
+        tables["boom"]['Action'] = "Expand Infra"
+
+    ghost = frames.get("ghost", pd.DataFrame())
+    if not ghost.empty:
+        tables["ghost"] = ghost.groupby(['district']).size().reset_index(name='Villages')
+        tables["ghost"]['Action'] = "Pension Van"
+
+    digital = frames.get("digital", pd.DataFrame())
+    if not digital.empty:
+        tables["digital"] = digital.groupby(['district', 'action']).size().reset_index(name='Zones')
+
+    for layer, table in tables.items():
+        # Sort by the count column (last column, or the one before the Action tag)
+        sort_col = [c for c in table.columns if c != 'Action'][-1]
+        tables[layer] = table.sort_values(sort_col, ascending=False).head(TOP_N)
+    return tables
+
+def build_capacity_plan(boom, forecast):
+    """
+    Seva Kendra capacity change per Boom Town district: forecast 30-day
+    demand (enrolments + biometric updates) of its boom pincodes against
+    the last 30 days actually served. Districts with nothing served get
+    new_capacity=True and the forecast as the absolute size.
+    """
+    demand = forecast.assign(
+        last_30d=forecast['enrol_last_30d'] + forecast['bio_last_30d'],
+        forecast_30d=forecast['enrol_forecast_30d'] + forecast['bio_forecast_30d']
+    )[['pincode', 'last_30d', 'forecast_30d']]
+    hubs = boom[['state', 'district', 'pincode']].merge(demand, on='pincode', how='inner')
+    if hubs.empty:
+        return pd.DataFrame()
+
+    plan = hubs.groupby(['state', 'district']).agg(
+        boom_pincodes=('pincode', 'count'),
+        last_30d=('last_30d', 'sum'),
+        forecast_30d=('forecast_30d', 'sum')
+    ).reset_index()
+    plan[['last_30d', 'forecast_30d']] = plan[['last_30d', 'forecast_30d']].round(1)
+    # No service in the last 30 days has no growth rate: the whole forecast
+    # is new capacity (flagged, with no percentage) rather than a 0% increase
+    plan['new_capacity'] = (plan['last_30d'] <= 0) & (plan['forecast_30d'] > 0)
+    growth = plan['forecast_30d'] / plan['last_30d'].where(plan['last_30d'] > 0)
+    plan['capacity_increase_pct'] = ((growth - 1) * 100).clip(lower=0).round().astype('Int64')
+    plan = plan.sort_values(['boom_pincodes', 'forecast_30d'], ascending=False, kind='stable')
+    return plan.head(TOP_N)
+
+def build_summaries(frames):
+    """Returns (tables, kpis) for the dashboard from the raw engine outputs."""
+    fraud = frames.get("fraud", pd.DataFrame())
+    boom = frames.get("boom", pd.DataFrame())
+    ghost = frames.get("ghost", pd.DataFrame())
+    digital = frames.get("digital", pd.DataFrame())
+    forecast = frames.get("forecast", pd.DataFrame())
+
+    tables = {"state_intensity": build_state_intensity(frames)}
+    for layer, table in build_action_tables(frames).items():
+        tables[f"actions_{layer}"] = table
+
+    # Integrity Shield: Priority Audit Queue
+    high_risk = high_risk_rows(fraud)
+    if not high_risk.empty:
+        audit_queue = high_risk.groupby(['state', 'district', 'risk_reason']).size().reset_index(name='Frequency')
+        tables["audit_queue"] = audit_queue.sort_values('Frequency', ascending=False).head(TOP_N)
+
+    # Migration Tracker: Top Districts by Growth
+    if not boom.empty:
+        boom_districts = boom['district'].value_counts().head(TOP_N)
+        tables["boom_districts"] = boom_districts.rename_axis('district').reset_index(name='count')
+
+    # Migration Tracker: Forecast-sized capacity recommendations
+    if not boom.empty and not forecast.empty:
+        capacity = build_capacity_plan(boom, forecast)
+        if not capacity.empty:
+            tables["boom_capacity"] = capacity
+
+    # Demographic Scanner: Critical Intervention List
+    if not ghost.empty:
+        critical_list = ghost.groupby('district').agg({
+            'elderly_pressure_median': 'max',
+            'pincode': 'count'
+        }).reset_index()
+        critical_list.columns = ['District', 'Max Elderly Ratio', 'Villages at Risk']
+        tables["ghost_districts"] = critical_list.sort_values('Max Elderly Ratio', ascending=False).head(TOP_N)
+
+    # Digital Divide: Deployment Plan
+    if not digital.empty:
+        deploy_plan = digital.groupby(['district', 'state', 'action']).size().reset_index(name='Zones')
+        tables["digital_deploy"] = deploy_plan.sort_values('Zones', ascending=False).head(TOP_N)
+
+    kpis = {
+        "fraud_total": len(fraud),
+        "high_risk_alerts": len(high_risk),
+        "suppressed_alerts": len(fraud[fraud['audit_status'].str.contains("SUPPRESSED")]) if not fraud.empty else 0,
+        "fraud_top_district": str(fraud['district'].value_counts().idxmax()) if not fraud.empty else "Unknown",
+        "boom_towns": len(boom),
+        "boom_avg_velocity": float(boom['velocity_q3'].mean()) if not boom.empty else 0.0,
+        "ghost_villages": len(ghost),
+        "digital_zones": len(digital)
+    }
+    return tables, kpis
+
+# ==========================================
+# 2. PUBLISH / READ
+# ==========================================
+def save_summaries(frames, folder=SUMMARY_FOLDER):
+    """Builds the dashboard summaries and replaces the published set in `folder`."""
+    tables, kpis = build_summaries(frames)
+    os.makedirs(folder, exist_ok=True)
+
+    # Remove tables that no longer apply (e.g. no HIGH RISK rows this run)
+    for f in os.listdir(folder):
+        if f.endswith(".csv") and f[:-4] not in tables:
+            os.remove(os.path.join(folder, f))
+
+    for name, table in tables.items():
+        table.to_csv(os.path.join(folder, f"{name}.csv"), index=False)
+    with open(os.path.join(folder, KPI_FILE), "w") as fh:
+        json.dump(kpis, fh, indent=2)
+    return tables, kpis
+
+def load_summaries(folder=SUMMARY_FOLDER):
+    """Reads the published summaries. Missing tables come back as empty frames."""
+    tables = {}
+    kpis = {}
+    if os.path.isdir(folder):
+        for f in os.listdir(folder):
+            if f.endswith(".csv"):
+                tables[f[:-4]] = pd.read_csv(os.path.join(folder, f))
+        kpi_path = os.path.join(folder, KPI_FILE)
+        if os.path.exists(kpi_path):
+            with open(kpi_path) as fh:
+                kpis = json.load(fh)
+    return tables, kpis
+
+def summaries_stale(folder=SUMMARY_FOLDER, files=ENGINE_OUTPUTS):
+    """True if the summaries were never published, or an engine output is newer."""
+    kpi_path = os.path.join(folder, KPI_FILE)
+    if not os.path.exists(kpi_path):
+        return True
+    published = os.path.getmtime(kpi_path)
+    return any(os.path.exists(p) and os.path.getmtime(p) > published for p in files.values())
+
+def current_summaries(folder=SUMMARY_FOLDER, files=ENGINE_OUTPUTS):
+    """The published summaries, republished first from the engine outputs
+    on disk if they are missing or older than those outputs."""
+    if summaries_stale(folder, files):
+        return save_summaries(load_engine_outputs(files), folder)
+    return load_summaries(folder)
+
+def load_engine_outputs(files=ENGINE_OUTPUTS):
+    data = {}
+    for key, path in files.items():
+        if os.path.exists(path):
+            data[key] = pd.read_csv(path)
+        else:
+            data[key] = pd.DataFrame()
+    return data
+
+# ==========================================
+# EXECUTION (Rebuild from the CSVs on disk)
+# ==========================================
+if __name__ == "__main__":
+    print(f"🚀 Rebuilding dashboard summaries from engine outputs...")
+    tables, kpis = save_summaries(load_engine_outputs())
+    print(f"🎉 SUCCESS! Wrote {len(tables)} summary tables + {KPI_FILE} to '{SUMMARY_FOLDER}/'")
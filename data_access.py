@@ -0,0 +1,206 @@
+import pandas as pd
+import os
+import sys
+import threading
+import time
+
+from dashboard_aggregates import ENGINE_OUTPUTS, SUMMARY_FOLDER, current_summaries
+from alert_delta import DELTA_FILE
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# How often the background watcher checks for newly published engine outputs
+WATCH_INTERVAL_SECONDS = 5
+
+# ==========================================
+# 1. FILE FRESHNESS
+# ==========================================
+def file_fingerprint(path):
+    """(mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def folder_fingerprint(folder):
+    """Fingerprint of every file in a folder (changes if any file is rewritten)."""
+    if not os.path.isdir(folder):
+        return None
+    return tuple(
+        (f, file_fingerprint(os.path.join(folder, f)))
+        for f in sorted(os.listdir(folder))
+    )
+
+# ==========================================
+# 2. LOADERS
+# ==========================================
+def read_engine_output(path):
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    # State / district names are canonical since ingest (canonical_names.py)
+    return pd.read_csv(path)
+
+def default_sources():
+    """key -> (fingerprint fn, loader fn) for everything the dashboard reads."""
+    sources = {
+        key: (lambda p=path: file_fingerprint(p), lambda p=path: read_engine_output(p))
+        for key, path in ENGINE_OUTPUTS.items()
+    }
+    sources["delta"] = (lambda: file_fingerprint(DELTA_FILE), lambda: read_engine_output(DELTA_FILE))
+    # Generated, not committed: the first load after an engine run republishes them
+    sources["summaries"] = (
+        lambda: (folder_fingerprint(SUMMARY_FOLDER), tuple(file_fingerprint(p) for p in ENGINE_OUTPUTS.values())),
+        lambda: current_summaries(SUMMARY_FOLDER)
+    )
+    return sources
+
+# ==========================================
+# 3. SHARED VIEWS & MEMORY ACCOUNTING
+# ==========================================
+def shared_view(data):
+    """
+    A view of cached data for one caller. DataFrames come back as shallow
+    copies: with pandas copy-on-write enabled (app.py turns it on) they
+    share every column buffer with the cache, and a caller that writes to
+    one gets a private copy of just that column instead of changing what
+    every other session sees.
+    """
+    if isinstance(data, pd.DataFrame):
+        return data.copy(deep=False)
+    if isinstance(data, dict):
+        return {k: shared_view(v) for k, v in data.items()}
+    if isinstance(data, (tuple, list)):
+        return type(data)(shared_view(v) for v in data)
+    return data
+
+def memory_bytes(obj, _seen=None):
+    """Approximate deep size of `obj`; shared objects are counted once."""
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(obj, pd.DataFrame) else usage)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(memory_bytes(k, seen) + memory_bytes(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(memory_bytes(v, seen) for v in obj)
+    return size
+
+# ==========================================
+# 4. DATASET STORE
+# ==========================================
+class DatasetStore:
+    """
+    Lazily loads datasets on first use and caches them against the
+    fingerprint of their source files. A stale fingerprint triggers a
+    reload on the next `get`; the optional watcher thread reloads changed
+    datasets in the background so the next screen render is already warm.
+
+    One store serves every session of the server process. Callers get
+    shared views (see shared_view), never the cached objects themselves,
+    and views derived from the datasets are memoized by `derived`.
+    """
+
+    def __init__(self, sources):
+        self.sources = sources
+        # Sizes are measured once per version, when an entry is stored,
+        # so the dashboard's memory metric costs nothing per rerun
+        self._cache = {}    # key -> (fingerprint, data, bytes)
+        self._derived = {}  # (name, args) -> (versions of its datasets, data, bytes)
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    def get(self, key):
+        return shared_view(self._get(key))
+
+    def _get(self, key):
+        fingerprint_fn, _ = self.sources[key]
+        fp = fingerprint_fn()
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is not None and entry[0] == fp:
+            return entry[1]
+        return self._load(key, fp)
+
+    def derived(self, name, keys, fn, *args):
+        """
+        fn(*[dataset for each key], *args), computed once per process and
+        recomputed only when one of the datasets in `keys` changes.
+        """
+        data = [self._get(k) for k in keys]
+        versions = tuple(self.version(k) for k in keys)
+        with self._lock:
+            entry = self._derived.get((name, args))
+        if entry is None or entry[0] != versions:
+            result = fn(*[shared_view(d) for d in data], *args)
+            entry = (versions, result, memory_bytes(result))
+            with self._lock:
+                self._derived[(name, args)] = entry
+        return shared_view(entry[1])
+
+    def shared_bytes(self):
+        """Memory held once for all sessions: the datasets plus derived views
+        (sizes as measured when each entry was stored)."""
+        with self._lock:
+            return (sum(size for _, _, size in self._cache.values()) +
+                    sum(size for _, _, size in self._derived.values()))
+
+    def _load(self, key, fp):
+        _, loader = self.sources[key]
+        data = loader()
+        size = memory_bytes(data)
+        with self._lock:
+            self._cache[key] = (fp, data, size)
+        return data
+
+    def loaded_keys(self):
+        with self._lock:
+            return list(self._cache)
+
+    def version(self, key):
+        """Fingerprint of the cached copy of `key` (None if not loaded yet)."""
+        with self._lock:
+            entry = self._cache.get(key)
+        return entry[0] if entry is not None else None
+
+    def refresh_changed(self, pending=None):
+        """
+        Reloads every cached dataset whose files changed. A change is only
+        picked up once its fingerprint is stable across two polls, so a file
+        that an engine is still writing is not loaded half-written.
+        """
+        pending = {} if pending is None else pending
+        reloaded = []
+        for key in self.loaded_keys():
+            fp = self.sources[key][0]()
+            if fp == self.version(key):
+                pending.pop(key, None)
+                continue
+            if pending.get(key) == fp:
+                self._load(key, fp)
+                pending.pop(key, None)
+                reloaded.append(key)
+            else:
+                pending[key] = fp
+        return reloaded
+
+    def start_watcher(self, interval=WATCH_INTERVAL_SECONDS):
+        if self._watcher is not None:
+            return
+
+        def watch():
+            pending = {}
+            while True:
+                time.sleep(interval)
+                try:
+                    self.refresh_changed(pending)
+                except Exception as e:
+                    print(f"   ⚠️ Background reload failed: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="drishti-data-watcher", daemon=True)
+        self._watcher.start()
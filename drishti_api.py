@@ -0,0 +1,270 @@
+import argparse
+import json
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+import tornado.ioloop
+import tornado.web
+
+from data_access import DatasetStore, default_sources, WATCH_INTERVAL_SECONDS
+from drishti_query import QueryEngine, LAYER_NAMES, normalize_pincode
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+API_PORT = 8765
+API_LAYERS = ["fraud", "boom", "ghost", "digital"]
+
+CACHE_SIZE = 2048          # Encoded responses kept in the LRU cache
+DEFAULT_TOP_N = 10
+MAX_TOP_N = 500
+DEFAULT_ROW_LIMIT = 100    # Rows per layer returned by a place lookup
+
+# Column that ranks pincodes within a layer for /top (column, ascending)
+RANK_COLUMNS = {
+    "fraud":   ('severity_score', True),            # most negative = most anomalous
+    "boom":    ('velocity_q3', False),
+    "ghost":   ('elderly_pressure_median', False),
+    "digital": ('elderly_pressure', False)
+}
+TOP_GROUPS = ['pincode', 'district', 'state']
+
+# ==========================================
+# 1. RESPONSE CACHE
+# ==========================================
+class ResponseCache:
+    """LRU of encoded JSON bodies, keyed by normalized request URI."""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        body = self._entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key, body):
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+# ==========================================
+# 2. RESPONSE BUILDERS (pure functions over the query indexes)
+# ==========================================
+def records(df, limit=None):
+    """DataFrame rows as JSON-ready dicts (NaN -> null, numpy -> Python)."""
+    if limit is not None:
+        df = df.head(limit)
+    return json.loads(df.to_json(orient='records'))
+
+def layer_frame(engine, layer):
+    return engine.frames.get(layer)
+
+def layer_summary(engine, layer):
+    df = layer_frame(engine, layer)
+    if df is None:
+        return {"layer": layer, "name": LAYER_NAMES[layer], "count": 0}
+    summary = {
+        "layer": layer,
+        "name": LAYER_NAMES[layer],
+        "count": len(df),
+        "states": int(df['state'].nunique()),
+        "districts": int(df['district'].nunique()),
+        "top_states": df['state'].value_counts().head(DEFAULT_TOP_N).to_dict(),
+        "top_districts": df['district'].value_counts().head(DEFAULT_TOP_N).to_dict()
+    }
+    if layer == "fraud":
+        summary["high_risk"] = int(df['audit_status'].str.contains("HIGH RISK").sum())
+        summary["suppressed"] = int(df['audit_status'].str.contains("SUPPRESSED").sum())
+        summary["risk_reasons"] = df['risk_reason'].value_counts().to_dict()
+    else:
+        column, _ = RANK_COLUMNS[layer]
+        summary[f"mean_{column}"] = float(df[column].mean())
+    return summary
+
+def top_n(engine, layer, by='pincode', n=DEFAULT_TOP_N):
+    df = layer_frame(engine, layer)
+    if df is None:
+        return {"layer": layer, "by": by, "items": []}
+    if by == 'pincode':
+        column, ascending = RANK_COLUMNS[layer]
+        items = records(df.sort_values(column, ascending=ascending, kind='stable'), n)
+    else:
+        keys = ['state', 'district'] if by == 'district' else ['state']
+        counts = df.groupby(keys).size().reset_index(name='count')
+        items = records(counts.sort_values('count', ascending=False, kind='stable'), n)
+    return {"layer": layer, "by": by, "items": items}
+
+def place_rows(engine, field, value, layers, limit=DEFAULT_ROW_LIMIT):
+    result = {"field": field, "value": value, "layers": {}}
+    for layer in layers:
+        rows = engine.lookup(layer, field, value)
+        result["layers"][layer] = {"count": len(rows), "rows": records(rows, limit)}
+    return result
+
+# ==========================================
+# 3. SERVICE STATE
+# ==========================================
+class ApiState:
+    """
+    Holds the current QueryEngine (inverted indexes over every engine
+    output) and the response cache. A periodic poll reloads changed
+    outputs off the event loop and swaps in a new engine; the swap clears
+    the cache so no response outlives the data it was built from.
+    """
+
+    def __init__(self, store=None, cache_size=CACHE_SIZE):
+        self.store = store or DatasetStore(default_sources())
+        self.cache = ResponseCache(cache_size)
+        self._pending = {}
+        self.publish(*self.build())
+
+    def build(self):
+        frames = {k: self.store.get(k) for k in API_LAYERS}
+        version = tuple(self.store.version(k) for k in API_LAYERS)
+        return version, QueryEngine(frames)
+
+    def publish(self, version, engine):
+        self.version = version
+        self.engine = engine
+        self.cache.clear()
+
+    async def poll(self):
+        loop = tornado.ioloop.IOLoop.current()
+        reloaded = await loop.run_in_executor(None, self.store.refresh_changed, self._pending)
+        if reloaded:
+            self.publish(*await loop.run_in_executor(None, self.build))
+            print(f"   🔄 Reloaded {', '.join(reloaded)}; response cache cleared")
+
+# ==========================================
+# 4. HANDLERS
+# ==========================================
+class ApiHandler(tornado.web.RequestHandler):
+    cached = True
+
+    def initialize(self, state):
+        self.state = state
+
+    def cache_key(self):
+        args = sorted((k, v) for k, vs in self.request.query_arguments.items() for v in vs)
+        return self.request.path + "?" + urlencode(args)
+
+    def get(self, *args):
+        key = self.cache_key()
+        body = self.state.cache.get(key) if self.cached else None
+        self.set_header("X-Cache", "HIT" if body is not None else "MISS")
+        if body is None:
+            body = json.dumps(self.build(*args)).encode()
+            if self.cached:
+                self.state.cache.put(key, body)
+        self.set_header("Content-Type", "application/json")
+        self.write(body)
+
+    def write_error(self, status_code, **kwargs):
+        self.set_header("Content-Type", "application/json")
+        self.finish(json.dumps({"error": self._reason, "status": status_code}))
+
+    def int_argument(self, name, default, low, high):
+        raw = self.get_query_argument(name, None)
+        if raw is None:
+            return default
+        if not raw.isdigit() or not low <= int(raw) <= high:
+            raise tornado.web.HTTPError(400, reason=f"'{name}' must be an integer in [{low}, {high}]")
+        return int(raw)
+
+    def layers_argument(self):
+        raw = self.get_query_argument("layers", None)
+        if raw is None:
+            return API_LAYERS
+        layers = [l for l in raw.split(",") if l]
+        unknown = [l for l in layers if l not in API_LAYERS]
+        if unknown:
+            raise tornado.web.HTTPError(400, reason=f"unknown layer(s): {', '.join(unknown)}")
+        return layers
+
+class HealthHandler(ApiHandler):
+    cached = False
+
+    def build(self):
+        return {
+            "status": "ok",
+            "layers": {k: len(self.state.engine.frames.get(k, ())) for k in API_LAYERS},
+            "cache": {"entries": len(self.state.cache), "hits": self.state.cache.hits,
+                      "misses": self.state.cache.misses}
+        }
+
+class LayersHandler(ApiHandler):
+    def build(self):
+        return {"layers": [layer_summary(self.state.engine, layer) for layer in API_LAYERS]}
+
+class LayerHandler(ApiHandler):
+    def build(self, layer):
+        return layer_summary(self.state.engine, layer)
+
+class TopHandler(ApiHandler):
+    def build(self, layer):
+        by = self.get_query_argument("by", "pincode")
+        if by not in TOP_GROUPS:
+            raise tornado.web.HTTPError(400, reason=f"'by' must be one of: {', '.join(TOP_GROUPS)}")
+        n = self.int_argument("n", DEFAULT_TOP_N, 1, MAX_TOP_N)
+        return top_n(self.state.engine, layer, by, n)
+
+class PlaceHandler(ApiHandler):
+    def initialize(self, state, field):
+        super().initialize(state)
+        self.field = field
+
+    def build(self, value):
+        limit = self.int_argument("limit", DEFAULT_ROW_LIMIT, 1, MAX_TOP_N)
+        if self.field == 'pincode':
+            value = normalize_pincode(value)
+        return place_rows(self.state.engine, self.field, value, self.layers_argument(), limit)
+
+class NotFoundHandler(ApiHandler):
+    def prepare(self):
+        raise tornado.web.HTTPError(404, reason=f"no endpoint at {self.request.path}")
+
+def make_app(state):
+    layer = "(" + "|".join(API_LAYERS) + ")"
+    return tornado.web.Application([
+        (r"/health", HealthHandler, dict(state=state)),
+        (r"/v1/layers", LayersHandler, dict(state=state)),
+        (rf"/v1/layers/{layer}", LayerHandler, dict(state=state)),
+        (rf"/v1/layers/{layer}/top", TopHandler, dict(state=state)),
+        (r"/v1/pincode/([0-9]{6})", PlaceHandler, dict(state=state, field='pincode')),
+        (r"/v1/district/([^/]+)", PlaceHandler, dict(state=state, field='district')),
+        (r"/v1/state/([^/]+)", PlaceHandler, dict(state=state, field='state'))
+    ], default_handler_class=NotFoundHandler, default_handler_args=dict(state=state))
+
+# ==========================================
+# EXECUTION
+# ==========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP query API over the Drishti engine outputs.")
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--address", default="127.0.0.1")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    parser.add_argument("--poll", type=float, default=WATCH_INTERVAL_SECONDS, help="seconds between output checks")
+    args = parser.parse_args()
+
+    state = ApiState(cache_size=args.cache_size)
+    make_app(state).listen(args.port, address=args.address)
+    tornado.ioloop.PeriodicCallback(state.poll, args.poll * 1000).start()
+
+    rows = ", ".join(f"{k}={len(v)}" for k, v in state.engine.frames.items())
+    print(f"🌐 Drishti API on http://{args.address}:{args.port} ({rows})")
+    tornado.ioloop.IOLoop.current().start()
@@ -0,0 +1,234 @@
+import pandas as pd
+import re
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# Location fields indexed for every engine output
+INDEX_FIELDS = ['state', 'district', 'pincode']
+
+# Longest place name (in words) the parser tries to match, e.g. "Dadra and Nagar Haveli"
+MAX_NAME_WORDS = 8
+
+# Keywords -> engine layer
+LAYER_KEYWORDS = {
+    "fraud":   ["fraud", "alert", "alerts", "audit", "suspicious", "risk"],
+    "boom":    ["boom", "migration", "growth", "influx", "hub", "hubs"],
+    "ghost":   ["ghost", "elderly", "aging", "ageing"],
+    "digital": ["digital", "dark", "divide", "exclusion"]
+}
+GREETINGS = {"hi", "hello", "hey", "namaste"}
+
+LAYER_NAMES = {
+    "fraud": "Fraud Alerts",
+    "boom": "Boom Towns",
+    "ghost": "Ghost Villages",
+    "digital": "Digital Dark Zones"
+}
+
+PINCODE_PATTERN = re.compile(r"\b\d{6}\b")
+
+# ==========================================
+# 1. KEY NORMALIZATION
+# ==========================================
+def normalize_name(value):
+    """Lower-case, '&' -> 'and', punctuation dropped, whitespace collapsed."""
+    text = str(value).lower().replace("&", " and ")
+    text = re.sub(r"[^a-z0-9 ]", " ", text)
+    return " ".join(text.split())
+
+def normalize_pincode(value):
+    text = str(value).strip()
+    return text[:-2] if text.endswith(".0") else text
+
+def tokenize(text):
+    return normalize_name(text).split()
+
+# ==========================================
+# 2. QUERY ENGINE
+# ==========================================
+class QueryEngine:
+    """
+    Inverted indexes (normalized value -> row positions) over state, district
+    and pincode for every engine output. Built once per data version; the
+    per-layer and per-place answers are memoized on top of the indexes.
+    """
+
+    def __init__(self, frames):
+        self.frames = {k: v for k, v in frames.items() if not v.empty}
+        self.index = {}      # (layer, field) -> {key: positions}
+        self.names = {}      # normalized place name -> set of fields it names
+        self.display = {}    # (field, key) -> original spelling
+        self._answers = {}   # memoized aggregate answers
+
+        for layer, df in self.frames.items():
+            for field in INDEX_FIELDS:
+                if field in df.columns:
+                    self.index[(layer, field)] = self._build_index(df[field], field)
+
+    def _build_index(self, column, field):
+        # Normalize the distinct values only, then fold codes that collapse
+        # to the same key (e.g. "West  Bengal" / "WEST BENGAL").
+        codes, uniques = pd.factorize(column)
+        normalize = normalize_pincode if field == 'pincode' else normalize_name
+        keys = [normalize(u) for u in uniques]
+        for key, raw in zip(keys, uniques):
+            self.display.setdefault((field, key), str(raw))
+            if field != 'pincode':
+                self.names.setdefault(key, set()).add(field)
+
+        index = {}
+        for code, positions in pd.Series(codes).groupby(codes).indices.items():
+            if code < 0:
+                continue
+            key = keys[code]
+            if key in index:
+                index[key] = pd.Index(index[key]).append(pd.Index(positions)).sort_values().to_numpy()
+            else:
+                index[key] = positions
+        return index
+
+    # ------------------------------------------
+    # Lookups
+    # ------------------------------------------
+    def lookup(self, layer, field, value):
+        """Rows of `layer` whose `field` matches `value` (normalized)."""
+        if layer not in self.frames:
+            return pd.DataFrame()
+        key = normalize_pincode(value) if field == 'pincode' else normalize_name(value)
+        positions = self.index.get((layer, field), {}).get(key)
+        if positions is None:
+            return self.frames[layer].iloc[0:0]
+        return self.frames[layer].iloc[positions]
+
+    def find_place(self, query):
+        """Longest state/district name mentioned in the query -> (field, key)."""
+        words = tokenize(query)
+        best = None
+        for size in range(min(MAX_NAME_WORDS, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                key = " ".join(words[start:start + size])
+                fields = self.names.get(key)
+                if fields:
+                    # A name that is both a state and a district reads as the district
+                    field = 'district' if 'district' in fields else 'state'
+                    best = (field, key)
+                    break
+            if best:
+                break
+        return best
+
+    def parse(self, query):
+        words = set(tokenize(query))
+        layers = [layer for layer, kws in LAYER_KEYWORDS.items() if words & set(kws)]
+        pincode = PINCODE_PATTERN.search(query)
+        return {
+            "layers": layers,
+            "pincode": pincode.group(0) if pincode else None,
+            "place": None if pincode else self.find_place(query),
+            "greeting": bool(words & GREETINGS)
+        }
+
+    # ------------------------------------------
+    # Answers
+    # ------------------------------------------
+    def answer(self, query):
+        parsed = self.parse(query)
+        if parsed["pincode"]:
+            return self._pincode_answer(parsed["pincode"], parsed["layers"])
+        if parsed["place"]:
+            return self._place_answer(*parsed["place"], parsed["layers"])
+        if parsed["layers"]:
+            return self._layer_answer(parsed["layers"][0])
+        if parsed["greeting"]:
+            return "Namaste! I am Drishti AI. I can answer questions about Fraud Alerts, Migration Trends, or Ghost Villages. Try asking: 'Which district has the most fraud?' or 'Fraud alerts in Bidar'"
+        return "I am analyzing the latest signals. You can ask me about: **Fraud Alerts**, **Migration Hotspots**, **Digital Exclusion**, or a specific **district / pincode**."
+
+    def _memo(self, key, build):
+        if key not in self._answers:
+            self._answers[key] = build()
+        return self._answers[key]
+
+    def _layer_answer(self, layer):
+        return self._memo(("layer", layer), lambda: self._build_layer_answer(layer))
+
+    def _build_layer_answer(self, layer):
+        df = self.frames.get(layer)
+        if layer == "fraud":
+            if df is None: return "I don't have fraud data loaded right now."
+            high_risk = len(self.lookup_status(df, "HIGH RISK"))
+            top_district = df['district'].value_counts().idxmax()
+            return f"Currently, I detect **{high_risk} High-Risk Alerts** requiring immediate audit. The district with the highest suspicious activity is **{top_district}**."
+        if layer == "boom":
+            if df is None: return "Migration data is unavailable."
+            return f"I have identified **{len(df)} Boom Towns** experiencing rapid population influx. The average enrollment velocity is **{df['velocity_q3'].mean():.1f} enrollments/day** (2x Baseline)."
+        if layer == "ghost":
+            if df is None: return "Demographic data is unavailable."
+            return f"There are **{len(df)} Ghost Villages** detected where high elderly populations are unable to access centers. I recommend deploying **Mobile Aadhaar Vans**."
+        if df is None: return "Digital exclusion data is unavailable."
+        return f"I see **{len(df)} Digital Dark Zones** where biometric failure rates are abnormally high."
+
+    @staticmethod
+    def lookup_status(df, status):
+        return df[df['audit_status'].str.contains(status)]
+
+    def _place_answer(self, field, key, layers):
+        return self._memo(("place", field, key, tuple(layers)),
+                          lambda: self._build_place_answer(field, key, layers))
+
+    def _build_place_answer(self, field, key, layers):
+        name = self.display.get((field, key), key.title())
+        lines = []
+        for layer in (layers or list(LAYER_NAMES)):
+            rows = self.lookup(layer, field, key)
+            if layer not in self.frames:
+                lines.append(f"- {LAYER_NAMES[layer]}: data unavailable")
+            elif rows.empty:
+                lines.append(f"- {LAYER_NAMES[layer]}: none flagged")
+            elif layer == "fraud":
+                high_risk = len(self.lookup_status(rows, "HIGH RISK"))
+                pattern = rows['risk_reason'].value_counts().idxmax()
+                lines.append(f"- {LAYER_NAMES[layer]}: **{len(rows)}** ({high_risk} High-Risk, {len(rows) - high_risk} Suppressed). Most common pattern: *{pattern}*")
+            else:
+                pins = ", ".join(rows['pincode'].map(normalize_pincode).head(5))
+                more = f" +{len(rows) - 5} more" if len(rows) > 5 else ""
+                lines.append(f"- {LAYER_NAMES[layer]}: **{len(rows)}** (pincodes {pins}{more})")
+        return f"Here is what I see for **{name}** ({field}):\n" + "\n".join(lines)
+
+    def _pincode_answer(self, pincode, layers):
+        return self._memo(("pincode", pincode, tuple(layers)),
+                          lambda: self._build_pincode_answer(pincode, layers))
+
+    def _build_pincode_answer(self, pincode, layers):
+        hits = {}
+        for layer in LAYER_NAMES:
+            rows = self.lookup(layer, 'pincode', pincode)
+            if not rows.empty:
+                hits[layer] = rows.iloc[0]
+
+        location = ""
+        if hits:
+            first = next(iter(hits.values()))
+            location = f" ({first['district']}, {first['state']})"
+
+        if len(layers) == 1:
+            layer = layers[0]
+            label = LAYER_NAMES[layer][:-1]
+            if layer in hits:
+                return f"Yes - **{pincode}**{location} is flagged as a **{label}**. {self._describe(layer, hits[layer])}"
+            return f"No - **{pincode}**{location} is not flagged as a {label} in the current run."
+
+        if not hits:
+            return f"**{pincode}** is not flagged by any engine in the current run."
+        lines = [f"- **{LAYER_NAMES[layer]}**: {self._describe(layer, row)}" for layer, row in hits.items()]
+        return f"**{pincode}**{location} appears in:\n" + "\n".join(lines)
+
+    @staticmethod
+    def _describe(layer, row):
+        if layer == "fraud":
+            return f"{row['audit_status']} ({row['risk_reason']})"
+        if layer == "boom":
+            return f"Enrolment velocity (Q3) of **{row['velocity_q3']:.1f}/day**."
+        if layer == "ghost":
+            return f"Median elderly pressure of **{row['elderly_pressure_median']:.1f}**."
+        return f"Bio update rate of **{row['bio_rate']:.2f}** - {row['action']}."
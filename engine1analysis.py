@@ -1,4 +1,6 @@
 import pandas as pd
+from compute_backend import get_backend
+from instrumentation import RunReport
 
 # ==========================================
 # CONFIGURATION
@@ -10,8 +12,31 @@ OUTPUT_BOOM   = "engine1_boom_towns.csv"
 OUTPUT_GHOST  = "engine1_ghost_villages.csv"
 OUTPUT_DIGITAL = "policy_overlay_digital_divide.csv"
 
+run = RunReport("engine1analysis")
+
+# Per-pincode aggregates: {output: (input column, function)}, run by compute_backend
+PIN_SPEC = {
+    # Velocity: Use 75th Percentile to ignore one-day spikes
+    "velocity_q3": ('enrol_velocity', 'q3'),
+
+    # Volume: Split into Scale (Sum) and Typical Day (Median)
+    "volume_sum":    ('total_enrolment', 'sum'),
+    "volume_median": ('total_enrolment', 'median'),
+
+    # Demographics: Use Median for Elderly Pressure (Structural Ageing)
+    "elderly_pressure_median": ('elderly_pressure', 'median'),
+    "child_ratio_mean":        ('child_ratio', 'mean'),
+
+    # Digital Awareness: Total Biometric Updates
+    "bio_sum": ('total_bio_updates', 'sum')
+}
+
 print(f"🚀 Loading Intelligence Data: {INPUT_FILE}...")
-df = pd.read_csv(INPUT_FILE)
+with run.stage("load") as s:
+    # pandas or DuckDB, picked by $DRISHTI_BACKEND
+    backend = get_backend(INPUT_FILE)
+    s.rows_out = len(backend)
+print(f"   ⚙️ Compute Backend: {backend.name}")
 
 # ==========================================
 # 1. ROBUST AGGREGATION (The Statistical Core)
@@ -19,21 +44,9 @@ df = pd.read_csv(INPUT_FILE)
 print("   - Aggregating Data (Using Robust Stat Metrics)...")
 
 # We aggregate EVERYTHING in one go to be efficient
-pin_stats = df.groupby(['state', 'district', 'pincode']).agg(
-    # Velocity: Use 75th Percentile to ignore one-day spikes
-    velocity_q3=('enrol_velocity', lambda x: x.quantile(0.75)),
-    
-    # Volume: Split into Scale (Sum) and Typical Day (Median)
-    volume_sum=('total_enrolment', 'sum'),
-    volume_median=('total_enrolment', 'median'),
-    
-    # Demographics: Use Median for Elderly Pressure (Structural Ageing)
-    elderly_pressure_median=('elderly_pressure', 'median'),
-    child_ratio_mean=('child_ratio', 'mean'),
-    
-    # Digital Awareness: Total Biometric Updates
-    bio_sum=('total_bio_updates', 'sum')
-).reset_index().fillna(0)
+with run.stage("groupby.pin_stats") as s:
+    pin_stats = backend.pincode_stats(PIN_SPEC).fillna(0)
+    s.rows_out = len(pin_stats)
 
 # Calculate Bio Compliance Rate (for Digital Overlay)
 # (Bio Updates / Total Activity + 1)
@@ -65,42 +78,52 @@ print(f"     [Digital] Max Compliance Rate: < {bio_compliance_25:.2f}")
 # ==========================================
 # 3. DETECT "BOOM TOWNS" (Migration Hubs)
 # ==========================================
-boom_towns = pin_stats[
-    (pin_stats['velocity_q3'] > vel_95) & 
-    (pin_stats['volume_sum'] > vol_sum_median) & 
-    (pin_stats['volume_sum'] > 10) &  # Noise Filter (Must have activity)
-    (pin_stats['child_ratio_mean'] < 0.3) # Adult Migration
-].sort_values(by='velocity_q3', ascending=False)
+with run.stage("detect.boom", rows_in=len(pin_stats)) as s:
+    boom_towns = pin_stats[
+        (pin_stats['velocity_q3'] > vel_95) & 
+        (pin_stats['volume_sum'] > vol_sum_median) & 
+        (pin_stats['volume_sum'] > 10) &  # Noise Filter (Must have activity)
+        (pin_stats['child_ratio_mean'] < 0.3) # Adult Migration
+    ].sort_values(by='velocity_q3', ascending=False)
+    s.rows_out = len(boom_towns)
 
 # ==========================================
 # 4. DETECT "GHOST VILLAGES" (Out-Migration)
 # ==========================================
-ghost_villages = pin_stats[
-    (pin_stats['elderly_pressure_median'] > press_90) &
-    (pin_stats['volume_median'] <= vol_med_median) # Stagnant Typical Day
-].sort_values(by='elderly_pressure_median', ascending=False)
+with run.stage("detect.ghost", rows_in=len(pin_stats)) as s:
+    ghost_villages = pin_stats[
+        (pin_stats['elderly_pressure_median'] > press_90) &
+        (pin_stats['volume_median'] <= vol_med_median) # Stagnant Typical Day
+    ].sort_values(by='elderly_pressure_median', ascending=False)
+    s.rows_out = len(ghost_villages)
 
 # ==========================================
 # 5. DETECT "DIGITAL DARK ZONES" (Policy Overlay)
 # ==========================================
-digital_zones = pin_stats[
-    (pin_stats['elderly_pressure_median'] > grey_80) & # Greying
-    (pin_stats['bio_compliance_rate'] < bio_compliance_25) & # Neglect
-    (pin_stats['volume_sum'] > 50) # Ignore empty places
-].copy()
-
-# Add Action Tag
-digital_zones['recommended_action'] = "Deploy Mobile Aadhaar Vans + Assisted Digital Camps"
-digital_zones = digital_zones.sort_values(by='elderly_pressure_median', ascending=False)
+with run.stage("detect.digital", rows_in=len(pin_stats)) as s:
+    digital_zones = pin_stats[
+        (pin_stats['elderly_pressure_median'] > grey_80) & # Greying
+        (pin_stats['bio_compliance_rate'] < bio_compliance_25) & # Neglect
+        (pin_stats['volume_sum'] > 50) # Ignore empty places
+    ].copy()
+
+    # Add Action Tag
+    digital_zones['recommended_action'] = "Deploy Mobile Aadhaar Vans + Assisted Digital Camps"
+    digital_zones = digital_zones.sort_values(by='elderly_pressure_median', ascending=False)
+    s.rows_out = len(digital_zones)
 
 # ==========================================
 # 6. SAVE ALL REPORTS
 # ==========================================
-boom_towns.to_csv(OUTPUT_BOOM, index=False)
-ghost_villages.to_csv(OUTPUT_GHOST, index=False)
-digital_zones.to_csv(OUTPUT_DIGITAL, index=False)
+with run.stage("save.boom", rows_in=len(boom_towns)):
+    boom_towns.to_csv(OUTPUT_BOOM, index=False)
+with run.stage("save.ghost", rows_in=len(ghost_villages)):
+    ghost_villages.to_csv(OUTPUT_GHOST, index=False)
+with run.stage("save.digital", rows_in=len(digital_zones)):
+    digital_zones.to_csv(OUTPUT_DIGITAL, index=False)
 
 print(f"\n🎉 SUCCESS! All Intelligence Reports Generated:")
 print(f"   🔥 Boom Towns Found: {len(boom_towns)} --> Saved to {OUTPUT_BOOM}")
 print(f"   👻 Ghost Villages Found: {len(ghost_villages)} --> Saved to {OUTPUT_GHOST}")
-print(f"   🚨 Digital Dark Zones: {len(digital_zones)} --> Saved to {OUTPUT_DIGITAL}")
\ No newline at end of file
+print(f"   🚨 Digital Dark Zones: {len(digital_zones)} --> Saved to {OUTPUT_DIGITAL}")
+print(f"📊 Run report: {run.save()}")
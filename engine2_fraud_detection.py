@@ -1,6 +1,7 @@
 import pandas as pd
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import StandardScaler
+from fraud_training import train_and_score, TRAIN_SAMPLE
+from neighborhood import in_migration_neighborhood
+from instrumentation import RunReport
 
 # ==========================================
 # CONFIGURATION
@@ -9,60 +10,29 @@ INPUT_FEATURES = "aadhaar_features_ready_for_ML.csv"
 INPUT_BOOM_TOWNS = "engine1_boom_towns.csv"
 OUTPUT_FRAUD = "engine2_fraud_audit_trail.csv" # Renamed to reflect it contains suppressed rows too
 
-print(f"🚀 Loading Data for Integrity Shield...")
-df = pd.read_csv(INPUT_FEATURES)
+run = RunReport("engine2_fraud_detection")
 
-# ==========================================
-# 1. RISK FEATURE ENGINEERING
-# ==========================================
-print("   - Constructing Risk Profiles (Normalized)...")
-
-fraud_features = df.groupby(['state', 'district', 'pincode']).agg(
-    total_txns=('total_enrolment', 'sum'),
-    velocity_q3=('enrol_velocity', lambda x: x.quantile(0.75)), # Robust Velocity
-    max_velocity=('enrol_velocity', 'max'),
-    weekend_activity=('is_weekend', 'mean'),
-    bio_sum=('total_bio_updates', 'sum')
-).reset_index()
-
-# Normalize Biometric Rate
-fraud_features['bio_rate'] = fraud_features['bio_sum'] / (fraud_features['total_txns'] + 1)
-
-# Filter Noise (Only analyze centers with activity)
-active_centers = fraud_features[fraud_features['total_txns'] > 50].copy().fillna(0)
-
-print(f"   - Analyzing {len(active_centers)} active centers...")
-
-# ==========================================
-# 2. FEATURE SCALING (Refinement 1)
-# ==========================================
-# Isolation Forest works better if all inputs are on the same scale
-print("   - Applying StandardScaler to features...")
-
-features_to_use = ['velocity_q3', 'max_velocity', 'weekend_activity', 'bio_rate']
-scaler = StandardScaler()
-
-# Create scaled features for the model (Keep original DF clean for reporting)
-X_scaled = scaler.fit_transform(active_centers[features_to_use])
+# Boom Towns: neighborhood context for the model and the suppression step
+try:
+    boom_towns = pd.read_csv(INPUT_BOOM_TOWNS)
+except FileNotFoundError:
+    boom_towns = None
 
 # ==========================================
-# 3. TRAIN ISOLATION FOREST
+# 1-3. RISK PROFILES, SCALING & ISOLATION FOREST (Streamed)
 # ==========================================
-print("   - Training Anomaly Detection Model...")
+# The per-center table is never built whole: centers stream from the features
+# file, a per-state reservoir keeps the training sample (fraud_training.py),
+# and the full population is scored batch by batch.
+print(f"🚀 Streaming Risk Profiles for Integrity Shield...")
+print(f"   - Training on a stratified sample of up to {TRAIN_SAMPLE} centers...")
 
-model = IsolationForest(
-    n_estimators=100,
-    contamination=0.01, # Top 1% anomalies
-    random_state=42,
-    n_jobs=-1
-)
+boom_pins = boom_towns['pincode'] if boom_towns is not None else ()
+suspects, active_count, train_count = train_and_score(INPUT_FEATURES, run, boom_pins)
 
-# Predict
-active_centers['anomaly_score'] = model.fit_predict(X_scaled)
-active_centers['severity_score'] = model.decision_function(X_scaled)
+print(f"   - Model fitted on {train_count} sampled centers; scored {active_count} active centers...")
 
-# Extract raw suspects (Score = -1)
-suspects = active_centers[active_centers['anomaly_score'] == -1].copy()
+# Raw suspects (Score = -1)
 print(f"   🚨 Initial Machine Learning Flags: {len(suspects)}")
 
 # ==========================================
@@ -70,42 +40,39 @@ print(f"   🚨 Initial Machine Learning Flags: {len(suspects)}")
 # ==========================================
 print("   - Cross-referencing with Boom Towns...")
 
-try:
-    boom_towns = pd.read_csv(INPUT_BOOM_TOWNS)
+with run.stage("suppression", rows_in=len(suspects)) as s:
+    if boom_towns is not None:
+        # REQUIRED FIX: Use proper merge with indicator
+        # We merge Suspects (Left) with Boom Towns (Right) on location keys
+        merged = pd.merge(
+            suspects, 
+            boom_towns[['state', 'district', 'pincode']], 
+            on=['state', 'district', 'pincode'], 
+            how='left', 
+            indicator=True
+        )
     
-    # REQUIRED FIX: Use proper merge with indicator
-    # We merge Suspects (Left) with Boom Towns (Right) on location keys
-    merged = pd.merge(
-        suspects, 
-        boom_towns[['state', 'district', 'pincode']], 
-        on=['state', 'district', 'pincode'], 
-        how='left', 
-        indicator=True
-    )
+        # Logic:
+        # _merge == 'both'                -> It is a Boom Town (Suppress it)
+        # neighbors are mostly Boom Towns -> Regional migration (Suppress it)
+        # otherwise                       -> True Fraud Risk
+        merged['audit_status'] = "HIGH RISK - Action Required"
+        merged.loc[in_migration_neighborhood(merged), 'audit_status'] = "SUPPRESSED - Regional Migration Context"
+        merged.loc[merged['_merge'] == 'both', 'audit_status'] = "SUPPRESSED - Verified Migration Boom"
     
-    # Logic:
-    # _merge == 'both'      -> It is a Boom Town (Suppress it)
-    # _merge == 'left_only' -> It is NOT a Boom Town (True Fraud Risk)
+        # Calculate stats
+        suppressed_count = len(merged[merged['audit_status'].str.contains("SUPPRESSED")])
+        regional_count = len(merged[merged['audit_status'].str.contains("Regional")])
+        risk_count = len(merged[merged['audit_status'].str.contains("HIGH RISK")])
     
-    def tag_status(row):
-        if row['_merge'] == 'both':
-            return "SUPPRESSED - Verified Migration Boom"
-        else:
-            return "HIGH RISK - Action Required"
+        print(f"     ✅ Verified {suppressed_count} alerts as legitimate migration ({regional_count} from neighboring Boom Towns).")
+        print(f"     🔥 Confirmed {risk_count} alerts as High Risk Fraud.")
 
-    merged['audit_status'] = merged.apply(tag_status, axis=1)
-    
-    # Calculate stats
-    suppressed_count = len(merged[merged['audit_status'].str.contains("SUPPRESSED")])
-    risk_count = len(merged[merged['audit_status'].str.contains("HIGH RISK")])
-    
-    print(f"     ✅ Verified {suppressed_count} alerts as legitimate migration.")
-    print(f"     🔥 Confirmed {risk_count} alerts as High Risk Fraud.")
-
-except FileNotFoundError:
-    print("     ⚠️ Warning: Boom Town file missing. Marking all as High Risk.")
-    merged = suspects.copy()
-    merged['audit_status'] = "HIGH RISK - Action Required"
+    else:
+        print("     ⚠️ Warning: Boom Town file missing. Marking all as High Risk.")
+        merged = suspects.copy()
+        merged['audit_status'] = "HIGH RISK - Action Required"
+    s.rows_out = len(merged)
 
 # ==========================================
 # 5. EXPLAINABILITY & SAVE
@@ -117,19 +84,24 @@ def explain_fraud(row):
     if row['velocity_q3'] > 50: reasons.append("Sustained High Speed")
     if row['bio_rate'] < 0.1: reasons.append("Abnormally Low Bio Updates") 
     if row['max_velocity'] > 150: reasons.append("Impossible Speed Spike")
+    if row['velocity_vs_region'] > 3: reasons.append("Far Faster Than Neighboring Pincodes")
     
     if not reasons: reasons.append("Statistical Pattern Anomaly")
     return ", ".join(reasons)
 
-merged['risk_reason'] = merged.apply(explain_fraud, axis=1)
+with run.stage("explain", rows_in=len(merged)):
+    merged['risk_reason'] = merged.apply(explain_fraud, axis=1)
 
 # Sort: High Risk first, then by Severity
 merged = merged.sort_values(by=['audit_status', 'severity_score'], ascending=[True, True])
 
 # Clean Columns
-cols = ['state', 'district', 'pincode', 'audit_status', 'total_txns', 'risk_reason', 'severity_score']
-merged[cols].to_csv(OUTPUT_FRAUD, index=False)
+cols = ['state', 'district', 'pincode', 'audit_status', 'total_txns', 'risk_reason', 'severity_score',
+        'velocity_vs_region', 'area_boom_share', 'region_boom_share']
+with run.stage("save.fraud", rows_in=len(merged)):
+    merged[cols].to_csv(OUTPUT_FRAUD, index=False)
 
 print(f"\n🎉 SUCCESS! Audit Trail Generated: {OUTPUT_FRAUD}")
 print("\n--- SAMPLE AUDIT TRAIL ---")
-print(merged[['pincode', 'audit_status', 'risk_reason']].head(5))
\ No newline at end of file
+print(merged[['pincode', 'audit_status', 'risk_reason']].head(5))
+print(f"📊 Run report: {run.save()}")
@@ -0,0 +1,252 @@
+import argparse
+import json
+import os
+import secrets
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client
+
+from compute_backend import PandasBackend, columnar_path
+from data_access import file_fingerprint
+from instrumentation import RunReport
+from master_time_aware_engine import (
+    INPUT_FILE, HORIZONS, ENGINE_SPECS,
+    detect_fraud, detect_boom, detect_ghost, detect_digital
+)
+from changepoint_engine import run_onset_engine
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+DAEMON_ADDRESS = ("127.0.0.1", 8767)
+# Requests are pickled, so the key is what stops other local users running
+# code in the daemon. Either set it in the environment of both sides, or let
+# `serve` generate one into an owner-only file that clients on this account read.
+AUTHKEY_ENV = "DRISHTI_DAEMON_KEY"
+KEY_FOLDER = os.path.join(os.path.expanduser("~"), ".drishti")
+
+ENGINES = ["boom", "ghost", "digital", "fraud", "onset"]
+DETECTORS = {"boom": detect_boom, "ghost": detect_ghost, "digital": detect_digital}
+
+def key_path(port):
+    return os.path.join(KEY_FOLDER, f"engine_daemon_{port}.key")
+
+def new_authkey(port):
+    """Server side: DRISHTI_DAEMON_KEY, or a random key written to a 0600 file."""
+    key = os.environ.get(AUTHKEY_ENV)
+    if key:
+        return key.encode()
+    key = secrets.token_hex(32).encode()
+    os.makedirs(KEY_FOLDER, mode=0o700, exist_ok=True)
+    tmp = key_path(port) + ".tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(key)
+    os.replace(tmp, key_path(port))
+    return key
+
+def authkey(port):
+    """Client side: DRISHTI_DAEMON_KEY, or the key file the running daemon wrote."""
+    key = os.environ.get(AUTHKEY_ENV)
+    if key:
+        return key.encode()
+    path = key_path(port)
+    if not os.path.exists(path):
+        raise RuntimeError(f"No daemon key at {path}: start `engine_daemon.py serve` or set {AUTHKEY_ENV}")
+    if os.stat(path).st_mode & 0o077:
+        raise PermissionError(f"{path} is readable by other users; delete it and restart the daemon")
+    with open(path, "rb") as fh:
+        return fh.read().strip()
+
+# ==========================================
+# 1. WARM STATE
+# ==========================================
+class WarmEngine:
+    """
+    Keeps the features table in memory and memoizes the per-pincode
+    groupings by (engine, window), so a request only re-runs the cheap
+    detection step with its parameters. The data version is the features
+    file fingerprint; a change drops everything and reloads once.
+    """
+
+    def __init__(self, path=INPUT_FILE):
+        self.path = path
+        self.version = None
+        self.backend = None
+        self.stats = {}
+        self.loads = 0
+
+    def data_version(self):
+        return (file_fingerprint(self.path), file_fingerprint(columnar_path(self.path)))
+
+    def ensure_fresh(self):
+        version = self.data_version()
+        if version != self.version or self.backend is None:
+            self.backend = PandasBackend(self.path)
+            self.stats = {}
+            self.version = version
+            self.loads += 1
+            print(f"   📥 Loaded {len(self.backend):,} rows (load #{self.loads})")
+
+    def pincode_stats(self, engine, window_days, run):
+        key = (engine, window_days)
+        if key not in self.stats:
+            with run.stage(f"groupby.{engine}") as s:
+                self.stats[key] = self.backend.pincode_stats(ENGINE_SPECS[engine], window_days=window_days)
+                s.rows_out = len(self.stats[key])
+        return self.stats[key].copy()
+
+    def run(self, engine, params=None, window_days=None):
+        """Result DataFrame of one engine with threshold overrides in `params`."""
+        params = dict(params or {})
+        run = RunReport(f"daemon_{engine}")
+        try:
+            self.ensure_fresh()
+            if engine == "onset":
+                result = run_onset_engine(self.backend, run, **params)
+            elif engine == "fraud":
+                boom = detect_boom(self.pincode_stats("boom", HORIZONS["boom"], run))
+                window = window_days or HORIZONS["fraud"]
+                result = detect_fraud(self.pincode_stats("fraud", window, run), run, boom['pincode'], **params)
+            elif engine in DETECTORS:
+                window = window_days or HORIZONS[engine]
+                with run.stage(f"detect.{engine}"):
+                    result = DETECTORS[engine](self.pincode_stats(engine, window, run), **params)
+            else:
+                raise ValueError(f"Unknown engine '{engine}'. Choose one of: {', '.join(ENGINES)}")
+        finally:
+            run.stop()
+        return result, [r.as_dict() for r in run.records]
+
+# ==========================================
+# 2. SERVER
+# ==========================================
+def handle(warm, request):
+    cmd = request.get("cmd", "run")
+    if cmd == "status":
+        return {"ok": True, "loads": warm.loads, "version": warm.version,
+                "cached_groupings": [list(k) for k in warm.stats]}
+    if cmd == "run":
+        start = time.perf_counter()
+        result, stages = warm.run(request["engine"], request.get("params"), request.get("window_days"))
+        return {"ok": True, "engine": request["engine"], "rows": len(result), "result": result,
+                "stages": stages, "seconds": round(time.perf_counter() - start, 3), "loads": warm.loads}
+    raise ValueError(f"Unknown command '{cmd}'")
+
+def serve(address=DAEMON_ADDRESS, path=INPUT_FILE):
+    warm = WarmEngine(path)
+    warm.ensure_fresh()
+    key = new_authkey(address[1])
+    try:
+        with Listener(address, authkey=key) as listener:
+            print(f"🔥 Engine daemon warm on {address[0]}:{address[1]}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except (AuthenticationError, EOFError, ConnectionError):
+                    continue  # wrong key or dropped handshake: keep serving
+                with conn:
+                    # One connection may carry several requests
+                    while True:
+                        try:
+                            request = conn.recv()
+                        except EOFError:
+                            break
+                        if request.get("cmd") == "shutdown":
+                            conn.send({"ok": True})
+                            return
+                        try:
+                            conn.send(handle(warm, request))
+                        except Exception as e:
+                            conn.send({"ok": False, "error": f"{type(e).__name__}: {e}"})
+    finally:
+        if not os.environ.get(AUTHKEY_ENV) and os.path.exists(key_path(address[1])):
+            os.remove(key_path(address[1]))
+
+# ==========================================
+# 3. CLIENT
+# ==========================================
+class EngineClient:
+    """
+    Usage:
+        with EngineClient() as client:
+            boom = client.run("boom", velocity_quantile=0.90)
+    """
+
+    def __init__(self, address=DAEMON_ADDRESS):
+        self.conn = Client(address, authkey=authkey(address[1]))
+        self.last = None
+
+    def request(self, **request):
+        self.conn.send(request)
+        reply = self.conn.recv()
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error", "daemon error"))
+        self.last = reply
+        return reply
+
+    def run(self, engine, window_days=None, **params):
+        return self.request(cmd="run", engine=engine, params=params, window_days=window_days)["result"]
+
+    def status(self):
+        return self.request(cmd="status")
+
+    def shutdown(self):
+        self.conn.send({"cmd": "shutdown"})
+        self.conn.recv()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def parse_params(pairs):
+    """['velocity_quantile=0.9', ...] -> {'velocity_quantile': 0.9}"""
+    params = {}
+    for pair in pairs or []:
+        key, _, value = pair.partition("=")
+        try:
+            params[key] = json.loads(value)
+        except ValueError:
+            params[key] = value
+    return params
+
+# ==========================================
+# EXECUTION
+# ==========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm engine worker: features stay loaded between runs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve_cmd = sub.add_parser("serve", help="start the daemon")
+    serve_cmd.add_argument("--input", default=INPUT_FILE)
+    serve_cmd.add_argument("--port", type=int, default=DAEMON_ADDRESS[1])
+    run_cmd = sub.add_parser("run", help="run one engine on the daemon")
+    run_cmd.add_argument("engine", choices=ENGINES)
+    run_cmd.add_argument("--param", action="append", help="threshold override, e.g. velocity_quantile=0.9")
+    run_cmd.add_argument("--window", type=int, default=None, help="look-back days (default: engine horizon)")
+    run_cmd.add_argument("--out", help="write the result CSV here")
+    run_cmd.add_argument("--port", type=int, default=DAEMON_ADDRESS[1])
+    stop_cmd = sub.add_parser("stop", help="shut the daemon down")
+    stop_cmd.add_argument("--port", type=int, default=DAEMON_ADDRESS[1])
+    args = parser.parse_args()
+
+    address = (DAEMON_ADDRESS[0], args.port)
+    if args.command == "serve":
+        serve(address, args.input)
+    elif args.command == "stop":
+        with EngineClient(address) as client:
+            client.shutdown()
+        print("🛑 Engine daemon stopped.")
+    else:
+        with EngineClient(address) as client:
+            result = client.run(args.engine, args.window, **parse_params(args.param))
+            reply = client.last
+        print(f"⚡ {args.engine}: {reply['rows']} rows in {reply['seconds']}s (data loads so far: {reply['loads']})")
+        print(result.head(10).to_string())
+        if args.out:
+            result.to_csv(args.out, index=False)
+            print(f"💾 Saved to {args.out}")
@@ -1,22 +1,17 @@
 import pandas as pd
 import numpy as np
+from compute_backend import columnar_path
+from pincode_store import build_store, STORE_FOLDER
+from instrumentation import RunReport
 
 # ==========================================
 # CONFIGURATION
 # ==========================================
-INPUT_FILE = "aadhaar_master_dataset_FINAL22.csv" 
+INPUT_FILE = "aadhaar_master_dataset_FINAL22.csv"
 OUTPUT_FILE = "aadhaar_features_ready_for_ML.csv"
 
-print(f"🚀 Loading {INPUT_FILE}...")
-df = pd.read_csv(INPUT_FILE)
-
-# ==========================================
-# 1. RENAME COLUMNS (Strict Mapping)
-# ==========================================
-print("   - Renaming columns...")
-
 # Mapping your RAW columns to the NAMES needed for formulas
-rename_map = {
+RENAME_MAP = {
     'age_18_greater': 'age_18_plus',       # Enrolment Adult
     'demo_age_5_17':  'demo_young',        # Demographic Young (Proxy for 0-17)
     'demo_age_17_':   'demo_old',          # Demographic Old
@@ -24,66 +19,108 @@ rename_map = {
     'bio_age_17_':    'bio_old'            # Biometric Old (17+)
 }
 
-df = df.rename(columns=rename_map)
-
-# Verify Renaming
-required = ['age_0_5', 'age_5_17', 'age_18_plus', 'demo_young', 'demo_old', 'bio_young', 'bio_old']
-missing = [c for c in required if c not in df.columns]
-
-if missing:
-    print(f"❌ ERROR: Still missing columns: {missing}")
-    print(f"   Current Columns: {list(df.columns)}")
-    exit()
-else:
-    print("   ✅ Rename successful.")
-
-# ==========================================
-# 2. FILL NULLS (Safety)
-# ==========================================
-# Replace NaN with 0 for all math columns
-for c in required:
-    df[c] = df[c].fillna(0)
+REQUIRED = ['age_0_5', 'age_5_17', 'age_18_plus', 'demo_young', 'demo_old', 'bio_young', 'bio_old']
 
 # ==========================================
-# 3. CALCULATE FORMULAS (Adjusted for your data)
+# 1. RENAME COLUMNS (Strict Mapping)
 # ==========================================
-print("   - Calculating Metrics...")
-
-# Formula 1: Total Enrolment
-# (Sum of all 3 enrolment columns you have)
-df['total_enrolment'] = df['age_0_5'] + df['age_5_17'] + df['age_18_plus']
-
-# Formula 2: Total Biometric Updates
-# (Sum of Young + Old biometric updates)
-df['total_bio_updates'] = df['bio_young'] + df['bio_old']
-
-# Formula 3: Child Ratio
-# (Enrolment 0-5 / Total Enrolment + 1)
-df['child_ratio'] = df['age_0_5'] / (df['total_enrolment'] + 1)
-
-# Formula 4: Elderly Pressure (Migration Proxy)
-# (Old Demographic Updates / Young Demographic Updates + 1)
-# Note: Using 'demo_young' (5-17) because you don't have 0-5 demo data.
-df['elderly_pressure'] = df['demo_old'] / (df['demo_young'] + 1)
+def rename_columns(df):
+    """Returns (renamed df, required columns still missing)."""
+    df = df.rename(columns=RENAME_MAP)
+    return df, [c for c in REQUIRED if c not in df.columns]
 
 # ==========================================
-# 4. TIME & VELOCITY
+# 2-4. FEATURES (also run per partition by partitioned_pipeline.py)
 # ==========================================
-print("   - Calculating Velocity...")
-
-df['date'] = pd.to_datetime(df['date'])
-df = df.sort_values(by=['pincode', 'date'])
-
-# Velocity: How fast is enrolment growing?
-df['enrol_velocity'] = df.groupby('pincode')['total_enrolment'].diff().fillna(0)
-
-# Time Features
-df['month'] = df['date'].dt.month
-df['is_weekend'] = df['date'].dt.dayofweek.apply(lambda x: 1 if x >= 5 else 0)
+def add_features(df, run):
+    """Derived model features on a renamed master table, sorted by (pincode, date)."""
+    # 2. FILL NULLS (Safety)
+    # Replace NaN with 0 for all math columns
+    with run.stage("fill_nulls", rows_in=len(df)):
+        for c in REQUIRED:
+            df[c] = df[c].fillna(0)
+
+    # 3. CALCULATE FORMULAS (Adjusted for your data)
+    print("   - Calculating Metrics...")
+
+    # Formula 1: Total Enrolment
+    # (Sum of all 3 enrolment columns you have)
+    with run.stage("feature.total_enrolment", rows_in=len(df)):
+        df['total_enrolment'] = df['age_0_5'] + df['age_5_17'] + df['age_18_plus']
+
+    # Formula 2: Total Biometric Updates
+    # (Sum of Young + Old biometric updates)
+    with run.stage("feature.total_bio_updates", rows_in=len(df)):
+        df['total_bio_updates'] = df['bio_young'] + df['bio_old']
+
+    # Formula 3: Child Ratio
+    # (Enrolment 0-5 / Total Enrolment + 1)
+    with run.stage("feature.child_ratio", rows_in=len(df)):
+        df['child_ratio'] = df['age_0_5'] / (df['total_enrolment'] + 1)
+
+    # Formula 4: Elderly Pressure (Migration Proxy)
+    # (Old Demographic Updates / Young Demographic Updates + 1)
+    # Note: Using 'demo_young' (5-17) because you don't have 0-5 demo data.
+    with run.stage("feature.elderly_pressure", rows_in=len(df)):
+        df['elderly_pressure'] = df['demo_old'] / (df['demo_young'] + 1)
+
+    # 4. TIME & VELOCITY
+    print("   - Calculating Velocity...")
+
+    with run.stage("sort", rows_in=len(df)):
+        df['date'] = pd.to_datetime(df['date'])
+        df = df.sort_values(by=['pincode', 'date'])
+
+    # Velocity: How fast is enrolment growing?
+    with run.stage("feature.enrol_velocity", rows_in=len(df)):
+        df['enrol_velocity'] = df.groupby('pincode')['total_enrolment'].diff().fillna(0)
+
+    # Time Features
+    with run.stage("feature.time", rows_in=len(df)):
+        df['month'] = df['date'].dt.month
+        df['is_weekend'] = df['date'].dt.dayofweek.apply(lambda x: 1 if x >= 5 else 0)
+    return df
 
 # ==========================================
-# 5. SAVE
+# EXECUTION
 # ==========================================
-df.to_csv(OUTPUT_FILE, index=False)
-print(f"\n🎉 SUCCESS! Feature Engineering Complete.")
-print(f"💾 Saved to: {OUTPUT_FILE}")
\ No newline at end of file
+if __name__ == "__main__":
+    run = RunReport("featureaddition")
+
+    print(f"🚀 Loading {INPUT_FILE}...")
+    with run.stage("load") as s:
+        df = pd.read_csv(INPUT_FILE)
+        s.rows_out = len(df)
+
+    print("   - Renaming columns...")
+    df, missing = rename_columns(df)
+
+    # Verify Renaming
+    if missing:
+        print(f"❌ ERROR: Still missing columns: {missing}")
+        print(f"   Current Columns: {list(df.columns)}")
+        run.save()
+        exit()
+    else:
+        print("   ✅ Rename successful.")
+
+    df = add_features(df, run)
+
+    # ==========================================
+    # 5. SAVE
+    # ==========================================
+    with run.stage("save.features", rows_in=len(df)):
+        df.to_csv(OUTPUT_FILE, index=False)
+    # Columnar copy for the out-of-core (DuckDB) compute backend
+    with run.stage("save.features_parquet", rows_in=len(df)):
+        df.to_parquet(columnar_path(OUTPUT_FILE), index=False)
+    print(f"\n🎉 SUCCESS! Feature Engineering Complete.")
+    print(f"💾 Saved to: {OUTPUT_FILE}")
+
+    # Pincode-indexed, memory-mapped daily series for the dashboard drill-down
+    with run.stage("save.pincode_store", rows_in=len(df)) as s:
+        pin_count = build_store(df)
+        s.rows_out = pin_count
+    print(f"📈 Pincode Store: {pin_count} pincodes --> {STORE_FOLDER}/")
+
+    print(f"📊 Run report: {run.save()}")
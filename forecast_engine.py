@@ -0,0 +1,185 @@
+import pandas as pd
+import numpy as np
+import json
+from compute_backend import get_backend
+from changepoint_engine import pincode_bin_matrix
+from dashboard_aggregates import ENGINE_OUTPUTS, SUMMARY_FOLDER, save_summaries, load_engine_outputs
+from instrumentation import RunReport
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+INPUT_FILE = "aadhaar_features_ready_for_ML.csv"
+OUTPUT_FORECAST = ENGINE_OUTPUTS["forecast"]
+BACKTEST_FILE = "forecast_backtest.json"
+
+# Demand series to forecast: {output prefix: feature column}
+TARGETS = {"enrol": 'total_enrolment', "bio": 'total_bio_updates'}
+
+HORIZON_DAYS = 30            # Forecast the next 30 days
+FIT_DAYS = 182               # Trend is fitted on the last ~6 months
+BACKTEST_FOLDS = 3           # Rolling origins: 30, 60, 90 days before the end
+
+# ==========================================
+# 1. SHARED DESIGN MATRIX
+# ==========================================
+def design_matrix(t, dates):
+    """
+    [1, t, day-of-week dummies (Mon..Sat)] for every day. The same matrix
+    serves every pincode, so one least-squares solve fits them all.
+    """
+    dow = pd.DatetimeIndex(dates).dayofweek.to_numpy()
+    dummies = (dow[:, None] == np.arange(6)[None, :]).astype(float)
+    return np.column_stack([np.ones(len(t)), t, dummies])
+
+def fit_predict(Y, dates, horizon=HORIZON_DAYS):
+    """
+    Fits trend + weekly seasonality to each row of Y (pincode x day) with a
+    single lstsq over all rows at once, and returns the next `horizon`
+    days per row (pincode x horizon). Days are left unclipped: clipping the
+    negative days of a sparse pincode before summing inflates its total,
+    so only horizon totals are clipped (horizon_total).
+    """
+    n = Y.shape[1]
+    t = np.arange(n) / n
+    X = design_matrix(t, dates)
+    coef, *_ = np.linalg.lstsq(X, Y.T, rcond=None)      # (features x pincodes)
+
+    future_t = np.arange(n, n + horizon) / n
+    future_dates = pd.DatetimeIndex(dates)[-1] + pd.to_timedelta(np.arange(1, horizon + 1), unit='D')
+    forecast = design_matrix(future_t, future_dates) @ coef
+    return forecast.T
+
+def horizon_total(Y, dates, horizon=HORIZON_DAYS):
+    """Forecast demand over the next `horizon` days per pincode (never below zero)."""
+    return fit_predict(Y, dates, horizon).sum(axis=1).clip(0)
+
+def naive_total(Y, horizon=HORIZON_DAYS):
+    """Baseline: the next `horizon` days repeat the last `horizon` days."""
+    return Y[:, -horizon:].sum(axis=1)
+
+def daily_matrix(backend, col, run):
+    """Pincode x day matrix of `col` (oldest day first) plus its dates."""
+    with run.stage(f"groupby.daily.{col}") as s:
+        binned = backend.binned_totals(col, bin_days=1)
+        s.rows_out = len(binned)
+    pincodes, Y = pincode_bin_matrix(binned)
+    dates = pd.date_range(end=backend.latest_date(), periods=Y.shape[1], freq='D')
+    return pincodes, Y, dates
+
+# ==========================================
+# 2. BACKTEST HARNESS
+# ==========================================
+def backtest(Y, dates, folds=BACKTEST_FOLDS, horizon=HORIZON_DAYS, fit_days=FIT_DAYS):
+    """
+    Rolling-origin backtest: refit on the `fit_days` before each origin and
+    score the next `horizon` days' total per pincode against the actuals.
+    The naive baseline repeats the previous `horizon` days.
+    """
+    results = []
+    n = Y.shape[1]
+    for fold in range(folds, 0, -1):
+        origin = n - fold * horizon
+        start = origin - fit_days
+        if start < 0:
+            continue
+        predicted = horizon_total(Y[:, start:origin], dates[start:origin], horizon)
+        actual = Y[:, origin:origin + horizon].sum(axis=1)
+        naive = naive_total(Y[:, :origin], horizon)
+
+        volume = max(actual.sum(), 1e-9)
+        results.append({
+            "origin": str(dates[origin].date()),
+            "pincodes": int(len(actual)),
+            "actual_total": round(float(actual.sum()), 1),
+            "forecast_total": round(float(predicted.sum()), 1),
+            "mae": round(float(np.abs(predicted - actual).mean()), 3),
+            "wape": round(float(np.abs(predicted - actual).sum() / volume), 4),
+            "bias": round(float((predicted - actual).sum() / volume), 4),
+            "naive_wape": round(float(np.abs(naive - actual).sum() / volume), 4)
+        })
+    return results
+
+def model_beats_naive(folds):
+    """True if the fitted model's WAPE, summed over the backtest folds, is
+    below the naive baseline's (and there was at least one fold)."""
+    return bool(folds) and sum(f["wape"] for f in folds) < sum(f["naive_wape"] for f in folds)
+
+# ==========================================
+# 3. FORECAST ENGINE
+# ==========================================
+def run_forecast_engine(backend, run, targets=TARGETS, horizon=HORIZON_DAYS, fit_days=FIT_DAYS):
+    """
+    Returns (per-pincode forecast frame, {target: {"method", "folds"}}).
+    A target whose model loses to the naive baseline in the backtest is
+    forecast with the naive baseline instead.
+    """
+    columns = {}
+    scores = {}
+    for name, col in targets.items():
+        pincodes, Y, dates = daily_matrix(backend, col, run)
+
+        with run.stage(f"backtest.{name}", rows_in=len(pincodes)):
+            folds = backtest(Y, dates, horizon=horizon, fit_days=fit_days)
+        method = "model" if model_beats_naive(folds) else "naive"
+        scores[name] = {"method": method, "folds": folds}
+
+        with run.stage(f"fit.{name}", rows_in=len(pincodes)) as s:
+            if method == "model":
+                forecast = horizon_total(Y[:, -fit_days:], dates[-fit_days:], horizon)
+            else:
+                forecast = naive_total(Y, horizon)
+            s.rows_out = len(forecast)
+
+        columns[name] = pd.DataFrame({
+            'pincode': pincodes,
+            f'{name}_last_{horizon}d': naive_total(Y, horizon).round(1),
+            f'{name}_forecast_{horizon}d': forecast.round(1)
+        }).set_index('pincode')
+
+    forecasts = pd.concat(columns.values(), axis=1).fillna(0).reset_index()
+
+    # Label each pincode with its busiest (state, district)
+    with run.stage("groupby.locations") as s:
+        places = backend.pincode_stats({"volume": ('total_enrolment', 'sum')})
+        places = (places.sort_values('volume', ascending=False, kind='stable')
+                        .drop_duplicates('pincode')[['state', 'district', 'pincode']])
+        s.rows_out = len(places)
+    forecasts = places.merge(forecasts, on='pincode', how='inner')
+    return forecasts.sort_values(['state', 'district', 'pincode'], kind='stable').reset_index(drop=True), scores
+
+# ==========================================
+# EXECUTION
+# ==========================================
+if __name__ == "__main__":
+    run = RunReport("forecast_engine")
+
+    print(f"🚀 Loading Master Dataset: {INPUT_FILE}...")
+    with run.stage("load") as s:
+        backend = get_backend(INPUT_FILE)
+        s.rows_out = len(backend)
+    print(f"   ⚙️ Compute Backend: {backend.name}")
+    print(f"   📅 Data Reference Date: {backend.latest_date().date()}")
+
+    print(f"\n--- 🔮 Forecasting Next {HORIZON_DAYS} Days (trend + weekday, batched lstsq) ---")
+    forecasts, scores = run_forecast_engine(backend, run)
+    print(f"   🔮 Forecast {len(forecasts)} Pincodes")
+
+    for name, score in scores.items():
+        for fold in score["folds"]:
+            print(f"   🧪 [{name}] origin {fold['origin']}: WAPE {fold['wape']:.1%} "
+                  f"(naive {fold['naive_wape']:.1%}), bias {fold['bias']:+.1%}")
+        if score["method"] == "naive":
+            print(f"   ↩️ [{name}] model lost to the naive baseline; forecasting the last {HORIZON_DAYS} days forward")
+
+    with run.stage("save.forecast", rows_in=len(forecasts)):
+        forecasts.to_csv(OUTPUT_FORECAST, index=False)
+    with open(BACKTEST_FILE, "w") as fh:
+        json.dump({"horizon_days": HORIZON_DAYS, "fit_days": FIT_DAYS, "targets": scores}, fh, indent=2)
+    print(f"   💾 Saved to {OUTPUT_FORECAST} (backtest: {BACKTEST_FILE})")
+
+    # Migration Tracker capacity sizing is a dashboard summary; republish it
+    with run.stage("save.summaries"):
+        summary_tables, _ = save_summaries(load_engine_outputs())
+    print(f"   💾 {len(summary_tables)} summary tables --> {SUMMARY_FOLDER}/")
+    print(f"📊 Run report: {run.save()}")
@@ -0,0 +1,162 @@
+import pandas as pd
+import os
+from sklearn.ensemble import IsolationForest
+from sklearn.preprocessing import StandardScaler
+from compute_backend import PandasBackend, columnar_path
+from master_time_aware_engine import ENGINE_SPECS
+from neighborhood import add_context_features, prefix_totals, combine_totals
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+CHUNK_ROWS = 1_000_000          # Feature rows read at a time
+TRAIN_SAMPLE = 4096             # Centers the model is fitted on (also kept per state,
+                                # so any state's proportional share fits)
+MIN_TXNS = 50                   # Noise filter: centers with less activity are not modelled
+SEED = 42
+
+FRAUD_SPEC = ENGINE_SPECS["fraud"]
+MODEL_FEATURES = ['velocity_q3', 'max_velocity', 'weekend_activity', 'bio_rate', 'velocity_vs_region']
+
+# ==========================================
+# 1. STREAMED PER-CENTER ROWS
+# ==========================================
+def feature_chunks(path, columns, chunk_rows=CHUNK_ROWS):
+    """The features file in row chunks (the Parquet copy when there is one)."""
+    parquet = columnar_path(path)
+    if os.path.exists(parquet):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(parquet).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_rows, float_precision='round_trip')
+
+def center_batches(path, spec=FRAUD_SPEC, chunk_rows=CHUNK_ROWS):
+    """
+    Per (state, district, pincode) aggregates over the whole history, one
+    batch per chunk. featureaddition.py writes the file sorted by pincode,
+    so a center is complete once a later pincode shows up; the rows of the
+    last pincode in a chunk are carried into the next one.
+    """
+    columns = ['date', 'state', 'district', 'pincode'] + sorted({col for col, _ in spec.values()})
+    carry = None
+    for chunk in feature_chunks(path, columns, chunk_rows):
+        chunk['date'] = pd.to_datetime(chunk['date'])
+        chunk = chunk[chunk['pincode'].notna()]
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        if chunk.empty:
+            continue
+        if not chunk['pincode'].is_monotonic_increasing:
+            raise ValueError(f"{path} is not sorted by pincode; re-run featureaddition.py")
+        tail = (chunk['pincode'] == chunk['pincode'].iloc[-1]).to_numpy()
+        carry = chunk[tail]
+        if (~tail).any():
+            yield center_stats(chunk[~tail], spec)
+    if carry is not None and len(carry):
+        yield center_stats(carry, spec)
+
+def center_stats(rows, spec=FRAUD_SPEC):
+    stats = PandasBackend(df=rows).pincode_stats(spec)
+    stats['bio_rate'] = stats['bio_sum'] / (stats['total_txns'] + 1)
+    return stats
+
+# ==========================================
+# 2. STRATIFIED RESERVOIR
+# ==========================================
+class StratifiedReservoir:
+    """
+    Uniform sample of up to `size` rows per stratum from a stream of
+    batches. Every row gets a pseudo-random key hashed from its center and
+    each stratum keeps its `size` smallest keys (bottom-k sampling,
+    equivalent to a classic reservoir), so memory is strata x size however
+    long the stream is, and the sample does not depend on how it was chunked.
+    """
+
+    def __init__(self, column='state', size=TRAIN_SAMPLE, key_columns=('state', 'district', 'pincode'),
+                 seed=SEED):
+        self.column = column
+        self.size = size
+        self.key_columns = list(key_columns)
+        self.hash_key = f"{seed:016d}"[-16:]
+        self.rows = None
+        self.seen = pd.Series(dtype='int64')
+
+    def add(self, batch):
+        keys = pd.util.hash_pandas_object(batch[self.key_columns], index=False, hash_key=self.hash_key)
+        batch = batch.assign(_key=keys.to_numpy())
+        self.seen = self.seen.add(batch[self.column].value_counts(), fill_value=0).astype('int64')
+        pool = batch if self.rows is None else pd.concat([self.rows, batch], ignore_index=True)
+        pool = pool.sort_values('_key', kind='stable')
+        self.rows = pool[pool.groupby(self.column, observed=True).cumcount() < self.size]
+
+    def draw(self, total=TRAIN_SAMPLE):
+        """
+        A training set of about `total` rows with each stratum in proportion
+        to how many rows it had in the stream (at least one row each).
+        """
+        if self.rows is None:
+            return pd.DataFrame()
+        quota = (self.seen / self.seen.sum() * total).round().clip(lower=1).astype('int64')
+        # Reservoir rows are in random-key order, so the first n of a stratum are a uniform n
+        rank = self.rows.groupby(self.column, observed=True).cumcount()
+        keep = rank < self.rows[self.column].map(quota)
+        return self.rows[keep].drop(columns='_key').reset_index(drop=True)
+
+# ==========================================
+# 3. TRAIN ON THE SAMPLE, SCORE IN BATCHES
+# ==========================================
+def train_and_score(path, run, boom_pincodes=(), contamination=0.01, min_txns=MIN_TXNS,
+                    train_sample=TRAIN_SAMPLE, chunk_rows=CHUNK_ROWS):
+    """
+    Two streamed passes over the features file. Pass 1 samples active
+    centers per state and sums the pincode-prefix totals the neighborhood
+    features need; the model is fitted on the sample. Pass 2 rebuilds each
+    batch, scores it, and keeps only the flagged centers. Memory is one
+    chunk plus the reservoir, whatever the size of the dataset.
+
+    Returns (suspects with anomaly/severity scores, active center count,
+    training sample size).
+    """
+    boom_pincodes = list(boom_pincodes)
+    reservoir = StratifiedReservoir(size=max(train_sample, 1))
+    totals = None
+
+    with run.stage("pass1.sample") as s:
+        centers = 0
+        for batch in center_batches(path, chunk_rows=chunk_rows):
+            centers += len(batch)
+            # Context covers every pincode, before the noise filter
+            totals = combine_totals(totals, prefix_totals(batch, boom_pincodes))
+            reservoir.add(batch[batch['total_txns'] > min_txns])
+        s.rows_in = centers
+        train = reservoir.draw(train_sample)
+        s.rows_out = len(train)
+
+    if train.empty:
+        return pd.DataFrame(), 0, 0
+
+    train = add_context_features(train, boom_pincodes, totals).fillna(0)
+    scaler = StandardScaler()
+    model = IsolationForest(n_estimators=100, contamination=contamination, random_state=SEED, n_jobs=-1)
+    with run.stage("model.fit", rows_in=len(train)):
+        # The 1% anomaly cut-off is calibrated on the sample's scores
+        model.fit(scaler.fit_transform(train[MODEL_FEATURES]))
+
+    suspects = []
+    active = 0
+    with run.stage("pass2.score") as s:
+        for batch in center_batches(path, chunk_rows=chunk_rows):
+            batch = add_context_features(batch, boom_pincodes, totals)
+            batch = batch[batch['total_txns'] > min_txns].fillna(0)
+            if batch.empty:
+                continue
+            active += len(batch)
+            X = scaler.transform(batch[MODEL_FEATURES])
+            batch['anomaly_score'] = model.predict(X)
+            batch['severity_score'] = model.decision_function(X)
+            suspects.append(batch[batch['anomaly_score'] == -1])
+        s.rows_in = active
+        suspects = pd.concat(suspects, ignore_index=True) if suspects else pd.DataFrame()
+        s.rows_out = len(suspects)
+    return suspects, active, len(train)
@@ -0,0 +1,168 @@
+import pandas as pd
+import numpy as np
+import json
+import os
+from canonical_names import STATE_ALIASES, canonical_state
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+QUARANTINE_FOLDER = "quarantine"
+STATS_FILE = "validation_stats.json"
+
+KEY_COLUMNS = ['date', 'state', 'district', 'pincode']
+
+# Reason codes are bit flags, so one row can carry several
+REASONS = {
+    "BAD_DATE": 1,            # unparseable date
+    "DATE_OUT_OF_RANGE": 2,   # before Aadhaar existed, or in the future
+    "BAD_PINCODE": 4,         # not a 6-digit Indian pincode
+    "MISSING_LOCATION": 8,    # empty state / district
+    "UNKNOWN_STATE": 16,      # no canonical state for the name (e.g. "100000")
+    "BAD_COUNT": 32,          # count column missing or non-numeric
+    "NEGATIVE_COUNT": 64
+}
+
+MIN_DATE = pd.Timestamp("2009-01-01")
+PINCODE_RANGE = (110000, 999999)
+KNOWN_STATES = set(STATE_ALIASES)
+
+# ==========================================
+# 1. COLUMN MASKS (one vectorized pass)
+# ==========================================
+def distinct_flags(values, test):
+    """Applies `test` once per distinct value and broadcasts it back to the
+    rows through the factorized codes. Missing values come back True."""
+    codes, uniques = pd.factorize(values)
+    flags = np.array([test(v) for v in uniques], dtype=bool)
+    return np.where(codes >= 0, flags[codes] if len(flags) else False, True)
+
+def reason_masks(df):
+    """
+    Returns (parsed dates, numeric pincodes, uint8 reason bits per row).
+    Every check is a whole-column operation; the name checks run once per
+    distinct spelling.
+    """
+    n = len(df)
+    bits = np.zeros(n, dtype=np.uint8)
+    # A key column missing from the schema fails its check on every row
+    df = df.assign(**{c: np.nan for c in KEY_COLUMNS if c not in df.columns})
+
+    def flag(mask, reason):
+        np.bitwise_or(bits, np.where(mask, REASONS[reason], 0).astype(np.uint8), out=bits)
+
+    # Parse each distinct date string once (a dump has a few hundred at most).
+    # factorize keeps first-seen order, so format inference sees the same first value.
+    codes, uniques = pd.factorize(df['date'])
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), dayfirst=True, errors='coerce')
+    # Missing values have code -1, which picks the NaT appended at the end
+    lookup = np.append(parsed.to_numpy(dtype='datetime64[ns]'), np.datetime64('NaT', 'ns'))
+    dates = pd.Series(lookup[codes], index=df.index)
+    flag(dates.isna().to_numpy(), "BAD_DATE")
+    flag(((dates < MIN_DATE) | (dates > pd.Timestamp.now())).to_numpy(), "DATE_OUT_OF_RANGE")
+
+    pins = pd.to_numeric(df['pincode'], errors='coerce')
+    flag((~pins.between(*PINCODE_RANGE) | (pins % 1 != 0)).to_numpy(), "BAD_PINCODE")
+
+    blank = lambda v: str(v).strip() == ""
+    missing = distinct_flags(df['state'], blank) | distinct_flags(df['district'], blank)
+    flag(missing, "MISSING_LOCATION")
+    unknown = distinct_flags(df['state'], lambda v: canonical_state(v) not in KNOWN_STATES)
+    flag(unknown & ~missing, "UNKNOWN_STATE")
+
+    counts = df[[c for c in df.columns if c not in KEY_COLUMNS]]
+    if len(counts.columns):
+        counts = counts.apply(lambda c: c if pd.api.types.is_numeric_dtype(c) else pd.to_numeric(c, errors='coerce'))
+        flag(counts.isna().any(axis=1).to_numpy(), "BAD_COUNT")
+        flag((counts < 0).any(axis=1).to_numpy(), "NEGATIVE_COUNT")
+    return dates, pins, bits
+
+def reason_labels(bits):
+    """uint8 bits -> 'BAD_DATE|UNKNOWN_STATE' (only called on the rejects)."""
+    labels = pd.Series("", index=range(len(bits)), dtype=object)
+    for name, bit in REASONS.items():
+        hit = (bits & bit) != 0
+        labels[hit] = labels[hit] + "|" + name
+    return labels.str.lstrip("|").to_numpy()
+
+# ==========================================
+# 2. VALIDATION LOG (quarantine + per-file stats)
+# ==========================================
+class ValidationLog:
+    """
+    Collects the validation results of one ingest run. Rejected rows are
+    written to <folder>/<dataset>_rejects.csv.gz with their source file,
+    row number and reason codes; per-file counts go to validation_stats.json.
+    A dataset can be validated in several calls (one per API page); the
+    rejects of the run accumulate in one file.
+    """
+
+    def __init__(self, folder=QUARANTINE_FOLDER):
+        self.folder = folder
+        self.stats = {}
+        self.started = set()   # datasets whose rejects file belongs to this run
+        os.makedirs(folder, exist_ok=True)
+
+    def file_error(self, dataset, path, error):
+        self.stats.setdefault(dataset, []).append({"file": path, "error": str(error)})
+
+    def validate(self, df, dataset, sources=None):
+        """
+        Returns the valid rows with `date` parsed, `pincode` as int64 and
+        every count as float64, whatever types the files were read with, so
+        duplicates compare equal and the datasets join on the same key type.
+        `sources` lists (file name, row count) in the order the rows were
+        concatenated.
+        """
+        sources = sources or [(dataset, len(df))]
+        dates, pins, bits = reason_masks(df)
+        bad = bits != 0
+        file_ids = np.repeat(np.arange(len(sources)), [rows for _, rows in sources])
+
+        # Per-file counts: one bincount per reason instead of a mask per file
+        n_files = len(sources)
+        rejected = np.bincount(file_ids[bad], minlength=n_files)
+        by_reason = {name: np.bincount(file_ids[(bits & bit) != 0], minlength=n_files)
+                     for name, bit in REASONS.items()}
+        for i, (path, rows) in enumerate(sources):
+            self.stats.setdefault(dataset, []).append({
+                "file": path,
+                "rows": int(rows),
+                "valid": int(rows - rejected[i]),
+                "rejected": int(rejected[i]),
+                "reasons": {name: int(c[i]) for name, c in by_reason.items() if c[i]}
+            })
+
+        reject_path = os.path.join(self.folder, f"{dataset}_rejects.csv.gz")
+        if dataset not in self.started:
+            self.started.add(dataset)
+            if os.path.exists(reject_path):
+                os.remove(reject_path)
+        if bad.any():
+            offsets = np.concatenate([[0], np.cumsum([rows for _, rows in sources])[:-1]])
+            positions = np.flatnonzero(bad)
+            rejects = df.iloc[positions].copy()
+            rejects.insert(0, 'reason', reason_labels(bits[positions]))
+            rejects.insert(1, 'source_file', [sources[i][0] for i in file_ids[positions]])
+            rejects.insert(2, 'source_row', positions - offsets[file_ids[positions]])
+            # Appending adds a gzip member; readers see one continuous CSV
+            rejects.to_csv(reject_path, mode='a', header=not os.path.exists(reject_path),
+                           index=False, compression='gzip')
+
+        clean = df[~bad].copy()
+        clean['date'] = dates[~bad]
+        clean['pincode'] = pins[~bad].astype('int64')
+        for c in clean.columns.difference(KEY_COLUMNS):
+            if clean[c].dtype != 'float64':
+                clean[c] = pd.to_numeric(clean[c]).astype('float64')
+        return clean
+
+    def totals(self, dataset):
+        entries = [e for e in self.stats.get(dataset, []) if "rows" in e]
+        return sum(e["rows"] for e in entries), sum(e["rejected"] for e in entries)
+
+    def save(self):
+        path = os.path.join(self.folder, STATS_FILE)
+        with open(path, "w") as fh:
+            json.dump(self.stats, fh, indent=2)
+        return path
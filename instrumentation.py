@@ -0,0 +1,189 @@
+import os
+import sys
+import json
+import time
+import cProfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+REPORT_FOLDER = "run_reports"
+
+# Set to a stage name (e.g. "groupby.pin_stats") to dump a cProfile of that stage
+PROFILE_ENV = "DRISHTI_PROFILE_STAGE"
+
+# How often the background sampler reads the process RSS
+SAMPLE_INTERVAL_SECONDS = 0.05
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# ==========================================
+# 1. MEMORY PROBES
+# ==========================================
+_sampled_peak_mb = 0.0
+
+def _windows_rss_mb():
+    """Working set of this process via psapi, or None off Windows."""
+    if sys.platform != "win32":
+        return None
+    import ctypes
+    from ctypes import wintypes
+
+    class Counters(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+            (field, ctypes.c_size_t) for field in (
+                "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage",
+                "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage",
+                "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+    counters = Counters()
+    counters.cb = ctypes.sizeof(counters)
+    handle = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+        return None
+    return counters.WorkingSetSize / 2**20
+
+def current_rss_mb():
+    """Resident set size right now (falls back to the peak where /proc is missing)."""
+    global _sampled_peak_mb
+    try:
+        with open("/proc/self/statm") as fh:
+            rss = int(fh.read().split()[1]) * PAGE_SIZE / 2**20
+    except (OSError, IndexError, ValueError):
+        rss = _windows_rss_mb() if resource is None else peak_rss_mb()
+        if rss is None:
+            return _sampled_peak_mb
+    _sampled_peak_mb = max(_sampled_peak_mb, rss)
+    return rss
+
+def peak_rss_mb():
+    """Process peak RSS from getrusage; without the resource module (Windows),
+    the highest RSS current_rss_mb has sampled so far."""
+    if resource is None:
+        return _sampled_peak_mb
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+# ==========================================
+# 2. RUN REPORT
+# ==========================================
+class StageRecord:
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.rss_start_mb = current_rss_mb()
+        self.rss_end_mb = None
+        self.peak_rss_mb = self.rss_start_mb
+        self.profile = None
+
+    def as_dict(self):
+        record = {
+            "stage": self.name,
+            "wall_seconds": round(self.wall_seconds, 4),
+            "cpu_seconds": round(self.cpu_seconds, 4),
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "rss_start_mb": round(self.rss_start_mb, 1),
+            "rss_end_mb": round(self.rss_end_mb, 1),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out
+        }
+        if self.profile:
+            record["profile"] = self.profile
+        return record
+
+class RunReport:
+    """
+    Times every named stage of a pipeline script and writes a JSON run
+    report. Usage:
+
+        run = RunReport("merge")
+        with run.stage("load.enrolment") as s:
+            df = ...
+            s.rows_out = len(df)
+        run.save()
+
+    Stages may nest; a nested stage is recorded as "outer/inner". A
+    background thread samples RSS so each stage gets its own peak.
+    """
+
+    def __init__(self, script, folder=REPORT_FOLDER):
+        self.script = script
+        self.folder = folder
+        self.started = time.time()
+        self.records = []
+        self._active = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._profile_stage = os.environ.get(PROFILE_ENV)
+        self._sampler = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+        self._sampler.start()
+
+    def _sample(self):
+        while not self._stop.wait(SAMPLE_INTERVAL_SECONDS):
+            rss = current_rss_mb()
+            with self._lock:
+                for record in self._active:
+                    record.peak_rss_mb = max(record.peak_rss_mb, rss)
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        with self._lock:
+            path = "/".join([r.name for r in self._active] + [name])
+            record = StageRecord(path, rows_in)
+            self._active.append(record)
+
+        profiler = None
+        if self._profile_stage in (name, path):
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_seconds = time.perf_counter() - wall
+            record.cpu_seconds = time.process_time() - cpu
+            if profiler is not None:
+                profiler.disable()
+                os.makedirs(self.folder, exist_ok=True)
+                record.profile = os.path.join(self.folder, f"{self.script}_{path.replace('/', '.')}.prof")
+                profiler.dump_stats(record.profile)
+
+            rss = current_rss_mb()
+            with self._lock:
+                record.rss_end_mb = rss
+                record.peak_rss_mb = max(record.peak_rss_mb, rss)
+                self._active.remove(record)
+                self.records.append(record)
+
+    def stop(self):
+        """Stops the RSS sampler (for reports that are read in-process, not saved)."""
+        self._stop.set()
+
+    def save(self):
+        """Writes <script>_<timestamp>.json and <script>_latest.json; returns the path."""
+        self.stop()
+        report = {
+            "script": self.script,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "total_wall_seconds": round(time.time() - self.started, 3),
+            "process_peak_rss_mb": round(peak_rss_mb(), 1),
+            "stages": [r.as_dict() for r in self.records]
+        }
+        os.makedirs(self.folder, exist_ok=True)
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(self.started))
+        path = os.path.join(self.folder, f"{self.script}_{stamp}.json")
+        for target in (path, os.path.join(self.folder, f"{self.script}_latest.json")):
+            with open(target, "w") as fh:
+                json.dump(report, fh, indent=2)
+        return path
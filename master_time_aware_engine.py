@@ -2,6 +2,11 @@ import pandas as pd
 import numpy as np
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
+from dashboard_aggregates import save_summaries, load_engine_outputs, ENGINE_OUTPUTS, SUMMARY_FOLDER
+from compute_backend import get_backend
+from neighborhood import add_context_features, in_migration_neighborhood
+from alert_delta import record_run, CHANGE_ORDER, DELTA_FILE
+from instrumentation import RunReport
 
 # ==========================================
 # CONFIGURATION
@@ -14,180 +19,268 @@ OUTPUT_BOOM   = "engine_boom_180days.csv"
 OUTPUT_GHOST  = "engine_ghost_3years.csv"
 OUTPUT_DIGITAL= "engine_digital_1year.csv"
 
-print(f"🚀 Loading Master Dataset: {INPUT_FILE}...")
-df = pd.read_csv(INPUT_FILE)
+# Look-back horizon per engine (days before the latest date in the data)
+HORIZONS = {"fraud": 30, "boom": 180, "ghost": 365 * 3, "digital": 365}
 
-# 1. TIME INDEXING (Mandatory Rule 1)
-df['date'] = pd.to_datetime(df['date'])
-LATEST_DATE = df['date'].max()
-print(f"   📅 Data Reference Date: {LATEST_DATE.date()}")
-
-# ==========================================
-# HELPER: TIME SLICER
-# ==========================================
-def get_time_slice(days):
-    """Returns data from (Latest Date - Days) to Latest Date"""
-    cutoff = LATEST_DATE - pd.Timedelta(days=days)
-    return df[df['date'] >= cutoff].copy()
+# Per-pincode aggregates each engine needs: {output: (input column, function)}
+# Run by compute_backend, so the same spec works on pandas or DuckDB.
+ENGINE_SPECS = {
+    "fraud": {
+        "total_txns":       ('total_enrolment', 'sum'),
+        "velocity_q3":      ('enrol_velocity', 'q3'),
+        "max_velocity":     ('enrol_velocity', 'max'),
+        "weekend_activity": ('is_weekend', 'mean'),
+        "bio_sum":          ('total_bio_updates', 'sum')
+    },
+    "boom": {
+        "velocity_q3": ('enrol_velocity', 'q3'),
+        "volume_sum":  ('total_enrolment', 'sum'),
+        "child_ratio": ('child_ratio', 'mean')
+    },
+    "ghost": {
+        "elderly_pressure_median": ('elderly_pressure', 'median'),
+        "volume_median":           ('total_enrolment', 'median')
+    },
+    "digital": {
+        "elderly_pressure": ('elderly_pressure', 'median'),
+        "bio_sum":          ('total_bio_updates', 'sum'),
+        "total_vol":        ('total_enrolment', 'sum')
+    }
+}
 
 # ==========================================
 # 🔴 ENGINE 3: INTEGRITY SHIELD (Fraud)
 # ⏳ Horizon: Last 30 Days (Short-Term Burst)
 # ==========================================
-print("\n--- 🔴 Running Engine 3: Integrity Shield (Last 30 Days) ---")
-fraud_df = get_time_slice(30)
-
-if len(fraud_df) > 0:
-    # Aggregation
-    fraud_stats = fraud_df.groupby(['state', 'district', 'pincode']).agg(
-        total_txns=('total_enrolment', 'sum'),
-        velocity_q3=('enrol_velocity', lambda x: x.quantile(0.75)),
-        max_velocity=('enrol_velocity', 'max'),
-        weekend_activity=('is_weekend', 'mean'),
-        bio_sum=('total_bio_updates', 'sum')
-    ).reset_index()
+def explain_fraud(row):
+    reasons = []
+    if row['weekend_activity'] > 0.4: reasons.append("Suspicious Weekend Activity")
+    if row['velocity_q3'] > 50: reasons.append("Sustained High Speed")
+    if row['bio_rate'] < 0.1: reasons.append("Abnormally Low Bio Updates")
+    if row['velocity_vs_region'] > 3: reasons.append("Far Faster Than Neighboring Pincodes")
+    return ", ".join(reasons) if reasons else "Pattern Anomaly"
 
+def detect_fraud(fraud_stats, run, boom_pincodes=(), contamination=0.01, min_txns=10):
     # Feature Engineering
     fraud_stats['bio_rate'] = fraud_stats['bio_sum'] / (fraud_stats['total_txns'] + 1)
-    
+
+    # Spatial Context: regional speed + Boom Town share among neighboring pincodes
+    with run.stage("neighborhood", rows_in=len(fraud_stats)):
+        fraud_stats = add_context_features(fraud_stats, boom_pincodes)
+
     # Filter Noise
-    active_fraud = fraud_stats[fraud_stats['total_txns'] > 10].fillna(0).copy()
-    
+    active_fraud = fraud_stats[fraud_stats['total_txns'] > min_txns].fillna(0).copy()
+
     # ML: Isolation Forest
-    features = ['velocity_q3', 'max_velocity', 'weekend_activity', 'bio_rate']
+    features = ['velocity_q3', 'max_velocity', 'weekend_activity', 'bio_rate', 'velocity_vs_region']
     scaler = StandardScaler()
     X_scaled = scaler.fit_transform(active_fraud[features])
-    
-    model = IsolationForest(contamination=0.01, random_state=42)
-    active_fraud['anomaly_score'] = model.fit_predict(X_scaled)
-    active_fraud['severity_score'] = model.decision_function(X_scaled)
-    
+
+    model = IsolationForest(contamination=contamination, random_state=42)
+    with run.stage("model.fit", rows_in=len(active_fraud)):
+        active_fraud['anomaly_score'] = model.fit_predict(X_scaled)
+    with run.stage("model.score", rows_in=len(active_fraud)) as s:
+        active_fraud['severity_score'] = model.decision_function(X_scaled)
+        s.rows_out = int((active_fraud['anomaly_score'] == -1).sum())
+
     # Extract Suspects
     fraud_suspects = active_fraud[active_fraud['anomaly_score'] == -1].copy()
-    
-    # Explainability
-    def explain_fraud(row):
-        reasons = []
-        if row['weekend_activity'] > 0.4: reasons.append("Suspicious Weekend Activity")
-        if row['velocity_q3'] > 50: reasons.append("Sustained High Speed")
-        if row['bio_rate'] < 0.1: reasons.append("Abnormally Low Bio Updates") 
-        return ", ".join(reasons) if reasons else "Pattern Anomaly"
 
-    fraud_suspects['risk_reason'] = fraud_suspects.apply(explain_fraud, axis=1)
-    print(f"   🚨 Detected {len(fraud_suspects)} Short-Term Fraud Suspects")
-else:
-    print("   ⚠️ Insufficient data for 30-day window.")
-    fraud_suspects = pd.DataFrame()
+    # Explainability
+    with run.stage("explain", rows_in=len(fraud_suspects)):
+        fraud_suspects['risk_reason'] = fraud_suspects.apply(explain_fraud, axis=1)
+    return fraud_suspects
 
 # ==========================================
 # 🔥 ENGINE 1A: BOOM TOWNS
 # ⏳ Horizon: Last 180 Days (Seasonal Migration)
 # ==========================================
-print("\n--- 🔥 Running Engine 1A: Boom Towns (Last 6 Months) ---")
-boom_df = get_time_slice(180)
-
-boom_stats = boom_df.groupby(['state', 'district', 'pincode']).agg(
-    velocity_q3=('enrol_velocity', lambda x: x.quantile(0.75)),
-    volume_sum=('total_enrolment', 'sum'),
-    child_ratio=('child_ratio', 'mean')
-).reset_index().fillna(0)
-
-# Thresholds
-vel_95 = boom_stats['velocity_q3'].quantile(0.95)
-vol_med = boom_stats['volume_sum'].median()
+def detect_boom(boom_stats, velocity_quantile=0.95, max_child_ratio=0.3):
+    boom_stats = boom_stats.fillna(0)
 
-# Detection
-boom_towns = boom_stats[
-    (boom_stats['velocity_q3'] > vel_95) & 
-    (boom_stats['volume_sum'] > vol_med) & 
-    (boom_stats['child_ratio'] < 0.3)
-].copy()
+    # Thresholds
+    vel_95 = boom_stats['velocity_q3'].quantile(velocity_quantile)
+    vol_med = boom_stats['volume_sum'].median()
 
-print(f"   🔥 Identified {len(boom_towns)} Migration Hubs")
-boom_towns.to_csv(OUTPUT_BOOM, index=False)
+    # Detection
+    return boom_stats[
+        (boom_stats['velocity_q3'] > vel_95) &
+        (boom_stats['volume_sum'] > vol_med) &
+        (boom_stats['child_ratio'] < max_child_ratio)
+    ].copy()
 
 # ==========================================
 # 👻 ENGINE 1B: GHOST VILLAGES
 # ⏳ Horizon: Last 3 Years (Structural Ageing)
 # ==========================================
-print("\n--- 👻 Running Engine 1B: Ghost Villages (Last 3 Years) ---")
-ghost_df = get_time_slice(365 * 3)
-
-ghost_stats = ghost_df.groupby(['state', 'district', 'pincode']).agg(
-    elderly_pressure_median=('elderly_pressure', 'median'),
-    volume_median=('total_enrolment', 'median')
-).reset_index().fillna(0)
-
-# Thresholds
-press_90 = ghost_stats['elderly_pressure_median'].quantile(0.90)
-vol_base = ghost_stats['volume_median'].median()
+def detect_ghost(ghost_stats, pressure_quantile=0.90):
+    ghost_stats = ghost_stats.fillna(0)
 
-# Detection
-ghost_villages = ghost_stats[
-    (ghost_stats['elderly_pressure_median'] > press_90) &
-    (ghost_stats['volume_median'] <= vol_base)
-].copy()
+    # Thresholds
+    press_90 = ghost_stats['elderly_pressure_median'].quantile(pressure_quantile)
+    vol_base = ghost_stats['volume_median'].median()
 
-print(f"   👻 Identified {len(ghost_villages)} Long-Term Ghost Villages")
-ghost_villages.to_csv(OUTPUT_GHOST, index=False)
+    # Detection
+    return ghost_stats[
+        (ghost_stats['elderly_pressure_median'] > press_90) &
+        (ghost_stats['volume_median'] <= vol_base)
+    ].copy()
 
 # ==========================================
 # 📱 ENGINE 1C: DIGITAL DIVIDE OVERLAY
 # ⏳ Horizon: Last 1 Year (Adoption Curve)
 # ==========================================
-print("\n--- 📱 Running Engine 1C: Digital Divide (Last 1 Year) ---")
-digital_df = get_time_slice(365)
+def detect_digital(digital_stats, grey_quantile=0.80, tech_quantile=0.25, min_volume=50):
+    digital_stats = digital_stats.fillna(0)
+    digital_stats['bio_rate'] = digital_stats['bio_sum'] / (digital_stats['total_vol'] + 1)
 
-digital_stats = digital_df.groupby(['state', 'district', 'pincode']).agg(
-    elderly_pressure=('elderly_pressure', 'median'),
-    bio_sum=('total_bio_updates', 'sum'),
-    total_vol=('total_enrolment', 'sum')
-).reset_index().fillna(0)
+    # Thresholds
+    grey_80 = digital_stats['elderly_pressure'].quantile(grey_quantile)
+    tech_25 = digital_stats['bio_rate'].quantile(tech_quantile)
 
-digital_stats['bio_rate'] = digital_stats['bio_sum'] / (digital_stats['total_vol'] + 1)
+    digital_zones = digital_stats[
+        (digital_stats['elderly_pressure'] > grey_80) &
+        (digital_stats['bio_rate'] < tech_25) &
+        (digital_stats['total_vol'] > min_volume)
+    ].copy()
 
-# Thresholds
-grey_80 = digital_stats['elderly_pressure'].quantile(0.80)
-tech_25 = digital_stats['bio_rate'].quantile(0.25)
-
-digital_zones = digital_stats[
-    (digital_stats['elderly_pressure'] > grey_80) &
-    (digital_stats['bio_rate'] < tech_25) &
-    (digital_stats['total_vol'] > 50)
-].copy()
-
-digital_zones['action'] = "Deploy Digital Sahayak"
-print(f"   🚨 Identified {len(digital_zones)} Digital Dark Zones")
-digital_zones.to_csv(OUTPUT_DIGITAL, index=False)
+    digital_zones['action'] = "Deploy Digital Sahayak"
+    return digital_zones
 
 # ==========================================
 # 🛡️ CONTEXT-AWARE AUDIT (The Suppression Logic)
 # ==========================================
-print("\n--- 🛡️ Generating Audit Trail ---")
-if not fraud_suspects.empty and not boom_towns.empty:
+def tag_audit(row):
+    if row['_merge'] == 'both':
+        return "SUPPRESSED - Verified Migration Context"
+    elif row['migration_neighborhood']:
+        return "SUPPRESSED - Regional Migration Context"
+    else:
+        return "HIGH RISK - Action Required"
+
+def build_fraud_report(fraud_suspects, boom_towns):
+    if fraud_suspects.empty or boom_towns.empty:
+        return pd.DataFrame()
+
     # Merge Fraud Suspects with Boom Towns
     merged = pd.merge(
-        fraud_suspects, 
-        boom_towns[['state', 'district', 'pincode']], 
-        on=['state', 'district', 'pincode'], 
-        how='left', 
+        fraud_suspects,
+        boom_towns[['state', 'district', 'pincode']],
+        on=['state', 'district', 'pincode'],
+        how='left',
         indicator=True
     )
-    
-    def tag_audit(row):
-        if row['_merge'] == 'both':
-            return "SUPPRESSED - Verified Migration Context"
-        else:
-            return "HIGH RISK - Action Required"
-
+    merged['migration_neighborhood'] = in_migration_neighborhood(merged)
     merged['audit_status'] = merged.apply(tag_audit, axis=1)
-    
-    # Save Final Fraud Report
-    cols = ['state', 'district', 'pincode', 'audit_status', 'risk_reason', 'severity_score']
-    merged[cols].to_csv(OUTPUT_FRAUD, index=False)
-    
-    suppressed = len(merged[merged['audit_status'].str.contains("SUPPRESSED")])
-    print(f"   ✅ Suppressed {suppressed} False Positives using Multi-Horizon Logic.")
-    print(f"   💾 Final Fraud Report: {OUTPUT_FRAUD}")
-
-print("\n🎉 MULTI-HORIZON ANALYSIS COMPLETE.")
\ No newline at end of file
+
+    cols = ['state', 'district', 'pincode', 'audit_status', 'risk_reason', 'severity_score',
+            'velocity_vs_region', 'area_boom_share', 'region_boom_share']
+    return merged[cols]
+
+# ==========================================
+# 🚦 DETECTION & PUBLISHING (single node or partitioned_pipeline.py)
+# ==========================================
+def run_detection(stats, run):
+    """
+    Runs every engine on the per-pincode `stats` ({engine: frame}) and
+    writes the engine outputs, the alert delta and the dashboard summaries.
+    Thresholds are quantiles over the whole `stats` table, so the caller
+    must pass every pincode at once.
+    """
+    # Boom Towns first: the Integrity Shield uses them as neighborhood context
+    print("\n--- 🔥 Running Engine 1A: Boom Towns (Last 6 Months) ---")
+    boom_towns = detect_boom(stats["boom"])
+    print(f"   🔥 Identified {len(boom_towns)} Migration Hubs")
+    with run.stage("save.boom", rows_in=len(boom_towns)):
+        boom_towns.to_csv(OUTPUT_BOOM, index=False)
+
+    print("\n--- 🔴 Running Engine 3: Integrity Shield (Last 30 Days) ---")
+    if len(stats["fraud"]) > 0:
+        fraud_suspects = detect_fraud(stats["fraud"], run, boom_towns['pincode'])
+        print(f"   🚨 Detected {len(fraud_suspects)} Short-Term Fraud Suspects")
+    else:
+        print("   ⚠️ Insufficient data for 30-day window.")
+        fraud_suspects = pd.DataFrame()
+
+    print("\n--- 👻 Running Engine 1B: Ghost Villages (Last 3 Years) ---")
+    ghost_villages = detect_ghost(stats["ghost"])
+    print(f"   👻 Identified {len(ghost_villages)} Long-Term Ghost Villages")
+    with run.stage("save.ghost", rows_in=len(ghost_villages)):
+        ghost_villages.to_csv(OUTPUT_GHOST, index=False)
+
+    print("\n--- 📱 Running Engine 1C: Digital Divide (Last 1 Year) ---")
+    digital_zones = detect_digital(stats["digital"])
+    print(f"   🚨 Identified {len(digital_zones)} Digital Dark Zones")
+    with run.stage("save.digital", rows_in=len(digital_zones)):
+        digital_zones.to_csv(OUTPUT_DIGITAL, index=False)
+
+    print("\n--- 🛡️ Generating Audit Trail ---")
+    fraud_report = build_fraud_report(fraud_suspects, boom_towns)
+    if not fraud_report.empty:
+        with run.stage("save.fraud", rows_in=len(fraud_report)):
+            fraud_report.to_csv(OUTPUT_FRAUD, index=False)
+
+        suppressed = int(fraud_report['audit_status'].str.contains("SUPPRESSED").sum())
+        print(f"   ✅ Suppressed {suppressed} False Positives using Multi-Horizon Logic.")
+        print(f"   💾 Final Fraud Report: {OUTPUT_FRAUD}")
+
+    # ==========================================
+    # 🆕 ALERT DELTA (What changed since the last run)
+    # ==========================================
+    print("\n--- 🆕 Computing Alert Delta vs Previous Run ---")
+    with run.stage("alert_delta") as s:
+        delta = record_run({
+            "fraud": fraud_report,
+            "boom": boom_towns,
+            "ghost": ghost_villages,
+            "digital": digital_zones
+        })
+        s.rows_out = len(delta)
+    counts = delta['change'].value_counts()
+    print("   " + " | ".join(f"{c}: {counts.get(c, 0)}" for c in CHANGE_ORDER))
+    print(f"   💾 Delta: {DELTA_FILE}")
+
+    # ==========================================
+    # 📊 DASHBOARD SUMMARIES (Materialized Aggregates)
+    # ==========================================
+    # The dashboard renders these small tables instead of re-grouping the
+    # engine outputs on every Streamlit rerun.
+    print("\n--- 📊 Publishing Dashboard Summaries ---")
+    with run.stage("save.summaries"):
+        summary_tables, _ = save_summaries({
+            "fraud": fraud_report,
+            "boom": boom_towns,
+            "ghost": ghost_villages,
+            "digital": digital_zones,
+            # Last demand forecast (forecast_engine.py) sizes the boom capacity plan
+            "forecast": load_engine_outputs({"forecast": ENGINE_OUTPUTS["forecast"]})["forecast"]
+        })
+    print(f"   💾 {len(summary_tables)} summary tables --> {SUMMARY_FOLDER}/")
+
+# ==========================================
+# EXECUTION
+# ==========================================
+if __name__ == "__main__":
+    run = RunReport("master_time_aware_engine")
+
+    # Aggregations run in the backend picked by $DRISHTI_BACKEND (pandas | duckdb)
+    print(f"🚀 Loading Master Dataset: {INPUT_FILE}...")
+    with run.stage("load") as s:
+        backend = get_backend(INPUT_FILE)
+        s.rows_out = len(backend)
+    print(f"   ⚙️ Compute Backend: {backend.name}")
+
+    # 1. TIME INDEXING (Mandatory Rule 1)
+    LATEST_DATE = backend.latest_date()
+    print(f"   📅 Data Reference Date: {LATEST_DATE.date()}")
+
+    stats = {}
+    for engine, spec in ENGINE_SPECS.items():
+        with run.stage(f"groupby.{engine}") as s:
+            stats[engine] = backend.pincode_stats(spec, window_days=HORIZONS[engine])
+            s.rows_out = len(stats[engine])
+
+    run_detection(stats, run)
+
+    print("\n🎉 MULTI-HORIZON ANALYSIS COMPLETE.")
+    print(f"📊 Run report: {run.save()}")
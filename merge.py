@@ -1,73 +1,133 @@
 import pandas as pd
+import argparse
 import glob
 import os
+from parallel_csv import read_csv_files
+from api_fetcher import fetch_frames, shard_name, MAX_WORKERS
+from canonical_names import canonicalize_locations, repair_locations, align_districts
+from ingest_validation import ValidationLog
+from instrumentation import RunReport
 
 # ==========================================
 # CONFIGURATION
 # ==========================================
 # Make sure this matches your folder name in VS Code
-DATA_FOLDER = 'DataFolder'  
+DATA_FOLDER = 'DataFolder'
 
-print(f"🕵️ Scanning inside '{DATA_FOLDER}'...")
+# Full schema, so every file (and every byte range of a huge file) parses
+# each column the same way. Pincode stays text until validation has
+# quarantined the junk ones; every other column is a count.
+RAW_DTYPES = {'date': str, 'state': str, 'district': str, 'pincode': str}
+RAW_COUNT_DTYPE = 'float64'
+
+def load_files(file_pattern, category_name, run, log, folder=DATA_FOLDER):
+    """Returns (rows of every readable file, [(file, row count)] in concat order)."""
+    stage = category_name.lower()
 
-def load_and_deduplicate(file_pattern, category_name):
     # 1. Recursive Search (Finds files in subfolders)
-    search_path = os.path.join(DATA_FOLDER, "**", file_pattern)
-    files = glob.glob(search_path, recursive=True)
-    
+    # (Sorted, so "keep first" in the dedupe is the same on every machine)
+    search_path = os.path.join(folder, "**", file_pattern)
+    files = sorted(glob.glob(search_path, recursive=True))
+
     if len(files) == 0:
         print(f"   ⚠️ No files found for {category_name}")
-        return pd.DataFrame()
-    
-    # 2. Load Files
-    df_list = []
-    for f in files:
-        try:
-            temp_df = pd.read_csv(f)
+        return pd.DataFrame(), []
+
+    # 2. Load Files (shards in parallel; one huge dump is split into byte ranges)
+    with run.stage(f"load.{stage}") as s:
+        df_list = []
+        sources = []
+        for f, temp_df in read_csv_files(files, dtype=RAW_DTYPES, other_dtype=RAW_COUNT_DTYPE):
+            if isinstance(temp_df, Exception):
+                print(f"      ❌ Error loading {f}: {temp_df}")
+                log.file_error(stage, f, temp_df)
+                continue
             temp_df.columns = temp_df.columns.str.strip().str.lower()
             df_list.append(temp_df)
-        except Exception as e:
-            print(f"      ❌ Error loading {f}: {e}")
+            sources.append((f, len(temp_df)))
+
+        if not df_list:
+            return pd.DataFrame(), []
 
-    if not df_list:
-        return pd.DataFrame()
-        
-    full_df = pd.concat(df_list, ignore_index=True)
+        full_df = pd.concat(df_list, ignore_index=True)
+        s.rows_out = len(full_df)
+    return full_df, sources
+
+def deduplicate(full_df, category_name, run, log, sources=None):
+    if full_df.empty:
+        return full_df
+    stage = category_name.lower()
     print(f"   📉 {category_name} Raw: {len(full_df)} rows.")
 
-    # 3. FIX DATES (Critical step)
-    if 'date' in full_df.columns:
-        full_df['date'] = pd.to_datetime(full_df['date'], dayfirst=True, errors='coerce')
-        # Drop rows where Date became NaT (invalid)
-        full_df = full_df.dropna(subset=['date'])
+    # Known data-entry slips (a locality typed as the state), fixed by pincode
+    with run.stage(f"repair.{stage}", rows_in=len(full_df)):
+        full_df = repair_locations(full_df)
+
+    # 3. VALIDATE (Critical step): dates, pincodes, names and counts as column
+    # masks; failing rows go to the quarantine file with reason codes
+    with run.stage(f"validate.{stage}", rows_in=len(full_df)) as s:
+        full_df = log.validate(full_df, stage, sources)
+        s.rows_out = len(full_df)
+    rows, rejected = log.totals(stage)
+    if rejected:
+        print(f"   🚧 {category_name} Quarantined: {rejected} of {rows} rows failed validation.")
+
+    # 4. CANONICAL NAMES (once, at ingest: "Orissa" -> "Odisha", "Karim Nagar" -> "Karimnagar")
+    with run.stage(f"canonicalize.{stage}", rows_in=len(full_df)):
+        full_df = canonicalize_locations(full_df)
+
+    return drop_duplicate_rows(full_df, category_name, run)
 
-    # 4. REMOVE DUPLICATES (The Fix)
+def drop_duplicate_rows(full_df, category_name, run):
+    # 5. REMOVE DUPLICATES (The Fix)
     # We keep the FIRST occurrence of a specific Date+Pincode and drop the rest.
     # This prevents the 50GB Memory Error.
     subset_cols = ['date', 'state', 'district', 'pincode']
     valid_subset = [c for c in subset_cols if c in full_df.columns]
-    
-    full_df = full_df.drop_duplicates(subset=valid_subset, keep='first')
-    
+
+    with run.stage(f"dedupe.{category_name.lower()}", rows_in=len(full_df)) as s:
+        full_df = full_df.drop_duplicates(subset=valid_subset, keep='first')
+        s.rows_out = len(full_df)
+
     print(f"   ✅ {category_name} De-Duplicated: {len(full_df)} unique rows.")
     return full_df
 
-# ==========================================
-# EXECUTION
-# ==========================================
-print("\n--- 1. LOADING ---")
-# Using *.csv pattern to match your files
-df_enrol = load_and_deduplicate("*enrolment*.csv", "Enrolment")
-df_demo  = load_and_deduplicate("*demographic*.csv", "Demographic")
-df_bio   = load_and_deduplicate("*biometric*.csv", "Biometric")
-
-print("\n--- 2. MERGING ---")
-if df_enrol.empty and df_demo.empty and df_bio.empty:
-    print("❌ CRITICAL: No data loaded.")
-else:
+def clean_page(df, dataset, offset, log):
+    """
+    --api path: repair, validate and canonicalize one page as it arrives,
+    so only its valid rows, with categorical names, are kept in memory.
+    """
+    if df.empty:
+        return df
+    df = repair_locations(df)
+    df = log.validate(df, dataset, [(shard_name(dataset, offset, len(df)), len(df))])
+    return canonicalize_locations(df)
+
+def deduplicate_pages(full_df, category_name, run, log):
+    """--api path: the pages were cleaned by clean_page; refold the district
+    spellings over all of them (each page folded its own), then dedupe."""
+    if full_df.empty:
+        return full_df
+    rows, rejected = log.totals(category_name.lower())
+    print(f"   📉 {category_name} Raw: {rows} rows.")
+    if rejected:
+        print(f"   🚧 {category_name} Quarantined: {rejected} of {rows} rows failed validation.")
+    with run.stage(f"canonicalize.{category_name.lower()}", rows_in=len(full_df)):
+        full_df = canonicalize_locations(full_df)
+    return drop_duplicate_rows(full_df, category_name, run)
+
+def load_and_deduplicate(file_pattern, category_name, run, log, folder=DATA_FOLDER):
+    full_df, sources = load_files(file_pattern, category_name, run, log, folder)
+    return deduplicate(full_df, category_name, run, log, sources)
+
+def merge_datasets(df_enrol, df_demo, df_bio, run):
     # Merge Keys
     merge_keys = ['date', 'state', 'district', 'pincode']
-    
+
+    # Each dataset folded its own district spellings; agree on one across all three
+    with run.stage("align_districts"):
+        df_enrol, df_demo, df_bio = align_districts([df_enrol, df_demo, df_bio])
+
     # Start with Enrolment
     if not df_enrol.empty:
         df_master = df_enrol
@@ -79,17 +139,70 @@ else:
     # Merge Demographic
     if not df_demo.empty and not df_master.equals(df_demo):
         print("   🔗 Merging Demographic...")
-        df_master = pd.merge(df_master, df_demo, on=merge_keys, how='outer', suffixes=('_enrol', '_demo'))
-        
+        with run.stage("merge.demographic", rows_in=len(df_master) + len(df_demo)) as s:
+            df_master = pd.merge(df_master, df_demo, on=merge_keys, how='outer', suffixes=('_enrol', '_demo'))
+            s.rows_out = len(df_master)
+
     # Merge Biometric
     if not df_bio.empty and not df_master.equals(df_bio):
         print("   🔗 Merging Biometric...")
-        df_master = pd.merge(df_master, df_bio, on=merge_keys, how='outer', suffixes=('', '_bio'))
+        with run.stage("merge.biometric", rows_in=len(df_master) + len(df_bio)) as s:
+            df_master = pd.merge(df_master, df_bio, on=merge_keys, how='outer', suffixes=('', '_bio'))
+            s.rows_out = len(df_master)
 
     # Fill NaN with 0 (For counts)
-    df_master = df_master.fillna(0)
-    
-    print("\n--- 3. SAVING ---")
-    output_filename = "aadhaar_master_dataset_FINAL22.csv"
-    df_master.to_csv(output_filename, index=False)
-    print(f"🎉 SUCCESS! Saved '{output_filename}' with {len(df_master)} rows.")
\ No newline at end of file
+    with run.stage("fill_nulls", rows_in=len(df_master)):
+        # Categorical name columns need 0 as a category before it can be filled in
+        names = df_master.select_dtypes('category').columns
+        for col in names:
+            if df_master[col].isna().any():
+                df_master[col] = df_master[col].cat.add_categories([0]).fillna(0)
+        df_master = df_master.fillna({c: 0 for c in df_master.columns if c not in names})
+    return df_master
+
+# ==========================================
+# EXECUTION
+# ==========================================
+# (Guarded so the parser worker processes can import this module safely)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge the enrolment / demographic / biometric dumps.")
+    parser.add_argument("--api", metavar="URL", help="stream the dumps from the API instead of DataFolder")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="pages in flight with --api")
+    args = parser.parse_args()
+
+    run = RunReport("merge")
+    log = ValidationLog()
+
+    print("\n--- 1. LOADING ---")
+    if args.api:
+        # Pages go straight from the API into memory, validated as they arrive;
+        # no dump files are written
+        print(f"🌐 Streaming from '{args.api}'...")
+        with run.stage("fetch") as s:
+            fetched = fetch_frames(args.api, workers=args.workers,
+                                   prepare=lambda dataset, offset, df: clean_page(df, dataset, offset, log))
+            s.rows_out = sum(len(df) for df in fetched.values())
+        df_enrol = deduplicate_pages(fetched["enrolment"], "Enrolment", run, log)
+        df_demo  = deduplicate_pages(fetched["demographic"], "Demographic", run, log)
+        df_bio   = deduplicate_pages(fetched["biometric"], "Biometric", run, log)
+    else:
+        print(f"🕵️ Scanning inside '{DATA_FOLDER}'...")
+        # Using *.csv pattern to match your files
+        df_enrol = load_and_deduplicate("*enrolment*.csv", "Enrolment", run, log)
+        df_demo  = load_and_deduplicate("*demographic*.csv", "Demographic", run, log)
+        df_bio   = load_and_deduplicate("*biometric*.csv", "Biometric", run, log)
+
+    print("\n--- 2. MERGING ---")
+    if df_enrol.empty and df_demo.empty and df_bio.empty:
+        print("❌ CRITICAL: No data loaded.")
+    else:
+        df_master = merge_datasets(df_enrol, df_demo, df_bio, run)
+
+        print("\n--- 3. SAVING ---")
+        output_filename = "aadhaar_master_dataset_FINAL22.csv"
+        with run.stage("save.master", rows_in=len(df_master)):
+            df_master.to_csv(output_filename, index=False)
+        print(f"🎉 SUCCESS! Saved '{output_filename}' with {len(df_master)} rows.")
+
+    print(f"🚧 Validation stats: {log.save()}")
+    print(f"📊 Run report: {run.save()}")
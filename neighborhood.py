@@ -0,0 +1,102 @@
+import pandas as pd
+import numpy as np
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# Neighborhoods are pincodes sharing a prefix:
+#   3 digits = sorting district, 4 digits = sub-district / delivery route
+PREFIX_LEVELS = {"region": 3, "area": 4}
+
+# Per-pincode columns averaged over the neighbors
+CONTEXT_COLUMNS = ['velocity_q3']
+
+# A suspect is in a migration neighborhood if this share of its neighbors are Boom Towns
+AREA_BOOM_SHARE = 0.20
+REGION_BOOM_SHARE = 0.10
+
+# ==========================================
+# 1. PREFIX INDEX
+# ==========================================
+def pincode_prefix(pincodes, digits):
+    """Leading `digits` of each 6-digit pincode (non-numeric -> 0)."""
+    pins = pd.to_numeric(pincodes, errors='coerce').fillna(0).astype('int64')
+    return pins // 10 ** (6 - digits)
+
+def pincode_numbers(pincodes):
+    return pd.to_numeric(pincodes, errors='coerce').fillna(0).astype('int64')
+
+def context_values(stats, boom_pincodes=(), value_cols=CONTEXT_COLUMNS):
+    """
+    One row per pincode (index): the context columns averaged over the
+    pincode's rows, its boom flag and a count of 1. `stats` can hold a
+    pincode under several (state, district) rows; each pincode is still
+    one neighbor.
+    """
+    values = stats[list(value_cols)].fillna(0).astype(float)
+    values = values.groupby(pincode_numbers(stats['pincode']).to_numpy()).mean()
+    values['boom_share'] = values.index.isin(np.asarray(list(boom_pincodes))).astype(float)
+    values['_count'] = 1.0
+    return values
+
+def prefix_totals(stats, boom_pincodes=(), value_cols=CONTEXT_COLUMNS, levels=PREFIX_LEVELS):
+    """
+    {level: per-prefix sums of the context columns, boom flags and pincode
+    counts}. Totals of separate batches of pincodes add up (combine_totals)
+    to the totals of the whole table, so context can be built in a stream,
+    as long as all rows of a pincode are in the same batch.
+    """
+    return sum_by_prefix(context_values(stats, boom_pincodes, value_cols), levels)
+
+def sum_by_prefix(values, levels=PREFIX_LEVELS):
+    return {level: values.groupby(values.index // 10 ** (6 - digits)).sum()
+            for level, digits in levels.items()}
+
+def combine_totals(a, b):
+    if a is None:
+        return b
+    return {level: a[level].add(b[level], fill_value=0) for level in a}
+
+def neighborhood_context(stats, boom_pincodes=(), value_cols=CONTEXT_COLUMNS, levels=PREFIX_LEVELS,
+                         totals=None):
+    """
+    Leave-one-out neighborhood aggregates for every row of `stats`. For
+    each prefix level, a single grouped sum over the prefix gives the
+    totals; subtracting the row's whole pincode leaves its neighbors, so
+    the whole table costs one pass per level instead of a pairwise
+    comparison. Pass `totals` (prefix_totals of the full table) when
+    `stats` is only one batch of it.
+
+    Adds, per level: <level>_neighbors, <level>_<col> (neighbor mean) and
+    <level>_boom_share. Rows without neighbors get NaN.
+    """
+    pins = pincode_numbers(stats['pincode']).to_numpy()
+    values = context_values(stats, boom_pincodes, value_cols)
+    if totals is None:
+        totals = sum_by_prefix(values, levels)
+    values = values.reindex(pins).set_axis(stats.index)
+
+    context = pd.DataFrame(index=stats.index)
+    for level, digits in levels.items():
+        level_totals = totals[level].reindex(pins // 10 ** (6 - digits)).set_axis(stats.index)
+        neighbors = level_totals['_count'] - 1
+        context[f'{level}_neighbors'] = neighbors.astype(int)
+        others = neighbors.where(neighbors > 0)
+        for col in values.columns.drop('_count'):
+            context[f'{level}_{col}'] = (level_totals[col] - values[col]) / others
+    return context
+
+# ==========================================
+# 2. CONTEXT FEATURES & SUPPRESSION
+# ==========================================
+def add_context_features(stats, boom_pincodes=(), totals=None):
+    """Joins the neighborhood context onto `stats` and adds velocity_vs_region
+    (own speed over the regional neighbor speed; 1.0 where there are no neighbors)."""
+    stats = stats.join(neighborhood_context(stats, boom_pincodes, totals=totals))
+    stats['velocity_vs_region'] = (stats['velocity_q3'] / (stats['region_velocity_q3'] + 1)).fillna(1.0)
+    return stats
+
+def in_migration_neighborhood(df):
+    """True where the suspect's neighbors are largely Boom Towns."""
+    return ((df['area_boom_share'].fillna(0) >= AREA_BOOM_SHARE) |
+            (df['region_boom_share'].fillna(0) >= REGION_BOOM_SHARE))
@@ -0,0 +1,140 @@
+import pandas as pd
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+SPLIT_THRESHOLD_BYTES = 256 * 2**20   # Files bigger than this are cut into byte ranges
+RANGE_BYTES = 64 * 2**20              # Target size of one range
+MAX_WORKERS = os.cpu_count() or 1
+
+# ==========================================
+# 1. SPLITTING
+# ==========================================
+def read_header(path):
+    """Column names and the byte offset where the data rows start."""
+    with open(path, 'rb') as fh:
+        header = fh.readline()
+    names = pd.read_csv(io.BytesIO(header), nrows=0, encoding='utf-8-sig').columns.tolist()
+    return names, len(header)
+
+def byte_ranges(path, start, range_bytes=RANGE_BYTES):
+    """
+    Cuts [start, EOF) into pieces of about `range_bytes`, each ending just
+    after a newline so no row is split. Assumes no quoted field contains a
+    newline, which holds for the API dumps.
+    """
+    size = os.path.getsize(path)
+    ranges = []
+    with open(path, 'rb') as fh:
+        while start < size:
+            end = start + range_bytes
+            if end >= size:
+                end = size
+            else:
+                fh.seek(end)
+                fh.readline()  # run on to the end of the current row
+                end = fh.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+def schema_for(names, dtype, other_dtype=None):
+    """Maps a {clean column name: dtype} schema onto the raw header names
+    (matched after strip + lower, the same clean-up merge.py applies).
+    Columns the schema does not name get `other_dtype`, if given."""
+    if not dtype and other_dtype is None:
+        return None
+    dtype = dtype or {}
+    types = {n: dtype.get(n.strip().lower(), other_dtype) for n in names}
+    return {n: t for n, t in types.items() if t is not None}
+
+# ==========================================
+# 2. WORKERS (run in the process pool)
+# ==========================================
+def read_typed(source, dtype=None, **kwargs):
+    """
+    read_csv with the schema. A value that does not fit a numeric column
+    (e.g. "N/A" in a count) would fail the whole piece, so the piece is
+    re-read as text instead and validation quarantines the bad rows.
+    """
+    try:
+        return pd.read_csv(source() if callable(source) else source, dtype=dtype, **kwargs)
+    except ValueError:
+        if not dtype:
+            raise
+        return pd.read_csv(source() if callable(source) else source, dtype=str, **kwargs)
+
+def parse_range(path, start, end, names, dtype=None):
+    with open(path, 'rb') as fh:
+        fh.seek(start)
+        data = fh.read(end - start)
+    if not data.strip():
+        return pd.DataFrame({n: pd.Series(dtype=(dtype or {}).get(n, object)) for n in names})
+    return read_typed(lambda: io.BytesIO(data), dtype, header=None, names=names)
+
+def parse_file(path, dtype=None):
+    return read_typed(path, dtype)
+
+# ==========================================
+# 3. PARALLEL READER
+# ==========================================
+def plan_file(path, dtype=None, other_dtype=None, split_bytes=SPLIT_THRESHOLD_BYTES, range_bytes=RANGE_BYTES):
+    """Parse tasks [(fn, args)] for one file: the whole file, or its byte ranges."""
+    names, data_start = read_header(path)
+    types = schema_for(names, dtype, other_dtype)
+    if os.path.getsize(path) <= split_bytes:
+        return [(parse_file, (path, types))]
+    return [(parse_range, (path, a, b, names, types)) for a, b in byte_ranges(path, data_start, range_bytes)]
+
+def read_csv_files(paths, dtype=None, other_dtype=None, workers=MAX_WORKERS,
+                   split_bytes=SPLIT_THRESHOLD_BYTES, range_bytes=RANGE_BYTES):
+    """
+    Parses many CSVs on all cores. Small files are one task each; a file
+    over `split_bytes` is cut into newline-aligned byte ranges that are
+    parsed separately and concatenated back in order. Every piece gets the
+    same schema: `dtype` for the named columns and `other_dtype` for the
+    rest, so no column is left to per-range inference. A piece holding a
+    value its numeric columns cannot parse is read as text (see read_typed);
+    the caller coerces those columns back after validation.
+
+    Returns [(path, DataFrame or Exception)] in input order.
+    """
+    plans = []
+    for path in paths:
+        try:
+            plans.append((path, plan_file(path, dtype, other_dtype, split_bytes, range_bytes)))
+        except Exception as e:
+            plans.append((path, e))
+
+    n_tasks = sum(len(plan) for _, plan in plans if isinstance(plan, list))
+    pool = ProcessPoolExecutor(max_workers=min(workers, n_tasks)) if workers > 1 and n_tasks > 1 else None
+    try:
+        if pool is not None:
+            plans = [(path, [pool.submit(fn, *args) for fn, args in plan] if isinstance(plan, list) else plan)
+                     for path, plan in plans]
+
+        results = []
+        for path, plan in plans:
+            if isinstance(plan, Exception):
+                results.append((path, plan))
+                continue
+            try:
+                frames = [task.result() if pool is not None else task[0](*task[1]) for task in plan]
+            except Exception as e:
+                results.append((path, e))
+                continue
+            results.append((path, frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)))
+        return results
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+def read_csv_parallel(path, dtype=None, **kwargs):
+    """One CSV, split into byte ranges if it is big. Raises on parse errors."""
+    _, result = read_csv_files([path], dtype=dtype, **kwargs)[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
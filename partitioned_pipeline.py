@@ -0,0 +1,289 @@
+import argparse
+import glob
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from api_fetcher import DATASETS
+from canonical_names import canonical_state, repair_locations, canonicalize_locations, fold_spellings
+from compute_backend import PandasBackend, GROUP_KEYS
+from featureaddition import rename_columns, add_features, REQUIRED
+from ingest_validation import ValidationLog, QUARANTINE_FOLDER
+from instrumentation import RunReport, REPORT_FOLDER
+from master_time_aware_engine import ENGINE_SPECS, HORIZONS, run_detection
+from merge import DATA_FOLDER, load_and_deduplicate, merge_datasets
+from neighborhood import pincode_prefix
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+PARTITION_FOLDER = "partitions"
+MANIFEST_FILE = "manifest.json"
+
+# Partition key: "state" (canonical state name) or "prefix" (leading pincode digits)
+DEFAULT_PARTITION_BY = "state"
+PREFIX_DIGITS = 2
+
+SPLIT_CHUNK_ROWS = 500_000       # Rows held in memory while splitting a dump
+MAX_WORKERS = os.cpu_count() or 1
+
+# Files each partition leaves behind (the hand-off between phases / nodes)
+RAW_SUBFOLDER = "raw"
+FEATURES_FILE = "features.parquet"
+SUMMARY_FILE = "partition.json"
+DISTRICTS_FILE = "districts.parquet"   # Distinct (state, district) spellings of the partition
+STATS_FILE = "stats_{engine}.parquet"
+
+# ==========================================
+# 1. SPLIT (coordinator: one streaming pass over the dumps)
+# ==========================================
+def partition_keys(chunk, by):
+    if by == "prefix":
+        return pincode_prefix(chunk['pincode'], PREFIX_DIGITS).astype(str).str.zfill(PREFIX_DIGITS)
+    # One canonical lookup per distinct spelling; unnamed rows share a partition.
+    # Repaired first, so a locality typed as the state goes to its real state.
+    chunk = repair_locations(chunk)
+    codes, uniques = pd.factorize(chunk['state'].where(chunk['state'].str.strip() != ""))
+    names = pd.Index([canonical_state(s) for s in uniques] + ["_unknown"])
+    return pd.Series(names[codes].to_numpy(), index=chunk.index)
+
+def split_dumps(data_folder=DATA_FOLDER, out_folder=PARTITION_FOLDER, by=DEFAULT_PARTITION_BY,
+                chunk_rows=SPLIT_CHUNK_ROWS):
+    """
+    Streams every dump in `data_folder` and appends each row, unchanged, to
+    <out_folder>/part_NNN/raw/<dump file name>. Rows go by state (or
+    pincode prefix), except that a pincode is pinned to the partition of
+    the first row it appears in: a pincode filed under two states in the
+    dumps still has all its rows in one partition. So merge, dedupe,
+    velocity and the per-pincode groupings need nothing from the other
+    partitions, and the results match a single-node run exactly.
+    Returns the manifest (also saved as <out_folder>/manifest.json).
+    """
+    if os.path.exists(out_folder):
+        shutil.rmtree(out_folder)
+    os.makedirs(out_folder)
+
+    parts = {}                    # key -> part folder name
+    pin_key = pd.Series(dtype=object)   # pincode -> key of the partition it is pinned to
+    pin_keys = set()              # (pincode, key) pairs, to report pincodes seen under several keys
+    rerouted = 0
+    files = sorted(f for d in DATASETS
+                   for f in glob.glob(os.path.join(data_folder, "**", f"*{d}*.csv"), recursive=True))
+    for path in files:
+        name = os.path.basename(path)
+        # Strings in, strings out: shards hold the dump text as-is
+        reader = pd.read_csv(path, dtype=str, na_filter=False, chunksize=chunk_rows)
+        for chunk in reader:
+            clean = chunk.rename(columns=lambda c: c.strip().lower())
+            keys = partition_keys(clean, by)
+            pins = pd.to_numeric(clean['pincode'], errors='coerce')
+            pairs = pd.DataFrame({'pincode': pins, 'key': keys}).dropna(subset=['pincode'])
+            pin_keys.update(zip(pairs['pincode'], pairs['key']))
+
+            # Pin new pincodes to the key of their first row, then route every
+            # row with a valid pincode by its pin (junk pincodes keep their key)
+            first = pairs.drop_duplicates('pincode').set_index('pincode')['key']
+            pin_key = pd.concat([pin_key, first[~first.index.isin(pin_key.index)]])
+            routed = pins.map(pin_key).where(pins.notna(), keys)
+            rerouted += int((routed != keys).sum())
+
+            for key, rows in chunk.groupby(routed.to_numpy(), sort=False):
+                part = parts.setdefault(key, f"part_{len(parts):03d}")
+                shard = os.path.join(out_folder, part, RAW_SUBFOLDER, name)
+                os.makedirs(os.path.dirname(shard), exist_ok=True)
+                rows.to_csv(shard, mode='a', header=not os.path.exists(shard), index=False)
+
+    pins = pd.DataFrame(list(pin_keys), columns=['pincode', 'key'])
+    manifest = {
+        "by": by,
+        "source_files": files,
+        "partitions": {part: key for key, part in parts.items()},
+        "pincodes_under_several_keys": int((pins.groupby('pincode').size() > 1).sum()),
+        "rows_routed_by_pincode": rerouted
+    }
+    with open(os.path.join(out_folder, MANIFEST_FILE), "w") as fh:
+        json.dump(manifest, fh, indent=2)
+    return manifest
+
+def load_manifest(folder=PARTITION_FOLDER):
+    with open(os.path.join(folder, MANIFEST_FILE)) as fh:
+        return json.load(fh)
+
+# ==========================================
+# 2. WORKER PHASE 1: merge + featurize one partition
+# ==========================================
+def build_partition(part_dir):
+    """
+    merge.py and featureaddition.py on one partition's shards. Writes
+    features.parquet, districts.parquet and partition.json (rows, latest
+    date, rejects) and returns the summary dict.
+    """
+    run = RunReport("partition_build", folder=os.path.join(part_dir, REPORT_FOLDER))
+    log = ValidationLog(os.path.join(part_dir, QUARANTINE_FOLDER))
+    raw = os.path.join(part_dir, RAW_SUBFOLDER)
+    frames = [load_and_deduplicate(f"*{d}*.csv", d.capitalize(), run, log, folder=raw) for d in DATASETS]
+
+    summary = {"partition": os.path.basename(part_dir), "rows": 0, "latest_date": None,
+               "rejected": sum(log.totals(d)[1] for d in DATASETS)}
+    if not all(df.empty for df in frames):
+        master, missing = rename_columns(merge_datasets(*frames, run))
+        # A partition can lack a dump entirely; the national outer merge gives those rows zeros
+        for c in missing:
+            master[c] = 0.0
+        # Same types the single-node run gets back from the master CSV
+        master = master.astype({c: 'float64' for c in REQUIRED})
+        master = master.astype({c: str for c in ['state', 'district'] if c in master.columns})
+
+        features = add_features(master, run)
+        with run.stage("save.features", rows_in=len(features)):
+            features.to_parquet(os.path.join(part_dir, FEATURES_FILE), index=False)
+            features[['state', 'district']].drop_duplicates().to_parquet(
+                os.path.join(part_dir, DISTRICTS_FILE), index=False)
+        summary.update(rows=len(features), latest_date=str(features['date'].max()))
+
+    log.save()
+    run.save()
+    # Sampled per stage, so it holds for this partition even in a reused worker
+    summary["peak_rss_mb"] = round(max((r.peak_rss_mb for r in run.records), default=0), 1)
+    with open(os.path.join(part_dir, SUMMARY_FILE), "w") as fh:
+        json.dump(summary, fh, indent=2)
+    return summary
+
+def reference_date(folder=PARTITION_FOLDER):
+    """Latest date over every built partition: the "today" all windows count back from."""
+    dates = []
+    for part in load_manifest(folder)["partitions"]:
+        with open(os.path.join(folder, part, SUMMARY_FILE)) as fh:
+            latest = json.load(fh)["latest_date"]
+        if latest:
+            dates.append(pd.Timestamp(latest))
+    return max(dates)
+
+# ==========================================
+# 3. WORKER PHASE 2: per-pincode aggregates of one partition
+# ==========================================
+def partition_stats(part_dir, reference):
+    """Writes stats_<engine>.parquet: the ENGINE_SPECS groupings of this
+    partition, with windows counted back from the global `reference` date."""
+    path = os.path.join(part_dir, FEATURES_FILE)
+    if not os.path.exists(path):
+        return 0
+    inputs = sorted({col for spec in ENGINE_SPECS.values() for col, _ in spec.values()})
+    backend = PandasBackend(df=pd.read_parquet(path, columns=GROUP_KEYS + ['date'] + inputs),
+                            reference_date=reference)
+    rows = 0
+    for engine, spec in ENGINE_SPECS.items():
+        stats = backend.pincode_stats(spec, window_days=HORIZONS[engine])
+        stats.to_parquet(os.path.join(part_dir, STATS_FILE.format(engine=engine)), index=False)
+        rows += len(stats)
+    return rows
+
+# ==========================================
+# 4. REDUCE (coordinator): global thresholds on the merged aggregates
+# ==========================================
+def merged_stats(folder=PARTITION_FOLDER):
+    """
+    {engine: per-pincode stats of every partition}, in the row order of a
+    single-node groupby. The tables are one row per pincode, so quantile
+    thresholds (vel_95, press_90, grey_80, tech_25) and the neighborhood
+    context are computed exactly over the whole country by the detectors.
+    A district spelled differently in two partitions is refolded to the
+    spelling the single-node run picks over all of them.
+    """
+    parts = [os.path.join(folder, p) for p in load_manifest(folder)["partitions"]]
+    districts = pd.concat([pd.read_parquet(os.path.join(p, DISTRICTS_FILE)) for p in parts
+                           if os.path.exists(os.path.join(p, DISTRICTS_FILE))], ignore_index=True)
+    spellings = fold_spellings(districts['state'], districts['district'])
+    stats = {}
+    for engine in ENGINE_SPECS:
+        paths = [os.path.join(p, STATS_FILE.format(engine=engine)) for p in parts]
+        frames = [pd.read_parquet(p) for p in paths if os.path.exists(p)]
+        combined = canonicalize_locations(pd.concat(frames, ignore_index=True), spellings=spellings)
+        combined = combined.astype({'state': str, 'district': str})
+        stats[engine] = combined.sort_values(GROUP_KEYS, kind='stable').reset_index(drop=True)
+    return stats
+
+def run_partitioned(data_folder=DATA_FOLDER, folder=PARTITION_FOLDER, by=DEFAULT_PARTITION_BY,
+                    workers=MAX_WORKERS):
+    """Split, build and aggregate every partition in local worker processes
+    (stand-ins for nodes), then detect on the merged aggregates."""
+    run = RunReport("partitioned_pipeline")
+
+    print(f"✂️ Splitting '{data_folder}' by {by}...")
+    with run.stage("split") as s:
+        manifest = split_dumps(data_folder, folder, by)
+        s.rows_out = len(manifest["partitions"])
+    print(f"   📦 {len(manifest['partitions'])} partitions --> {folder}/")
+    if manifest["pincodes_under_several_keys"]:
+        print(f"   🔀 {manifest['pincodes_under_several_keys']} pincodes appear under several {by} keys; "
+              f"all their rows ({manifest['rows_routed_by_pincode']:,} filed under another key) "
+              "follow the pincode's first partition.")
+
+    part_dirs = [os.path.join(folder, p) for p in manifest["partitions"]]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        print(f"\n🏗️ Building partitions on {workers} workers...")
+        with run.stage("build_partitions") as s:
+            summaries = list(pool.map(build_partition, part_dirs))
+            s.rows_out = sum(x["rows"] for x in summaries)
+        rejected = sum(x["rejected"] for x in summaries)
+        biggest = max(summaries, key=lambda x: x["peak_rss_mb"])
+        print(f"   ✅ {s.rows_out:,} feature rows ({rejected} quarantined); "
+              f"largest worker peak {biggest['peak_rss_mb']} MB ({biggest['partition']})")
+
+        reference = reference_date(folder)
+        print(f"   📅 Data Reference Date: {reference.date()}")
+        with run.stage("partition_stats") as s:
+            s.rows_out = sum(pool.map(partition_stats, part_dirs, [reference] * len(part_dirs)))
+
+    with run.stage("reduce") as s:
+        stats = merged_stats(folder)
+        s.rows_out = sum(len(x) for x in stats.values())
+
+    run_detection(stats, run)
+    print("\n🎉 PARTITIONED ANALYSIS COMPLETE.")
+    print(f"📊 Run report: {run.save()}")
+
+# ==========================================
+# EXECUTION
+# ==========================================
+# Phases can also run one at a time, on different machines sharing the
+# partitions folder:
+#   split  ->  build <part> (per node)  ->  stats <part> (per node)  ->  reduce
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run merge, features and the engines partitioned by state.")
+    parser.add_argument("--folder", default=PARTITION_FOLDER)
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("run", "split"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("--data", default=DATA_FOLDER)
+        cmd.add_argument("--by", choices=["state", "prefix"], default=DEFAULT_PARTITION_BY)
+        if name == "run":
+            cmd.add_argument("--workers", type=int, default=MAX_WORKERS)
+    sub.add_parser("build").add_argument("part", help="partition folder, e.g. partitions/part_000")
+    stats_cmd = sub.add_parser("stats")
+    stats_cmd.add_argument("part")
+    stats_cmd.add_argument("--reference-date", help="default: latest date over all built partitions")
+    sub.add_parser("reduce")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "run":
+        run_partitioned(args.data, args.folder, args.by, args.workers)
+    elif args.command == "split":
+        manifest = split_dumps(args.data, args.folder, args.by)
+        print(f"📦 {len(manifest['partitions'])} partitions --> {args.folder}/")
+    elif args.command == "build":
+        summary = build_partition(args.part)
+        print(f"🏗️ {summary['partition']}: {summary['rows']:,} feature rows")
+    elif args.command == "stats":
+        reference = pd.Timestamp(args.reference_date) if args.reference_date else reference_date(args.folder)
+        print(f"📊 {partition_stats(args.part, reference):,} pincode rows (reference {reference.date()})")
+    else:
+        run = RunReport("partitioned_reduce")
+        run_detection(merged_stats(args.folder), run)
+        print(f"📊 Run report: {run.save()}")
+    print(f"⏱️ {time.perf_counter() - start:.1f}s")
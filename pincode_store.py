@@ -0,0 +1,154 @@
+import pandas as pd
+import numpy as np
+import os
+import json
+import shutil
+import time
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+INPUT_FILE = "aadhaar_features_ready_for_ML.csv"
+STORE_FOLDER = "pincode_store"
+POINTER_FILE = "CURRENT"        # Names the live version directory inside STORE_FOLDER
+KEEP_VERSIONS = 2               # Live version plus the previous one (still open in running dashboards)
+
+# Daily series kept per pincode, and how duplicate (pincode, date) rows combine
+SERIES = {
+    'total_enrolment': 'sum',
+    'enrol_velocity': 'sum',
+    'elderly_pressure': 'mean',
+    'total_bio_updates': 'sum'
+}
+
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+# ==========================================
+# 1. BUILD (called by featureaddition.py)
+# ==========================================
+def build_store(df, folder=STORE_FOLDER):
+    """
+    Writes the per-pincode daily series as flat .npy arrays sorted by
+    (pincode, date):
+        pincodes.npy  int32   unique pincodes, ascending
+        offsets.npy   int64   row range of pincode i is offsets[i]:offsets[i+1]
+        dates.npy     int32   days since 1970-01-01
+        values.npy    float32 one column per SERIES entry
+    Returns the number of pincodes stored.
+    """
+    pins = pd.to_numeric(df['pincode'], errors='coerce')
+    daily = df.assign(pincode=pins, date=pd.to_datetime(df['date'])).dropna(subset=['pincode'])
+    daily = daily.groupby(['pincode', 'date'], sort=True).agg(SERIES).reset_index()
+
+    pincodes, starts = np.unique(daily['pincode'].to_numpy(dtype=np.int32), return_index=True)
+    offsets = np.append(starts, len(daily)).astype(np.int64)
+    dates = (daily['date'].to_numpy(dtype='datetime64[D]') - EPOCH).astype(np.int32)
+    values = daily[list(SERIES)].to_numpy(dtype=np.float32)
+
+    # Each build is a new version directory; readers follow the pointer file,
+    # so the live store is never missing or half-written
+    version = f"v_{time.time_ns()}"
+    version_folder = os.path.join(folder, version)
+    os.makedirs(version_folder)
+    np.save(os.path.join(version_folder, "pincodes.npy"), pincodes)
+    np.save(os.path.join(version_folder, "offsets.npy"), offsets)
+    np.save(os.path.join(version_folder, "dates.npy"), dates)
+    np.save(os.path.join(version_folder, "values.npy"), values)
+    with open(os.path.join(version_folder, "meta.json"), "w") as fh:
+        json.dump({"series": list(SERIES), "pincodes": len(pincodes), "rows": len(daily)}, fh, indent=2)
+
+    publish_version(folder, version)
+    prune_versions(folder)
+    return len(pincodes)
+
+def publish_version(folder, version):
+    """Atomically points the store at `version` (write a temp file, then os.replace)."""
+    tmp_pointer = os.path.join(folder, POINTER_FILE + ".tmp")
+    with open(tmp_pointer, "w") as fh:
+        fh.write(version)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_pointer, os.path.join(folder, POINTER_FILE))
+
+def current_version(folder=STORE_FOLDER):
+    """Name of the live version directory, or None if no store was published."""
+    try:
+        with open(os.path.join(folder, POINTER_FILE)) as fh:
+            return fh.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def prune_versions(folder, keep=KEEP_VERSIONS):
+    """
+    Deletes old version directories once the pointer has moved past them,
+    keeping the live one and the newest `keep - 1` before it. Anything else
+    in the folder (a pre-versioning flat store, stray temp files) goes too.
+    """
+    live = current_version(folder)
+    versions = sorted((name for name in os.listdir(folder) if name.startswith("v_")),
+                      key=lambda name: int(name[2:]) if name[2:].isdigit() else -1)
+    previous = [v for v in reversed(versions) if v != live][:max(keep - 1, 0)]
+    kept = {live, *previous}
+    for name in os.listdir(folder):
+        if name == POINTER_FILE or name in kept:
+            continue
+        path = os.path.join(folder, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            os.remove(path)
+
+# ==========================================
+# 2. READ (memory-mapped, no CSV scan)
+# ==========================================
+class PincodeStore:
+    """Read-only view of a built store. Arrays are memory-mapped, so opening
+    a pincode is a binary search plus one contiguous slice read."""
+
+    def __init__(self, folder=STORE_FOLDER, version=None):
+        version = version or current_version(folder)
+        if version is None:
+            raise FileNotFoundError(f"No pincode store published in {folder}/")
+        folder = os.path.join(folder, version)
+        self.version = version
+        with open(os.path.join(folder, "meta.json")) as fh:
+            self.meta = json.load(fh)
+        self.series_names = self.meta["series"]
+        self.pincodes = np.load(os.path.join(folder, "pincodes.npy"), mmap_mode='r')
+        self.offsets = np.load(os.path.join(folder, "offsets.npy"), mmap_mode='r')
+        self.dates = np.load(os.path.join(folder, "dates.npy"), mmap_mode='r')
+        self.values = np.load(os.path.join(folder, "values.npy"), mmap_mode='r')
+
+    def __contains__(self, pincode):
+        return self._position(pincode) is not None
+
+    def __len__(self):
+        return len(self.pincodes)
+
+    def _position(self, pincode):
+        try:
+            pin = int(pincode)
+        except (TypeError, ValueError):
+            return None
+        i = int(np.searchsorted(self.pincodes, pin))
+        if i < len(self.pincodes) and self.pincodes[i] == pin:
+            return i
+        return None
+
+    def series(self, pincode):
+        """Daily history of one pincode (date index), or None if not stored."""
+        i = self._position(pincode)
+        if i is None:
+            return None
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        index = pd.DatetimeIndex(EPOCH + np.asarray(self.dates[start:end]).astype('timedelta64[D]'), name='date')
+        return pd.DataFrame(np.array(self.values[start:end]), index=index, columns=self.series_names)
+
+# ==========================================
+# EXECUTION (Rebuild from the features file)
+# ==========================================
+if __name__ == "__main__":
+    print(f"🚀 Loading {INPUT_FILE}...")
+    features = pd.read_csv(INPUT_FILE, usecols=['date', 'pincode'] + list(SERIES))
+    count = build_store(features)
+    print(f"🎉 SUCCESS! Stored daily series for {count} pincodes in '{STORE_FOLDER}/'")
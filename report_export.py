@@ -0,0 +1,229 @@
+import pandas as pd
+import os
+import re
+from pathlib import Path
+import gzip
+import shutil
+import hashlib
+import tempfile
+import zipfile
+import subprocess
+import sys
+
+from dashboard_aggregates import ENGINE_OUTPUTS, SUMMARY_FOLDER, current_summaries
+from data_access import file_fingerprint, folder_fingerprint
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+EXPORT_FOLDER = "exports"
+CHUNK_ROWS = 100_000
+
+# Layer name used inside the state-wise archive
+LAYER_FILE_NAMES = {
+    "fraud": "fraud_alerts",
+    "boom": "boom_towns",
+    "ghost": "ghost_villages",
+    "digital": "digital_dark_zones",
+    "forecast": "demand_forecast"
+}
+
+# ==========================================
+# 1. CHUNKED WRITERS (run in the export worker process)
+# ==========================================
+def safe_name(value):
+    return re.sub(r"[^A-Za-z0-9]+", "_", str(value)).strip("_") or "Unknown"
+
+def export_state_partitioned(out_path, sources=ENGINE_OUTPUTS, chunksize=CHUNK_ROWS):
+    """
+    Zip of <State>/<layer>.csv for every engine output. Each source is read
+    chunk by chunk and appended to per-state spill files on disk, so memory
+    stays at one chunk regardless of the national row count.
+    """
+    spill_dir = tempfile.mkdtemp(prefix="drishti_export_")
+    try:
+        spill_files = {}
+        for layer, path in sources.items():
+            if not os.path.exists(path):
+                continue
+            for chunk in pd.read_csv(path, chunksize=chunksize):
+                for state, rows in chunk.groupby('state', sort=False):
+                    key = (safe_name(state), LAYER_FILE_NAMES.get(layer, layer))
+                    spill = spill_files.setdefault(key, os.path.join(spill_dir, f"{key[0]}__{key[1]}.csv"))
+                    rows.to_csv(spill, mode='a', header=not os.path.exists(spill), index=False)
+
+        tmp_path = out_path + ".part"
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for (state, layer), spill in sorted(spill_files.items()):
+                zf.write(spill, arcname=f"{state}/{layer}.csv")
+        os.replace(tmp_path, out_path)
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+    return out_path
+
+def export_compressed_log(out_path, source=ENGINE_OUTPUTS["fraud"], chunksize=CHUNK_ROWS):
+    """Gzipped CSV of one engine output, streamed chunk by chunk."""
+    tmp_path = out_path + ".part"
+    with gzip.open(tmp_path, "wt", newline="") as fh:
+        if os.path.exists(source):
+            for i, chunk in enumerate(pd.read_csv(source, chunksize=chunksize)):
+                chunk.to_csv(fh, header=(i == 0), index=False)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+def export_policy_brief(out_path, folder=SUMMARY_FOLDER):
+    """One-page PDF brief rendered from the published dashboard summaries."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    tables, kpis = current_summaries(folder)
+    lines = [
+        "Aadhaar Drishti - National Policy Brief",
+        f"Generated: {pd.Timestamp.now().strftime('%d-%b-%Y %H:%M')}",
+        "",
+        "Headline Signals",
+        f"  High-Risk Fraud Alerts:  {kpis.get('high_risk_alerts', 0)}  (auto-suppressed: {kpis.get('suppressed_alerts', 0)})",
+        f"  Boom Towns:              {kpis.get('boom_towns', 0)}  (avg velocity {kpis.get('boom_avg_velocity', 0):.1f}/day)",
+        f"  Ghost Villages:          {kpis.get('ghost_villages', 0)}",
+        f"  Digital Dark Zones:      {kpis.get('digital_zones', 0)}",
+        ""
+    ]
+    sections = [
+        ("Priority Audit Districts", "audit_queue", ['state', 'district', 'Frequency']),
+        ("Infrastructure Expansion (Boom Towns)", "boom_districts", ['district', 'count']),
+        ("Mobile Van Routing (Ghost Villages)", "ghost_districts", ['District', 'Villages at Risk']),
+        ("Digital Sahayak Deployment", "digital_deploy", ['district', 'state', 'Zones'])
+    ]
+    for title, name, cols in sections:
+        table = tables.get(name, pd.DataFrame())
+        if table.empty:
+            continue
+        lines.append(title)
+        for row in table[cols].head(5).itertuples(index=False):
+            lines.append("  - " + " | ".join(str(v) for v in row))
+        lines.append("")
+
+    tmp_path = out_path + ".part"
+    with PdfPages(tmp_path) as pdf:
+        fig = plt.figure(figsize=(8.27, 11.69))  # A4
+        fig.text(0.08, 0.95, "\n".join(lines), va="top", family="monospace", fontsize=9)
+        pdf.savefig(fig)
+        plt.close(fig)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+# kind -> (writer, fingerprint of inputs, download name, mime type)
+EXPORTS = {
+    "policy_brief": (
+        export_policy_brief,
+        lambda: folder_fingerprint(SUMMARY_FOLDER),
+        "national_policy_brief.pdf", "application/pdf"
+    ),
+    "state_audit_log": (
+        export_state_partitioned,
+        lambda: tuple(file_fingerprint(p) for p in ENGINE_OUTPUTS.values()),
+        "state_wise_audit_log.zip", "application/zip"
+    ),
+    "fraud_log": (
+        export_compressed_log,
+        lambda: file_fingerprint(ENGINE_OUTPUTS["fraud"]),
+        "fraud_investigation_log.csv.gz", "application/gzip"
+    )
+}
+
+# ==========================================
+# 2. EXPORT MANAGER (shared by all dashboard sessions)
+# ==========================================
+class ExportManager:
+    """
+    Runs each export writer as a separate Python process so a national
+    export neither blocks the Streamlit script thread nor grows its memory.
+    Finished files are reused until the engine outputs they were built
+    from change.
+    """
+
+    def __init__(self, folder=EXPORT_FOLDER):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+        self._jobs = {}  # output path -> Popen
+
+    def output_path(self, kind):
+        _, fingerprint_fn, file_name, _ = EXPORTS[kind]
+        digest = hashlib.sha1(repr(fingerprint_fn()).encode()).hexdigest()[:12]
+        stem, ext = file_name.split(".", 1)
+        return os.path.join(self.folder, f"{stem}_{digest}.{ext}")
+
+    def status(self, kind):
+        """'ready', 'running', 'failed' or 'idle' for the current input version."""
+        path = self.output_path(kind)
+        if os.path.exists(path):
+            return "ready"
+        job = self._jobs.get(path)
+        if job is None:
+            return "idle"
+        return "running" if job.poll() is None else "failed"
+
+    def prune(self, kind):
+        """
+        Deletes this kind's files (and their .part/.log) built from older
+        input versions, unless their worker is still running.
+        """
+        _, _, file_name, _ = EXPORTS[kind]
+        stem, ext = file_name.split(".", 1)
+        current = os.path.basename(self.output_path(kind))
+        pattern = re.compile(rf"{re.escape(stem)}_[0-9a-f]{{12}}\.{re.escape(ext)}")
+        for name in os.listdir(self.folder):
+            base = re.sub(r"\.(part|log)$", "", name)
+            if base == current or not pattern.fullmatch(base):
+                continue
+            job = self._jobs.get(os.path.join(self.folder, base))
+            if job is not None and job.poll() is None:
+                continue
+            try:
+                os.remove(os.path.join(self.folder, name))
+            except FileNotFoundError:
+                pass
+
+    def submit(self, kind):
+        if self.status(kind) in ("ready", "running"):
+            return
+        self.prune(kind)
+        path = self.output_path(kind)
+        with open(path + ".log", "wb") as log:
+            self._jobs[path] = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), kind, path],
+                stdout=subprocess.DEVNULL, stderr=log
+            )
+
+    def error(self, kind):
+        path = self.output_path(kind)
+        job = self._jobs.get(path)
+        if job is None or job.poll() in (None, 0):
+            return None
+        with open(path + ".log", errors="replace") as log:
+            message = log.read().strip().splitlines()
+        return message[-1] if message else f"exit code {job.returncode}"
+
+    def download(self, kind):
+        """(file name, mime type, reader returning the file's bytes) for a ready export."""
+        _, _, file_name, mime = EXPORTS[kind]
+        path = self.output_path(kind)
+        self.prune(kind)
+        return file_name, mime, lambda: Path(path).read_bytes()
+
+# ==========================================
+# EXECUTION
+# ==========================================
+# python report_export.py                    -> build every export into exports/
+# python report_export.py <kind> <out_path>  -> build one export (used by ExportManager)
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        EXPORTS[sys.argv[1]][0](sys.argv[2])
+    else:
+        os.makedirs(EXPORT_FOLDER, exist_ok=True)
+        for kind, (writer, _, file_name, _) in EXPORTS.items():
+            out_path = os.path.join(EXPORT_FOLDER, file_name)
+            writer(out_path)
+            print(f"📥 {kind}: {out_path} ({os.path.getsize(out_path) / 1024:.1f} KB)")
@@ -0,0 +1,172 @@
+import pandas as pd
+import numpy as np
+import argparse
+import glob
+import os
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# Real samples used to seed the state / district / pincode geography
+SAMPLE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Raw_Datasets")
+OUTPUT_FOLDER = "DataFolder"
+
+DEFAULT_ROWS = 1_000_000         # Total rows across all three datasets
+DEFAULT_SHARD_ROWS = 500_000     # Rows per shard file
+DEFAULT_DAYS = 365 * 3
+DEFAULT_END_DATE = "2025-12-31"
+
+# Share of the total rows each dataset gets (demographic / biometric dumps dwarf enrolment)
+DATASET_SHARE = {"enrolment": 0.10, "demographic": 0.45, "biometric": 0.45}
+
+# Same column layout as the API dumps
+SCHEMAS = {
+    "enrolment":   ['age_0_5', 'age_5_17', 'age_18_greater'],
+    "demographic": ['demo_age_5_17', 'demo_age_17_'],
+    "biometric":   ['bio_age_5_17', 'bio_age_17_']
+}
+KEY_COLUMNS = ['date', 'state', 'district', 'pincode']
+
+# Mean daily count per column, scaled by each pincode's activity level
+COLUMN_MEANS = {
+    'age_0_5': 1.5, 'age_5_17': 1.0, 'age_18_greater': 0.6,
+    'demo_age_5_17': 1.2, 'demo_age_17_': 6.0,
+    'bio_age_5_17': 4.0, 'bio_age_17_': 9.0
+}
+
+# Dirty-data knobs (fractions of rows)
+DUPLICATE_FRACTION = 0.02
+BAD_DATE_FRACTION = 0.001
+NAME_VARIANT_FRACTION = 0.01
+
+# Pincode archetypes the engines should find
+BOOM_FRACTION = 0.02       # Adult enrolment ramps up over the period
+AGEING_FRACTION = 0.05     # Heavy elderly demographic updates, few bio updates
+
+BAD_DATES = np.array(["31-02-2025", "00-01-2024", "2025/13/45", "", "NA"])
+
+# ==========================================
+# 1. GEOGRAPHY
+# ==========================================
+def load_geography(sample_folder=SAMPLE_FOLDER):
+    """Unique (state, district, pincode) triples from the real sample dumps."""
+    frames = []
+    for f in glob.glob(os.path.join(sample_folder, "*.csv")):
+        frames.append(pd.read_csv(f, usecols=['state', 'district', 'pincode']))
+    geo = pd.concat(frames, ignore_index=True).drop_duplicates()
+    geo = geo[geo['pincode'].between(110000, 999999)]
+    return geo.drop_duplicates('pincode').reset_index(drop=True)
+
+def expand_geography(geo, n_pincodes, rng):
+    """Adds synthetic pincodes inside existing 3-digit sorting districts."""
+    if n_pincodes <= len(geo):
+        return geo.sample(n=n_pincodes, random_state=rng.integers(1 << 31)).reset_index(drop=True)
+
+    extra = geo.sample(n=n_pincodes - len(geo), replace=True, random_state=rng.integers(1 << 31)).copy()
+    extra['pincode'] = (extra['pincode'] // 1000) * 1000 + rng.integers(0, 1000, len(extra))
+    geo = pd.concat([geo, extra], ignore_index=True).drop_duplicates('pincode')
+    return geo.reset_index(drop=True)
+
+def name_variant(names, rng):
+    """Spelling noise seen in the real dumps: upper case, doubled spaces, lower case."""
+    style = rng.integers(0, 3, len(names))
+    # pandas string ops: np.char keeps the fixed input width and would truncate "  "
+    names = pd.Series(names, dtype=object)
+    return np.where(style == 0, names.str.upper(),
+                    np.where(style == 1, names.str.replace(" ", "  "), names.str.lower()))
+
+# ==========================================
+# 2. SHARD GENERATION
+# ==========================================
+class SyntheticGenerator:
+    def __init__(self, geo, days=DEFAULT_DAYS, end_date=DEFAULT_END_DATE, seed=42):
+        self.rng = np.random.default_rng(seed)
+        self.geo = geo
+        self.days = days
+        dates = pd.date_range(end=end_date, periods=days, freq='D')
+        self.date_strings = dates.strftime('%d-%m-%Y').to_numpy()
+
+        n = len(geo)
+        self.states = geo['state'].to_numpy(dtype=object)
+        self.districts = geo['district'].to_numpy(dtype=object)
+        self.pincodes = geo['pincode'].to_numpy()
+        self.activity = self.rng.lognormal(mean=0.0, sigma=0.8, size=n)
+        self.is_boom = self.rng.random(n) < BOOM_FRACTION
+        self.is_ageing = self.rng.random(n) < AGEING_FRACTION
+
+    def shard(self, category, n_rows):
+        rng = self.rng
+        unique_rows = n_rows - int(n_rows * DUPLICATE_FRACTION)
+        pin = rng.integers(0, len(self.geo), unique_rows)
+        day = rng.integers(0, self.days, unique_rows)
+
+        df = pd.DataFrame({
+            'date': self.date_strings[day],
+            'state': self.states[pin],
+            'district': self.districts[pin],
+            'pincode': self.pincodes[pin]
+        })
+
+        ramp = 1.0 + 4.0 * (day / max(self.days - 1, 1)) * self.is_boom[pin]
+        for col in SCHEMAS[category]:
+            lam = COLUMN_MEANS[col] * self.activity[pin]
+            if col in ('age_5_17', 'age_18_greater'):
+                lam = lam * ramp
+            if col == 'demo_age_17_':
+                lam = lam * np.where(self.is_ageing[pin], 4.0, 1.0)
+            if category == 'biometric':
+                lam = lam * np.where(self.is_ageing[pin], 0.1, 1.0)
+            df[col] = rng.poisson(lam)
+
+        # Dirty data: spelling variants, unparseable dates, repeated rows
+        variant = rng.random(unique_rows) < NAME_VARIANT_FRACTION
+        df.loc[variant, 'state'] = name_variant(df.loc[variant, 'state'].to_numpy(dtype=str), rng)
+        bad = rng.random(unique_rows) < BAD_DATE_FRACTION
+        df.loc[bad, 'date'] = BAD_DATES[rng.integers(0, len(BAD_DATES), bad.sum())]
+
+        dupes = df.iloc[rng.integers(0, unique_rows, n_rows - unique_rows)]
+        return pd.concat([df, dupes], ignore_index=True)
+
+def generate(out_folder=OUTPUT_FOLDER, total_rows=DEFAULT_ROWS, shard_rows=DEFAULT_SHARD_ROWS,
+             days=DEFAULT_DAYS, n_pincodes=None, end_date=DEFAULT_END_DATE, seed=42):
+    """Writes enrolment / demographic / biometric shards named like the API dumps.
+    Returns {category: rows written}."""
+    geo = load_geography()
+    rng = np.random.default_rng(seed)
+    if n_pincodes:
+        geo = expand_geography(geo, n_pincodes, rng)
+    gen = SyntheticGenerator(geo, days=days, end_date=end_date, seed=seed)
+
+    os.makedirs(out_folder, exist_ok=True)
+    written = {}
+    # API record offsets: enrolment from 1M, demographic from 2M, biometric from 3M (x scale)
+    for base, (category, share) in enumerate(DATASET_SHARE.items(), start=1):
+        rows = int(total_rows * share)
+        offset = base * 10 ** max(6, len(str(total_rows)))
+        done = 0
+        while done < rows:
+            n = min(shard_rows, rows - done)
+            name = f"api_data_aadhar_{category}_{offset + done}_{offset + done + n - 1}.csv"
+            gen.shard(category, n).to_csv(os.path.join(out_folder, name), index=False)
+            done += n
+        written[category] = done
+        print(f"   🧪 {category}: {done:,} rows across {-(-rows // shard_rows)} shards")
+    return written
+
+# ==========================================
+# EXECUTION
+# ==========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic Aadhaar API dump shards.")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="total rows across all datasets")
+    parser.add_argument("--out", default=OUTPUT_FOLDER)
+    parser.add_argument("--shard-rows", type=int, default=DEFAULT_SHARD_ROWS)
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS)
+    parser.add_argument("--pincodes", type=int, default=None, help="pincode universe size (default: sample geography)")
+    parser.add_argument("--end-date", default=DEFAULT_END_DATE)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"🚀 Generating {args.rows:,} synthetic rows into '{args.out}'...")
+    generate(args.out, args.rows, args.shard_rows, args.days, args.pincodes, args.end_date, args.seed)
+    print("🎉 SUCCESS! Synthetic dataset ready.")